@@ -0,0 +1,232 @@
+"""
+Streaming bulk lab-result ingestion: CSV or NDJSON in, NDJSON interpretations out.
+The upload is fed chunk by chunk; complete lines are interpreted in fixed-size row batches
+with classify_lab_batch, and each batch is written out before more input is read, so memory
+is bounded by the batch size whatever the file size.
+
+Input rows (one per line):
+  NDJSON: {"patient_id": "p1", "test_name": "glucose", "value": 110}
+  CSV:    header row naming the columns, e.g. patient_id,test_name,value
+Output: one {"row", "patient_id"?, "test_name", "test", "value", "status"} object per input
+row (test = name after _normalize_key), then a final {"summary": {"rows", "counts"}} line.
+"""
+import csv
+import json
+import math
+
+import numpy as np
+
+from agent.tools.lab_result_interpretation import BATCH_STATUSES, _normalize_key, classify_lab_batch
+
+_BATCH_ROWS = 4096
+_MAX_LINE_BYTES = 64 * 1024
+_NAME_COLUMNS = ("test_name", "test", "name", "analyte")
+_VALUE_COLUMNS = ("value", "result")
+_PATIENT_COLUMNS = ("patient_id", "patient", "mrn")
+_FORMATS = ("ndjson", "csv")
+
+
+def _pick(keys, candidates):
+    for c in candidates:
+        if c in keys:
+            return c
+    return None
+
+
+class LabStreamInterpreter:
+    """
+    Incremental interpreter: feed(chunk) -> NDJSON bytes for the rows completed so far,
+    close() -> bytes for the remaining rows plus the summary line; abort(message) ends input early.
+    fmt: "ndjson", "csv" or None to detect from the first non-empty line.
+    """
+
+    def __init__(self, fmt=None, batch_rows=_BATCH_ROWS):
+        if fmt is not None and fmt not in _FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(_FORMATS)}")
+        self.fmt = fmt
+        self.batch_rows = batch_rows
+        self.rows = 0
+        self.counts = np.zeros(len(BATCH_STATUSES), dtype=np.int64)
+        self._buffer = b""
+        self._discarding = False    # inside an oversized line
+        self._pending = []          # complete lines not yet interpreted
+        self._columns = None        # CSV: (name, value, patient) column positions
+        self._failed = None
+        self._truncated = None      # set by abort()
+        self._quoted = {}           # raw test name -> (JSON name, JSON _normalize_key(name))
+
+    def feed(self, chunk):
+        if self._failed or self._truncated:
+            return b""
+        lines = (self._buffer + chunk).split(b"\n")
+        self._buffer = lines.pop()
+        if self._discarding and lines:
+            lines[0] = None         # end of the oversized line: reported as one error row
+            self._discarding = False
+        if len(self._buffer) > _MAX_LINE_BYTES:
+            self._buffer = b""
+            self._discarding = True
+        self._pending.extend(lines)
+        out = []
+        while len(self._pending) >= self.batch_rows and not self._failed:
+            batch, self._pending = self._pending[:self.batch_rows], self._pending[self.batch_rows:]
+            out.append(self._interpret(batch))
+        return b"".join(out)
+
+    def close(self):
+        if self._discarding:
+            self._pending.append(None)
+        elif self._buffer.strip():
+            self._pending.append(self._buffer)
+        self._discarding = False
+        self._buffer = b""
+        out = [self._interpret(self._pending)] if self._pending and not self._failed else []
+        self._pending = []
+        summary = {"rows": self.rows, "counts": {s: int(n) for s, n in zip(BATCH_STATUSES, self.counts)}}
+        if self._failed or self._truncated:
+            summary["error"] = self._failed or self._truncated
+        out.append(json.dumps({"summary": summary}).encode() + b"\n")
+        return b"".join(out)
+
+    def abort(self, message):
+        """Stop reading input: the unfinished last line is dropped and close() reports message."""
+        self._buffer = b""
+        self._discarding = False
+        self._truncated = message
+
+    def _interpret(self, lines):
+        records = self._parse_batch(lines)
+        if not records:
+            return b""
+        names = [r[1] if type(r) is tuple else "" for r in records]
+        values = [r[2] if type(r) is tuple else None for r in records]
+        codes = classify_lab_batch(names, values)
+        self.counts += np.bincount(codes, minlength=len(BATCH_STATUSES))
+
+        out = []
+        last_patient, quoted_patient = None, ""
+        for record, code in zip(records, codes.tolist()):
+            self.rows += 1
+            if type(record) is not tuple:
+                out.append(f'{{"row": {self.rows}, "status": "error", "message": {json.dumps(record)}}}')
+                continue
+            patient, name, value = record
+            quoted = self._quoted.get(name)
+            if quoted is None:
+                quoted = self._quoted.setdefault(name, (json.dumps(name), json.dumps(_normalize_key(name))))
+            if patient is None:
+                patient_part = ""
+            else:
+                if patient != last_patient:
+                    last_patient, quoted_patient = patient, json.dumps(patient)
+                patient_part = f', "patient_id": {quoted_patient}'
+            number = _number(value)
+            out.append(f'{{"row": {self.rows}{patient_part}, "test_name": {quoted[0]}, "test": {quoted[1]}, '
+                       f'"value": {"null" if number is None else repr(number)}, "status": "{BATCH_STATUSES[code]}"}}')
+        out.append("")
+        return "\n".join(out).encode()
+
+    def _parse_batch(self, lines):
+        """(patient_id, test_name, value) per non-blank line, or an error message for that line."""
+        records, raws, slots = [], [], []
+        for raw in lines:
+            if raw is None:
+                records.append(f"line longer than {_MAX_LINE_BYTES} bytes")
+                continue
+            if not raw.strip():
+                continue
+            if self.fmt is None:
+                # JSON lines start with { or [ (a bad [ line becomes an error row, not a CSV header)
+                self.fmt = "ndjson" if raw.lstrip().startswith((b"{", b"[")) else "csv"
+            if self.fmt == "csv" and self._columns is None:
+                if not self._read_header(raw):
+                    return []
+                continue
+            slots.append(len(records))
+            records.append(None)
+            raws.append(raw)
+        parse = self._parse_ndjson if self.fmt == "ndjson" else self._parse_csv
+        for slot, record in zip(slots, parse(raws)):
+            records[slot] = record
+        return records
+
+    def _parse_ndjson(self, raws):
+        try:
+            objs = json.loads(b"[" + b",".join(raws) + b"]")  # whole batch in one call
+        except ValueError:
+            objs = None
+        if objs is None or len(objs) != len(raws):
+            objs = []
+            for raw in raws:
+                try:
+                    objs.append(json.loads(raw))
+                except ValueError:
+                    objs.append(None)
+        for obj in objs:
+            if not isinstance(obj, dict):
+                yield "line is not a valid JSON object"
+                continue
+            name = obj.get("test_name")
+            if name is None:
+                name = obj.get(_pick(obj, _NAME_COLUMNS))
+            value = obj.get("value")
+            if value is None:
+                value = obj.get(_pick(obj, _VALUE_COLUMNS))
+            patient = obj.get("patient_id")
+            if patient is None:
+                patient = obj.get(_pick(obj, _PATIENT_COLUMNS))
+            yield _record(patient, name, value)
+
+    def _parse_csv(self, raws):
+        n, v, p = self._columns
+        width = max(n, v)
+        for raw in raws:
+            try:
+                text = raw.decode("utf-8").rstrip("\r")
+            except UnicodeDecodeError:
+                yield "line is not valid UTF-8"
+                continue
+            if '"' in text:
+                try:
+                    fields = next(csv.reader([text]))
+                except (csv.Error, StopIteration):
+                    yield "line is not valid CSV"
+                    continue
+            else:
+                fields = text.split(",")
+            if len(fields) <= width:
+                yield "row has fewer columns than the header"
+                continue
+            patient = fields[p].strip() if p is not None and p < len(fields) else None
+            yield _record(patient, fields[n].strip(), fields[v].strip())
+
+    def _read_header(self, raw):
+        try:
+            header = [h.strip().lower().replace(" ", "_") for h in next(csv.reader([raw.decode("utf-8-sig")]))]
+        except (UnicodeDecodeError, StopIteration, csv.Error):
+            header = []
+        name, value = _pick(header, _NAME_COLUMNS), _pick(header, _VALUE_COLUMNS)
+        if name is None or value is None:
+            self._failed = (f"CSV header must name a test column ({', '.join(_NAME_COLUMNS)}) "
+                            f"and a value column ({', '.join(_VALUE_COLUMNS)})")
+            return False
+        patient = _pick(header, _PATIENT_COLUMNS)
+        self._columns = (header.index(name), header.index(value), header.index(patient) if patient else None)
+        return True
+
+
+def _record(patient, name, value):
+    if not isinstance(name, str) or not name:
+        return "missing test name"
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        value = None
+    return patient, name, value
+
+
+def _number(value):
+    """Parsed finite float for output, or None when the value is not numeric."""
+    try:
+        f = float(value)
+    except (TypeError, ValueError):
+        return None
+    return f if math.isfinite(f) else None
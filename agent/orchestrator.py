@@ -1,7 +1,9 @@
 """
 Orchestrator: LangChain agent with tool-calling and conversation memory.
-Wires the five healthcare tools; one entrypoint run_agent(query, chat_history=[]).
+Wires the five healthcare tools; one entrypoint run_agent(query, chat_history=[]), plus arun_agent for async callers and
+astream_agent for streaming (tokens and tool events as they happen).
 """
+import asyncio
 import os
 from typing import Any
 
@@ -18,10 +20,15 @@ SYSTEM_PROMPT = """You are a healthcare assistant for a clinical setting. You he
 - Symptom lookup (possible conditions and urgency only — never diagnose)
 - Provider search (by specialty and location)
 - Appointment availability (provider ID and date range)
+- Earliest availability (soonest slots across all providers of a specialty/location in one call)
+- Appointment holds and bookings (hold a slot, then book it once the user confirms)
 - Insurance coverage (procedure code and plan ID)
-- Procedure lookup (search for a CPT code by name, or name by code)
+- Bulk coverage checks (every procedure code of a claim against one plan in one call)
+- Covering plans (which plans cover a given procedure code)
+- Procedure lookup (search for a CPT code by name, or name by code; list codes in a range like 99202-99215 or with a prefix like 274xx)
 - Lab result interpretation (check values against standard ranges)
 - Contraindication checks (check if procedures are safe given conditions/medications)
+- Batch contraindication checks (which of many candidate procedures are flagged for one patient, in one call)
 
 Rules:
 - When the user provides lab values (e.g. glucose, HDL, potassium) and asks for interpretation, you MUST use the lab_result_interpretation tool with those values, then summarize whether each is normal/low/high and add: "This is not a diagnosis; please consult your provider."
@@ -111,6 +118,47 @@ def _verify_phi_redaction(query: str) -> str:
     
     return query
 
+_SCHEDULING_KEYWORDS = ("appointment", "available", "availability", "schedule", "book", "slot", "opening", "visit")
+# Id of this turn's HumanMessage when it carries a date hint, so the hint can be taken out again
+_HINTED_TURN_ID = "turn-with-date-hint"
+
+
+def _date_hints(query: str, today) -> str:
+    """Pre-resolve relative dates ("next week", "Tuesday afternoon") in scheduling questions,
+    so the LLM passes concrete ranges to the appointment tools instead of computing them."""
+    from agent.tools.date_parser import find_date_ranges, is_iso_phrase
+
+    query_lower = query.lower()
+    if not any(kw in query_lower for kw in _SCHEDULING_KEYWORDS):
+        return ""
+    # Already-explicit ISO dates need no hint
+    found = [r for r in find_date_ranges(query, today) if not is_iso_phrase(r["phrase"])]
+    if not found:
+        return ""
+    parts = []
+    for r in found:
+        span = r["start"] if r["start"] == r["end"] else f"{r['start']} to {r['end']}"
+        if r["start_time"]:
+            span += f" ({r['start_time']}-{r['end_time']})"
+        parts.append(f'"{r["phrase"]}" = {span}')
+    return f"\n\n[Resolved dates, today is {today.isoformat()}: " + "; ".join(parts) + "]"
+
+def _user_turn(query: str, today) -> HumanMessage:
+    """This turn's message for the model: the query, plus the date hint when there is one."""
+    hint = _date_hints(query, today)
+    if not hint:
+        return HumanMessage(content=query)
+    return HumanMessage(content=query + hint, id=_HINTED_TURN_ID)
+
+
+def _without_date_hint(messages: list, query: str) -> list:
+    """Messages with the hinted turn back to the plain query: the hint is for the model only,
+    so clients never get their message back altered or resend a stale hint next turn."""
+    return [
+        HumanMessage(content=query) if isinstance(m, HumanMessage) and m.id == _HINTED_TURN_ID else m
+        for m in messages
+    ]
+
 def _verify_fact_check(output: str, tool_messages: list) -> str:
     """Verification 4: Fact-Checking against Tool Output.
     If the drug interaction tool was called, ensure the LLM didn't hallucinate a 'fatal' severity
@@ -141,14 +189,13 @@ def _verify_output_safety(output: str) -> str:
         return output + "\n\n(Disclaimer: This information is not a diagnosis. Please consult your provider.)"
     return output
 
-def run_agent(
+def _start_turn(
     query: str,
-    chat_history: list[dict[str, str]] | None = None,
-    source: str = "api",
-) -> dict[str, Any]:
+    chat_history: list[dict[str, str]] | None,
+) -> tuple[str, list[BaseMessage], dict[str, Any] | None]:
     """
-    Run the agent on a user query with optional conversation history.
-    Returns { "output": str, "messages": list (updated with this turn), "error": str? }.
+    Input verifications shared by run_agent and arun_agent (PHI redaction, domain check).
+    Returns (redacted query, history as messages, refusal result or None).
     """
     # 3. Verification: PHI Redaction Check
     query = _verify_phi_redaction(query)
@@ -156,26 +203,24 @@ def run_agent(
     # 1. Verification: Input Domain Check
     input_violation = _verify_input_domain(query)
     if input_violation:
-        return {
+        return query, [], {
             "output": input_violation,
             "messages": chat_history or [],
         }
+    return query, _messages_from_history(chat_history or []), None
 
-    chat_history = chat_history or []
-    messages = _messages_from_history(chat_history)
-    messages.append(HumanMessage(content=query))
 
-    try:
-        agent = _build_agent()
-        result = agent.invoke({"messages": messages})
-    except Exception as e:
-        return {
-            "output": "",
-            "messages": [],
-            "error": str(e),
-        }
+def _final_text(messages: list) -> str:
+    """The agent's reply: content of the last message with text."""
+    for m in reversed(messages):
+        if hasattr(m, "content") and m.content and isinstance(m.content, str):
+            return m.content
+    return ""
+
 
-    out_messages = result.get("messages", [])
+def _finish_turn(result: dict[str, Any], query: str, source: str) -> dict[str, Any]:
+    """Cost logging and output verifications shared by run_agent and arun_agent."""
+    out_messages = _without_date_hint(result.get("messages", []), query)
 
     # Cost tracking: log token usage for AI Cost Analysis
     try:
@@ -198,11 +243,7 @@ def run_agent(
     except Exception:  # do not fail the request if logging fails
         usage = {}
 
-    output = ""
-    for m in reversed(out_messages):
-        if hasattr(m, "content") and m.content and isinstance(m.content, str):
-            output = m.content
-            break
+    output = _final_text(out_messages)
 
     # 4. Verification: Fact Check against tool output
     # We can pull intermediate tool messages from the history
@@ -221,3 +262,143 @@ def run_agent(
         "messages": out_messages,
         "usage": usage,
     }
+
+
+def run_agent(
+    query: str,
+    chat_history: list[dict[str, str]] | None = None,
+    source: str = "api",
+) -> dict[str, Any]:
+    """
+    Run the agent on a user query with optional conversation history.
+    Returns { "output": str, "messages": list (updated with this turn), "error": str? }.
+    """
+    query, messages, refusal = _start_turn(query, chat_history)
+    if refusal is not None:
+        return refusal
+
+    from agent.tools.date_parser import request_clock
+
+    try:
+        # One clock per request: the date hints and any tool-side date parsing agree on "today"
+        with request_clock() as today:
+            messages.append(_user_turn(query, today))
+            agent = _build_agent()
+            result = agent.invoke({"messages": messages})
+    except Exception as e:
+        return {
+            "output": "",
+            "messages": [],
+            "error": str(e),
+        }
+
+    return _finish_turn(result, query, source)
+
+
+async def arun_agent(
+    query: str,
+    chat_history: list[dict[str, str]] | None = None,
+    source: str = "api",
+) -> dict[str, Any]:
+    """
+    Async run_agent: same verifications and result, but the agent runs via ainvoke, so the
+    event loop keeps serving other requests while this one waits on the LLM. Tools run in
+    worker threads (see langchain_tools); cost logging's file write does too.
+    """
+    query, messages, refusal = _start_turn(query, chat_history)
+    if refusal is not None:
+        return refusal
+
+    from agent.tools.date_parser import request_clock
+
+    try:
+        # The clock is a context variable, so it follows this task into awaited tool threads
+        with request_clock() as today:
+            messages.append(_user_turn(query, today))
+            agent = _build_agent()
+            result = await agent.ainvoke({"messages": messages})
+    except Exception as e:
+        return {
+            "output": "",
+            "messages": [],
+            "error": str(e),
+        }
+
+    return await asyncio.to_thread(_finish_turn, result, query, source)
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Text of a streamed model chunk (str content, or the text blocks of list content)."""
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    return "".join(b.get("text", "") for b in content if isinstance(b, dict) and b.get("type") == "text")
+
+
+async def _stream_turn(query: str, messages: list[BaseMessage], events: asyncio.Queue) -> None:
+    """
+    Producer for astream_agent, run as its own task (so the request clock is scoped to it):
+    queues ("token" | "tool_start" | "tool_end" | "error", data), then (None, final state or None).
+    """
+    from agent.tools.date_parser import request_clock
+
+    state = None
+    try:
+        with request_clock() as today:
+            messages.append(_user_turn(query, today))
+            agent = _build_agent()
+            async for ev in agent.astream_events({"messages": messages}, version="v2"):
+                kind, data = ev["event"], ev["data"]
+                if kind == "on_chat_model_stream":
+                    text = _chunk_text(data.get("chunk"))
+                    if text:
+                        await events.put(("token", {"text": text}))
+                elif kind == "on_tool_start":
+                    await events.put(("tool_start", {"id": ev["run_id"], "name": ev["name"], "args": data.get("input") or {}}))
+                elif kind == "on_tool_end":
+                    output = data.get("output")
+                    await events.put(("tool_end", {"id": ev["run_id"], "name": ev["name"],
+                                                   "output": getattr(output, "content", output)}))
+                elif kind == "on_chain_end" and not ev.get("parent_ids"):
+                    state = data.get("output")
+    except Exception as e:
+        await events.put(("error", {"error": str(e)}))
+        state = None
+    await events.put((None, state))
+
+
+async def astream_agent(
+    query: str,
+    chat_history: list[dict[str, str]] | None = None,
+    source: str = "api",
+):
+    """
+    Streaming arun_agent: async iterator of (event, data) as the agent runs.
+    "token" {text}: model text as generated; "tool_start" {id, name, args} and "tool_end"
+    {id, name, output}: each tool call; then "final" with arun_agent's result plus "appended",
+    the text the output verifiers added after the streamed reply (the verifiers need the whole
+    reply, so they run once it is complete), or "error" {error}.
+    Closing the iterator early (client gone) cancels the agent run.
+    """
+    query, messages, refusal = _start_turn(query, chat_history)
+    if refusal is not None:
+        yield "final", {**refusal, "appended": ""}
+        return
+
+    events: asyncio.Queue = asyncio.Queue()
+    producer = asyncio.create_task(_stream_turn(query, messages, events))
+    try:
+        while True:
+            event, data = await events.get()
+            if event is None:
+                break
+            yield event, data
+    finally:
+        producer.cancel()
+    if data is None:
+        return
+
+    result = await asyncio.to_thread(_finish_turn, data, query, source)
+    streamed = _final_text(data.get("messages", []))
+    output = result["output"]
+    yield "final", {**result, "appended": output[len(streamed):] if output.startswith(streamed) else output}
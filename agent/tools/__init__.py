@@ -1,20 +1,31 @@
 # Tools callable by the agent.
-# drug_interaction_check, symptom_lookup, provider_search, appointment_availability, insurance_coverage_check, lab_result_interpretation, contraindication_check
+# drug_interaction_check, symptom_lookup, provider_search, appointment_availability, earliest_availability, hold_appointment, book_appointment, insurance_coverage_check, bulk_coverage_check, covering_plans, lab_result_interpretation, contraindication_check, contraindication_batch_check
 
 from agent.tools.drug_interaction_check import drug_interaction_check
 from agent.tools.symptom_lookup import symptom_lookup
 from agent.tools.provider_search import provider_search
-from agent.tools.appointment_availability import appointment_availability
-from agent.tools.insurance_coverage_check import insurance_coverage_check
+from agent.tools.appointment_availability import (
+    appointment_availability,
+    book_appointment,
+    earliest_availability,
+    hold_appointment,
+)
+from agent.tools.insurance_coverage_check import bulk_coverage_check, covering_plans, insurance_coverage_check
 from agent.tools.lab_result_interpretation import lab_result_interpretation
-from agent.tools.contraindication_check import contraindication_check
+from agent.tools.contraindication_check import contraindication_batch_check, contraindication_check
 
 __all__ = [
     "drug_interaction_check",
     "symptom_lookup",
     "provider_search",
     "appointment_availability",
+    "earliest_availability",
+    "hold_appointment",
+    "book_appointment",
     "insurance_coverage_check",
+    "bulk_coverage_check",
+    "covering_plans",
     "lab_result_interpretation",
     "contraindication_check",
+    "contraindication_batch_check",
 ]
@@ -1,76 +1,72 @@
 """
 Appointment availability: mock for MVP. Returns available slots for a provider in a date range.
+Holds and bookings are kept in process memory by default, which is only correct with a single
+uvicorn worker and does not survive a restart; set RESERVATIONS_DB to a SQLite path to share
+them across workers and keep them on disk.
 PRE_SEARCH: mock for sprint; production = OpenEMR scheduling API.
 """
-import re
-from datetime import datetime, timedelta
+import heapq
+import os
+from itertools import islice
 
+from agent.tools.date_parser import is_iso_phrase, parse_date_range
+from agent.tools.provider_search import matching_providers
 from agent.tools.schemas import tool_result
+from agent.tools.slot_calendar import SlotCalendar
+from agent.tools.slot_reservations import ReservationBook, ReservationError, SQLiteReservationBook
 
+# Providers and their typical weekday schedules
+_SCHEDULES = {
+    "prov_001": [("09:00", "09:30"), ("10:00", "10:30"), ("14:00", "14:30")],
+    "prov_002": [("08:00", "08:30"), ("15:00", "15:30")],
+    "prov_003": [("09:00", "09:30"), ("11:00", "11:30")],
+}
+_HORIZON_DAYS = 14
+_DEFAULT_K = 5
+_HOLD_TTL_SECONDS = 600
+_DATE_RANGE_ERROR = ("date_range must be a date or range: 'YYYY-MM-DD', 'YYYY-MM-DD to YYYY-MM-DD', "
+                     "or e.g. 'tomorrow', 'next week', 'Tuesday afternoon', 'March 5'")
+_MAX_K = 50
+
+# Shared calendar: materialized once, advanced incrementally as the date changes
+_calendar = SlotCalendar(_SCHEDULES, horizon_days=_HORIZON_DAYS)
+
+
+def _reservation_book():
+    """SQLite-backed book when RESERVATIONS_DB is set (multi-worker), else the in-memory one."""
+    path = os.getenv("RESERVATIONS_DB")
+    if path:
+        return SQLiteReservationBook(_calendar, path, hold_ttl=_HOLD_TTL_SECONDS)
+    return ReservationBook(_calendar, hold_ttl=_HOLD_TTL_SECONDS)
 
-def _generate_dynamic_slots():
-    """Generate dynamic mock appointment slots for a 14-day window from today."""
-    slots = []
-    today = datetime.now()
-    
-    # Providers and their typical schedules
-    schedules = {
-        "prov_001": [("09:00", "09:30"), ("10:00", "10:30"), ("14:00", "14:30")],
-        "prov_002": [("08:00", "08:30"), ("15:00", "15:30")],
-        "prov_003": [("09:00", "09:30"), ("11:00", "11:30")]
-    }
-
-    for day_offset in range(14):
-        current_day = today + timedelta(days=day_offset)
-        # Skip weekends for realism
-        if current_day.weekday() >= 5:
-            continue
-            
-        date_str = current_day.strftime("%Y-%m-%d")
-        
-        for provider_id, times in schedules.items():
-            for start_time, end_time in times:
-                # Add a bit of pseudo-randomness: skip some slots based on day
-                # So it's not totally uniform, just to make it more realistic
-                if (day_offset + hash(provider_id + start_time)) % 3 == 0:
-                    continue
-                    
-                slots.append({
-                    "provider_id": provider_id,
-                    "date": date_str,
-                    "start_time": start_time,
-                    "end_time": end_time
-                })
-                
-    return slots
+
+# Holds/bookings layered on the calendar; held or booked slots are hidden from availability
+_reservations = _reservation_book()
 
 
 def _parse_date_range(date_range):
     """
-    Parse date_range into (start_date, end_date) as strings YYYY-MM-DD.
-    Accepts: "YYYY-MM-DD" (single day) or "YYYY-MM-DD to YYYY-MM-DD" (range).
+    Resolve date_range ("2025-03-01", "2025-03-01 to 2025-03-07", "next week", "Tuesday afternoon", ...)
+    against the request clock. Returns the date_parser dict or None.
     """
     if not date_range or not isinstance(date_range, str):
-        return None, None
-    date_range = date_range.strip()
-    # Single date
-    if re.match(r"^\d{4}-\d{2}-\d{2}$", date_range):
-        return date_range, date_range
-    # Range: "YYYY-MM-DD to YYYY-MM-DD"
-    parts = re.split(r"\s+to\s+", date_range, maxsplit=1)
-    if len(parts) == 2 and re.match(r"^\d{4}-\d{2}-\d{2}$", parts[0].strip()) and re.match(r"^\d{4}-\d{2}-\d{2}$", parts[1].strip()):
-        return parts[0].strip(), parts[1].strip()
-    # Fallback: treat whole string as single date if it looks like YYYY-MM-DD
-    if re.search(r"\d{4}-\d{2}-\d{2}", date_range):
-        return date_range[:10], date_range[:10]
-    return None, None
+        return None
+    return parse_date_range(date_range)
+
+
+def _resolved(parsed):
+    """Echo of how a relative date_range was read, for the LLM to quote back; None for plain ISO input."""
+    if is_iso_phrase(parsed["phrase"]):
+        return None
+    return {k: v for k, v in parsed.items() if v is not None}
 
 
 def appointment_availability(provider_id=None, date_range=None):
     """
-    Get available appointment slots for a provider within a date range.
+    Get available appointment slots for a provider within a date range (ISO dates or phrases
+    like "next week" / "Tuesday afternoon", resolved against the request clock).
     Returns { success, data: { slots: [...] }?, error? }.
-    Mock: filters dynamically generated schedule over the next 14 days.
+    Mock: range query on the materialized slot calendar (next 14 days, weekdays).
     """
     if provider_id is None:
         return tool_result(success=False, error="provider_id is required")
@@ -81,20 +77,95 @@ def appointment_availability(provider_id=None, date_range=None):
     if not isinstance(date_range, str):
         return tool_result(success=False, error="date_range must be a string")
 
-    start_d, end_d = _parse_date_range(date_range)
-    if start_d is None:
-        return tool_result(success=False, error="date_range must be YYYY-MM-DD or 'YYYY-MM-DD to YYYY-MM-DD'")
-
-    slots = _generate_dynamic_slots()
-    filtered = []
-    for s in slots:
-        if s.get("provider_id") != provider_id:
-            continue
-        slot_date = (s.get("date") or "")[:10]
-        if start_d <= slot_date <= end_d:
-            filtered.append(s)
-
-    return tool_result(
-        success=True,
-        data={"slots": filtered, "available": len(filtered) > 0},
-    )
+    parsed = _parse_date_range(date_range)
+    if parsed is None:
+        return tool_result(success=False, error=_DATE_RANGE_ERROR)
+
+    filtered = list(_open_slots(provider_id, parsed))
+
+    data = {"slots": filtered, "available": len(filtered) > 0}
+    resolved = _resolved(parsed)
+    if resolved:
+        data["resolved_date_range"] = resolved
+    return tool_result(success=True, data=data)
+
+
+def _slot_key(slot):
+    return slot["date"], slot["start_time"]
+
+
+def _open_slots(provider_id, parsed):
+    """Calendar slots in the parsed range (and time of day) minus those currently held or booked."""
+    slots = _calendar.iter_slots(provider_id, parsed["start"], parsed["end"],
+                                 start_time=parsed.get("start_time"), end_time=parsed.get("end_time"))
+    taken = _reservations.taken(provider_id)
+    return (s for s in slots if _slot_key(s) not in taken) if taken else slots
+
+
+def earliest_availability(specialty=None, location=None, date_range=None, k=None):
+    """
+    Soonest k open slots across every provider matching specialty and location, in one call.
+    Each provider's calendar is already a time-ordered stream; heapq.merge k-way merges them
+    lazily, so only about k + (number of providers) slots are ever materialized.
+    Returns { success, data: { slots: [...], providers_considered }?, error? }.
+    """
+    if specialty is None:
+        return tool_result(success=False, error="specialty is required")
+    if not isinstance(specialty, str):
+        return tool_result(success=False, error="specialty must be a string")
+    if location is not None and not isinstance(location, str):
+        return tool_result(success=False, error="location must be a string")
+    if k is None:
+        k = _DEFAULT_K
+    if not isinstance(k, int) or not 1 <= k <= _MAX_K:
+        return tool_result(success=False, error=f"k must be an integer between 1 and {_MAX_K}")
+    if date_range:
+        parsed = _parse_date_range(date_range)
+        if parsed is None:
+            return tool_result(success=False, error=_DATE_RANGE_ERROR)
+    else:
+        start_d, end_d = _calendar.window()
+        parsed = {"start": start_d, "end": end_d, "phrase": f"{start_d} to {end_d}"}
+
+    providers = {p["id"]: p for p in matching_providers(specialty, location or "")}
+    streams = [_open_slots(pid, parsed) for pid in providers]
+    slots = []
+    for slot in islice(heapq.merge(*streams, key=_slot_key), k):
+        p = providers[slot["provider_id"]]
+        slots.append(dict(slot, provider_name=p.get("name"), specialty=p.get("specialty"), location=p.get("location")))
+
+    data = {"slots": slots, "available": len(slots) > 0, "providers_considered": len(providers)}
+    resolved = _resolved(parsed)
+    if resolved:
+        data["resolved_date_range"] = resolved
+    return tool_result(success=True, data=data)
+
+
+def hold_appointment(provider_id=None, date=None, start_time=None, holder=None):
+    """
+    Hold an open slot for a few minutes so the patient can confirm it; no one else is offered it meanwhile.
+    Across uvicorn workers that only holds with RESERVATIONS_DB set (see module docstring).
+    Returns { success, data: { hold_id, provider_id, date, start_time, end_time, expires_in_seconds }?, error? }.
+    """
+    for name, value in (("provider_id", provider_id), ("date", date), ("start_time", start_time)):
+        if not isinstance(value, str) or not value.strip():
+            return tool_result(success=False, error=f"{name} is required")
+    try:
+        hold = _reservations.hold(provider_id.strip(), date.strip(), start_time.strip(), holder=holder)
+    except ReservationError as e:
+        return tool_result(success=False, error=str(e))
+    return tool_result(success=True, data=dict(hold.slot, hold_id=hold.hold_id, expires_in_seconds=_HOLD_TTL_SECONDS))
+
+
+def book_appointment(hold_id=None, patient=None):
+    """
+    Confirm a held slot as an appointment.
+    Returns { success, data: { appointment_id, provider_id, date, start_time, end_time, patient }?, error? }.
+    """
+    if not isinstance(hold_id, str) or not hold_id.strip():
+        return tool_result(success=False, error="hold_id is required")
+    try:
+        appointment = _reservations.book(hold_id.strip(), patient=patient)
+    except ReservationError as e:
+        return tool_result(success=False, error=str(e))
+    return tool_result(success=True, data=appointment)
@@ -0,0 +1,84 @@
+"""
+Condition/medication -> procedure bitsets for reverse contraindication queries.
+Procedure codes are interned into bit positions once; every flagged condition and
+medication maps to a packed uint64 bitset of the procedures it flags. A patient's terms
+are OR-ed into one mask, and a whole candidate list is answered by one vectorized bit test.
+Reasons and names stay in the per-code hash index; the bitsets hold membership only.
+"""
+import numpy as np
+
+_WORD_BITS = 64
+
+
+class ContraindicationBitsets:
+    """
+    codes: interned procedure codes (position = bit number).
+    conditions / medications: term -> uint64 array of ceil(len(codes) / 64) words.
+    """
+
+    def __init__(self, codes, conditions, medications):
+        self.codes = list(codes)
+        self.conditions = conditions
+        self.medications = medications
+        self.words = -(-len(self.codes) // _WORD_BITS)
+        self._code_bit = {c: i for i, c in enumerate(self.codes)}
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Build from contraindication rows ({ procedure_code, flagged_conditions, flagged_medications }). First row wins."""
+        code_bit = {}
+        condition_ids, medication_ids = {}, {}
+        for item in entries:
+            code = item.get("procedure_code")
+            if not isinstance(code, str) or code in code_bit:
+                continue
+            bit = code_bit[code] = len(code_bit)
+            for term in item.get("flagged_conditions") or []:
+                condition_ids.setdefault(term, []).append(bit)
+            for term in item.get("flagged_medications") or []:
+                medication_ids.setdefault(term, []).append(bit)
+
+        words = -(-len(code_bit) // _WORD_BITS)
+        return cls(code_bit, _pack(condition_ids, words), _pack(medication_ids, words))
+
+    @property
+    def nbytes(self):
+        return sum(b.nbytes for b in self.conditions.values()) + sum(b.nbytes for b in self.medications.values())
+
+    def mask(self, conditions=(), medications=()):
+        """OR of the bitsets of every given condition and medication (unknown terms flag nothing)."""
+        out = np.zeros(self.words, dtype=np.uint64)
+        for table, terms in ((self.conditions, conditions), (self.medications, medications)):
+            for term in terms:
+                bits = table.get(term)
+                if bits is not None:
+                    out |= bits
+        return out
+
+    def bits_for(self, codes):
+        """Bit position per code, -1 for codes without contraindication data."""
+        return np.fromiter((self._code_bit.get(c, -1) for c in codes), dtype=np.int64, count=len(codes))
+
+    @staticmethod
+    def test(bitset, bits):
+        """Boolean per bit position: is it set in bitset? Positions of -1 are never set."""
+        known = bits >= 0
+        b = np.where(known, bits, 0).astype(np.uint64)
+        hit = (bitset[(b >> np.uint64(6)).astype(np.int64)] >> (b & np.uint64(_WORD_BITS - 1))) & np.uint64(1)
+        return known & hit.astype(bool)
+
+    def flagged(self, codes, conditions=(), medications=()):
+        """Boolean per candidate code: flagged by any of the patient's conditions or medications."""
+        if not self.words:
+            return np.zeros(len(codes), dtype=bool)
+        return self.test(self.mask(conditions, medications), self.bits_for(codes))
+
+
+def _pack(term_bits, words):
+    packed = {}
+    for term, bits in term_bits.items():
+        b = np.asarray(bits, dtype=np.uint64)
+        out = np.zeros(words, dtype=np.uint64)
+        np.bitwise_or.at(out, (b >> np.uint64(6)).astype(np.int64), np.uint64(1) << (b & np.uint64(_WORD_BITS - 1)))
+        packed[term] = out
+    return packed
@@ -2,82 +2,193 @@
 Contraindication check: mock for MVP. Returns whether a procedure is contraindicated 
 given a patient's conditions and medications.
 """
-import json
 import os
 
+from agent.tools.contraindication_bitsets import ContraindicationBitsets
+from agent.tools.dataset_registry import registry
+from agent.tools.medication_names import resolve_medications
 from agent.tools.schemas import tool_result
+from agent.tools.sqlite_store import get_dataset_store
 
 _DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "contraindications.json")
-
-def _load_data():
-    if not os.path.isfile(_DATA_PATH):
-        return []
-    with open(_DATA_PATH, encoding="utf-8") as f:
-        data = json.load(f)
-    return data.get("contraindications", [])
+_MAX_BATCH_CODES = 500
 
 def _normalize(text):
     return text.strip().lower()
 
+def _build_index(data):
+    """Build procedure_code -> (entry, flagged condition set, flagged medication set)."""
+    index = {}
+    for item in data.get("contraindications", []):
+        code = item.get("procedure_code")
+        if code in index:
+            continue
+        index[code] = (
+            item,
+            frozenset(item.get("flagged_conditions", [])),
+            frozenset(item.get("flagged_medications", [])),
+        )
+    return index
+
+def _build_bitsets(data):
+    """Condition/medication -> bitset of flagged procedures, for batch checks."""
+    return ContraindicationBitsets.from_entries(data.get("contraindications", []))
+
+registry.register("contraindications", _DATA_PATH, _build_index)
+registry.register("contraindication_bitsets", _DATA_PATH, _build_bitsets)
+
 def contraindication_check(procedure_code: str, patient_conditions: list = None, patient_medications: list = None):
     """
     Check if a procedure is contraindicated based on patient conditions and medications.
-    Returns { success, data: { safe: bool, flagged_issues: list, reason: str }?, error? }
+    Returns { success, data: { safe: bool, flagged_issues: list, reason: str, resolved_names? }?, error? }
+    resolved_names maps each medication that was rewritten (brand, dose, typo) to what was checked.
     """
+    # Codes are matched as the batch check matches them: string form, surrounding whitespace dropped
+    procedure_code = str(procedure_code).strip() if procedure_code is not None else ""
     if not procedure_code:
         return tool_result(success=False, error="procedure_code is required")
         
     patient_conditions = [_normalize(c) for c in (patient_conditions or [])]
-    patient_medications = [_normalize(m) for m in (patient_medications or [])]
-    
-    data = _load_data()
+    # Brand names / doses / misspellings -> generic, to match flagged_medications
+    patient_medications, resolved_names = resolve_medications(patient_medications or [])
     
     # Find the procedure
-    procedure_data = None
-    for item in data:
-        if item.get("procedure_code") == str(procedure_code):
-            procedure_data = item
-            break
+    store = get_dataset_store()
+    if store is not None:
+        entry = store.contraindication(procedure_code)
+    else:
+        entry = registry.get("contraindications").get(procedure_code)
             
-    if not procedure_data:
-        return tool_result(
-            success=True, 
+    if not entry:
+        return _with_resolved_names(
             data={
                 "safe": True, 
                 "flagged_issues": [], 
                 "reason": f"No contraindication data found for procedure code {procedure_code}."
-            }
+            },
+            resolved_names=resolved_names,
         )
         
+    procedure_data, flagged_conditions, flagged_medications = entry
     flagged_issues = []
     
     # Check conditions
     for condition in patient_conditions:
-        if condition in procedure_data.get("flagged_conditions", []):
+        if condition in flagged_conditions:
             flagged_issues.append(f"Condition: {condition}")
             
     # Check medications
     for med in patient_medications:
-        if med in procedure_data.get("flagged_medications", []):
+        if med in flagged_medications:
             flagged_issues.append(f"Medication: {med}")
             
     if flagged_issues:
-        return tool_result(
-            success=True,
+        return _with_resolved_names(
             data={
                 "safe": False,
                 "procedure_name": procedure_data.get("procedure_name"),
                 "flagged_issues": flagged_issues,
                 "reason": procedure_data.get("reason", "Contraindication detected.")
-            }
+            },
+            resolved_names=resolved_names,
         )
         
-    return tool_result(
-        success=True,
+    return _with_resolved_names(
         data={
             "safe": True,
             "procedure_name": procedure_data.get("procedure_name"),
             "flagged_issues": [],
             "reason": "No known contraindications found for the provided conditions and medications."
-        }
+        },
+        resolved_names=resolved_names,
+    )
+
+
+def _with_resolved_names(data, resolved_names):
+    """Successful tool_result, echoing rewritten medication names as drug_interaction_check does."""
+    if resolved_names:
+        data["resolved_names"] = resolved_names
+    return tool_result(success=True, data=data)
+
+
+def contraindication_batch_check(procedure_codes=None, patient_conditions=None, patient_medications=None):
+    """
+    Check a list of candidate procedures against one patient's conditions and medications in a
+    single pass: the patient's terms are OR-ed into one bitset and every candidate is tested against it.
+    Duplicate codes are answered once; results keep the order codes were given in.
+    Returns { success, data: { flagged: [{ procedure_code, procedure_name, flagged_issues, reason }],
+    safe_codes, no_data_codes, resolved_names? }?, error? }. no_data_codes (no contraindication data)
+    are also in safe_codes; resolved_names is as in contraindication_check.
+    """
+    if not isinstance(procedure_codes, list) or not procedure_codes:
+        return tool_result(success=False, error="procedure_codes must be a non-empty list of procedure codes")
+    if len(procedure_codes) > _MAX_BATCH_CODES:
+        return tool_result(success=False, error=f"at most {_MAX_BATCH_CODES} procedure codes per call")
+    if not all(isinstance(c, str) for c in procedure_codes):
+        return tool_result(success=False, error="each procedure code must be a string")
+
+    conditions = list(dict.fromkeys(_normalize(c) for c in (patient_conditions or []) if isinstance(c, str)))
+    medications, resolved_names = resolve_medications(patient_medications or [])
+    medications = list(dict.fromkeys(m for m in medications if m))
+
+    codes = list(dict.fromkeys(c.strip() for c in procedure_codes))
+    store = get_dataset_store()
+    if store is not None:
+        issues, entries = _sqlite_batch_issues(store, codes, conditions, medications)
+    else:
+        issues, entries = _bitset_batch_issues(codes, conditions, medications)
+
+    flagged, safe, no_data = [], [], []
+    for code in codes:
+        if code in issues:
+            procedure_data = entries[code]
+            flagged.append({
+                "procedure_code": code,
+                "procedure_name": procedure_data.get("procedure_name"),
+                "flagged_issues": issues[code],
+                "reason": procedure_data.get("reason", "Contraindication detected."),
+            })
+        else:
+            safe.append(code)
+            if code not in entries:
+                no_data.append(code)
+
+    return _with_resolved_names(
+        data={"flagged": flagged, "safe_codes": safe, "no_data_codes": no_data},
+        resolved_names=resolved_names,
     )
+
+
+def _bitset_batch_issues(codes, conditions, medications):
+    """({ flagged code: issues }, { code with data: entry }) from the in-memory bitsets."""
+    bitsets = registry.get("contraindication_bitsets")
+    index = registry.get("contraindications")
+    bits = bitsets.bits_for(codes)
+    hit = bitsets.flagged(codes, conditions, medications)
+    issues = {}
+    if hit.any():
+        # Attribute each flagged candidate to the patient terms that flag it (one bit test per term)
+        hit_bits = bits[hit]
+        per_hit = [[] for _ in range(len(hit_bits))]
+        for label, table, terms in (("Condition", bitsets.conditions, conditions),
+                                    ("Medication", bitsets.medications, medications)):
+            for term in terms:
+                if term in table:
+                    for k in ContraindicationBitsets.test(table[term], hit_bits).nonzero()[0]:
+                        per_hit[k].append(f"{label}: {term}")
+        issues = dict(zip((c for c, h in zip(codes, hit) if h), per_hit))
+    entries = {code: index[code][0] for code, b in zip(codes, bits.tolist()) if b >= 0}
+    return issues, entries
+
+
+def _sqlite_batch_issues(store, codes, conditions, medications):
+    """Same as _bitset_batch_issues, from the (kind, term, procedure_code) flag index."""
+    hits = {}
+    for code, is_medication, term in store.contraindication_hits(codes, conditions, medications):
+        hits.setdefault(code, set()).add((bool(is_medication), term))
+    issues = {
+        code: [f"Condition: {t}" for t in conditions if (False, t) in terms]
+        + [f"Medication: {m}" for m in medications if (True, m) in terms]
+        for code, terms in hits.items()
+    }
+    return issues, store.contraindication_entries(codes)
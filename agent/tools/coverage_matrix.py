@@ -0,0 +1,80 @@
+"""
+Dense procedure x plan coverage matrix for reverse coverage queries.
+Procedure codes and plan IDs are interned into row/column numbers once; coverage is a
+single int8 status array (UNKNOWN / COVERED / NOT_COVERED), so "which plans cover X"
+is one row scan and "which codes does plan P cover" one column scan, both vectorized.
+Details text stays in the (procedure_code, plan_id) hash index; the matrix holds status only.
+"""
+import numpy as np
+
+UNKNOWN = 0
+COVERED = 1
+NOT_COVERED = 2
+
+
+class CoverageMatrix:
+    """
+    status[code_row, plan_col] for every interned procedure code and plan.
+    codes / plans: interned ID tables (position = row / column number).
+    """
+
+    def __init__(self, codes, plans, status):
+        self.codes = list(codes)
+        self.plans = list(plans)
+        self.status = status
+        self._code_row = {c: i for i, c in enumerate(self.codes)}
+        self._plan_col = {p: j for j, p in enumerate(self.plans)}
+        self._code_arr = np.array(self.codes, dtype=object)
+        self._plan_arr = np.array(self.plans, dtype=object)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from coverage rows ({ procedure_code, plan_id, covered }). First row wins on duplicates."""
+        code_row, plan_col = {}, {}
+        ci, pj, st = [], [], []
+        for row in rows:
+            code, plan = row.get("procedure_code"), row.get("plan_id")
+            if not isinstance(code, str) or not isinstance(plan, str):
+                continue
+            ci.append(code_row.setdefault(code, len(code_row)))
+            pj.append(plan_col.setdefault(plan, len(plan_col)))
+            st.append(COVERED if row.get("covered") else NOT_COVERED)
+
+        status = np.zeros((len(code_row), len(plan_col)), dtype=np.int8)
+        if ci:
+            flat = np.asarray(ci, dtype=np.int64) * len(plan_col) + np.asarray(pj, dtype=np.int64)
+            flat, first = np.unique(flat, return_index=True)
+            status.ravel()[flat] = np.asarray(st, dtype=np.int8)[first]
+        return cls(code_row, plan_col, status)
+
+    @property
+    def shape(self):
+        return self.status.shape
+
+    @property
+    def nbytes(self):
+        return self.status.nbytes
+
+    def lookup(self, procedure_code, plan_id):
+        """Status of one cell; UNKNOWN when the code or plan was never seen."""
+        i, j = self._code_row.get(procedure_code), self._plan_col.get(plan_id)
+        if i is None or j is None:
+            return UNKNOWN
+        return int(self.status[i, j])
+
+    def plans_for(self, procedure_code, status=COVERED):
+        """Plan IDs whose cell for procedure_code has the given status (row query)."""
+        i = self._code_row.get(procedure_code)
+        if i is None:
+            return []
+        return self._plan_arr[np.flatnonzero(self.status[i] == status)].tolist()
+
+    def codes_for(self, plan_id, status=COVERED):
+        """Procedure codes whose cell for plan_id has the given status (column query)."""
+        j = self._plan_col.get(plan_id)
+        if j is None:
+            return []
+        return self._code_arr[np.flatnonzero(self.status[:, j] == status)].tolist()
+
+    def has_code(self, procedure_code):
+        return procedure_code in self._code_row
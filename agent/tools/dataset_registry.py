@@ -0,0 +1,139 @@
+"""
+Process-wide dataset registry: each data/*.json file is parsed once and turned into a
+ready-made index (hash maps keyed on normalized names/codes) that tools read directly.
+An index is rebuilt only when its file changes on disk (mtime/size) or the registry
+version is bumped via invalidate(). Counters expose load/reload/hit activity.
+With a compiled snapshot attached (see dataset_snapshot; DATASET_SNAPSHOT or
+data/datasets.snapshot), indexes whose source file is unchanged are loaded prebuilt from
+the mmap'd snapshot instead of parsing JSON and running the builder.
+"""
+import json
+import os
+import threading
+import warnings
+from typing import Any, Callable, Optional
+
+from agent.tools.dataset_snapshot import Snapshot, SnapshotError
+
+_DEFAULT_SNAPSHOT = os.path.join(os.path.dirname(__file__), "..", "..", "data", "datasets.snapshot")
+
+
+def _file_signature(path: str) -> Optional[tuple]:
+    """(mtime_ns, size) of the file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _read_json(path: str) -> dict:
+    """Parse a JSON dataset file; a missing file is treated as an empty dataset."""
+    if not os.path.isfile(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class DatasetRegistry:
+    """
+    Holds one index per registered dataset.
+    register(name, path, builder): builder(raw_json_dict) -> index (any object).
+    get(name) returns the cached index, rebuilding it if the file or version changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources: dict[str, tuple[str, Callable[[dict], Any]]] = {}
+        self._entries: dict[str, tuple[tuple, Any]] = {}
+        self._counters: dict[str, dict[str, int]] = {}
+        self._version = 0
+        self._snapshot: Optional[Snapshot] = None
+
+    def register(self, name: str, path: str, builder: Callable[[dict], Any]) -> None:
+        """Register (or re-register) a dataset. The index is built lazily on first get()."""
+        with self._lock:
+            self._sources[name] = (path, builder)
+            self._entries.pop(name, None)
+            self._counters.setdefault(name, {"loads": 0, "reloads": 0, "hits": 0, "snapshot_loads": 0})
+
+    def get(self, name: str) -> Any:
+        """Return the index for a registered dataset, building or rebuilding it when stale."""
+        try:
+            path, builder = self._sources[name]
+        except KeyError:
+            raise KeyError(f"Dataset '{name}' is not registered") from None
+
+        signature = (_file_signature(path), self._version)
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == signature:
+            self._counters[name]["hits"] += 1
+            return entry[1]
+
+        with self._lock:
+            # Another thread may have rebuilt it while we waited for the lock
+            signature = (_file_signature(path), self._version)
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == signature:
+                self._counters[name]["hits"] += 1
+                return entry[1]
+            index = self._snapshot.load(name, path) if self._snapshot is not None else None
+            if index is not None:
+                self._counters[name]["snapshot_loads"] += 1
+            else:
+                index = builder(_read_json(path))
+            self._entries[name] = (signature, index)
+            self._counters[name]["reloads" if entry is not None else "loads"] += 1
+            return index
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Force a rebuild on next get(): one dataset, or all of them (bumps the version)."""
+        with self._lock:
+            if name is None:
+                self._version += 1
+            else:
+                entry = self._entries.get(name)
+                if entry is not None:
+                    # Keep the entry so the rebuild is counted as a reload
+                    self._entries[name] = ((None, -1), entry[1])
+
+    def sources(self) -> dict[str, tuple[str, Callable[[dict], Any]]]:
+        """{ name: (path, builder) } for every registered dataset (input to build_snapshot)."""
+        with self._lock:
+            return dict(self._sources)
+
+    def attach_snapshot(self, path: Optional[str]) -> bool:
+        """
+        Serve indexes from a compiled snapshot (None detaches). Returns False, keeping the
+        JSON path, if the file cannot be used. Cached indexes are rebuilt on next get().
+        """
+        snapshot = None
+        if path is not None:
+            try:
+                snapshot = Snapshot(path)
+            except SnapshotError as e:
+                warnings.warn(f"dataset snapshot not used: {e}", RuntimeWarning, stacklevel=2)
+                return False
+        with self._lock:
+            self._snapshot = snapshot
+            self._version += 1
+        return snapshot is not None
+
+    @property
+    def snapshot_path(self) -> Optional[str]:
+        return self._snapshot.path if self._snapshot is not None else None
+
+    def stats(self) -> dict[str, Any]:
+        """Per-dataset load/reload/hit counters, the current registry version and the attached snapshot."""
+        return {
+            "version": self._version,
+            "snapshot": self.snapshot_path,
+            "datasets": {name: dict(c) for name, c in self._counters.items()},
+        }
+
+
+# Shared instance used by every tool module
+registry = DatasetRegistry()
+_snapshot_path = os.getenv("DATASET_SNAPSHOT") or _DEFAULT_SNAPSHOT
+if os.path.isfile(_snapshot_path):
+    registry.attach_snapshot(_snapshot_path)
@@ -0,0 +1,176 @@
+"""
+Compiled binary snapshot of the registry's built indexes, loaded with mmap.
+build_snapshot() runs every registered builder once, on JSON whose equal strings were
+interned into one object, and writes per dataset the built index pickled (protocol 5):
+each distinct string object is stored once (pickle memo) and loads back as one object,
+and numpy arrays are written out-of-band as raw, 64-byte-aligned buffers.
+Snapshot.load() unpickles an index with its arrays backed directly by the read-only mmap, so
+workers that map the same file share those pages, and a cold start skips JSON parsing and
+index builds. An entry is used only if its source file hash and the tool code fingerprint
+still match; otherwise the registry falls back to the JSON file.
+
+Layout (little-endian): 32-byte header (magic, format version, TOC offset/length), aligned
+regions, then a JSON table of contents. Snapshots are trusted build artifacts (pickle).
+"""
+import glob
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import time
+
+MAGIC = b"AFSNAP\x00\x00"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sII QQ")   # magic, format version, reserved, toc offset, toc length
+_ALIGN = 64
+_TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class SnapshotError(Exception):
+    """Snapshot file is missing, malformed, or from another format version."""
+
+
+def code_fingerprint():
+    """Hash of the tool sources: pickled indexes are only valid for the code that built them."""
+    h = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(_TOOLS_DIR, "*.py"))):
+        h.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def file_digest(path):
+    """(size, sha256 hex) of a file; (0, None) when it does not exist."""
+    if not os.path.isfile(path):
+        return 0, None
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return os.path.getsize(path), h.hexdigest()
+
+
+def _intern(value, table):
+    """Copy of a parsed JSON value with equal strings made one object (pickle then stores each once)."""
+    if type(value) is str:
+        return table.setdefault(value, value)
+    if type(value) is dict:
+        return {table.setdefault(k, k): _intern(v, table) for k, v in value.items()}
+    if type(value) is list:
+        return [_intern(v, table) for v in value]
+    return value
+
+
+class _Writer:
+    def __init__(self, f):
+        self.f = f
+
+    def region(self, data):
+        """Write data at the next aligned offset; returns [offset, length]."""
+        pad = -self.f.tell() % _ALIGN
+        self.f.write(b"\x00" * pad)
+        offset = self.f.tell()
+        self.f.write(data)
+        return [offset, len(memoryview(data).cast("B"))]
+
+
+def build_snapshot(sources, out_path, read_json):
+    """
+    Build every dataset and write the snapshot atomically to out_path.
+    sources: { name: (json path, builder) } as in DatasetRegistry.sources().
+    read_json: path -> raw dict (the registry's JSON reader). Returns the table of contents.
+    """
+    pickled = {}
+    for name, (path, builder) in sorted(sources.items()):
+        buffers = []
+        index = builder(_intern(read_json(path), {}))
+        blob = pickle.dumps(index, protocol=5, buffer_callback=buffers.append)
+        size, sha256 = file_digest(path)
+        pickled[name] = (os.path.basename(path), size, sha256, blob, [b.raw() for b in buffers])
+
+    tmp_path = f"{out_path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(b"\x00" * _HEADER.size)
+        w = _Writer(f)
+        toc = {
+            "format_version": FORMAT_VERSION,
+            "code_fingerprint": code_fingerprint(),
+            "created": time.time(),
+            "datasets": {},
+        }
+        for name, (source, size, sha256, blob, raw_buffers) in pickled.items():
+            toc["datasets"][name] = {
+                "source": source,
+                "size": size,
+                "sha256": sha256,
+                "pickle": w.region(blob),
+                "buffers": [w.region(b) for b in raw_buffers],
+            }
+        toc_bytes = json.dumps(toc).encode()
+        toc_offset = w.region(toc_bytes)[0]
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, toc_offset, len(toc_bytes)))
+    os.replace(tmp_path, out_path)
+    return toc
+
+
+class Snapshot:
+    """
+    Read-only view of a snapshot file. load(name, path) returns the prebuilt index for a
+    dataset, or None when the snapshot has no current entry for that source file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"cannot map {path}: {e}") from None
+        if len(self._mm) < _HEADER.size:
+            raise SnapshotError(f"{path} is not a dataset snapshot")
+        magic, version, _, toc_offset, toc_len = _HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path} is not a dataset snapshot")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"{path} has format version {version}, expected {FORMAT_VERSION}")
+        try:
+            self.toc = json.loads(self._mm[toc_offset:toc_offset + toc_len])
+        except ValueError:
+            raise SnapshotError(f"{path} has a corrupt table of contents") from None
+        self.current = self.toc.get("code_fingerprint") == code_fingerprint()
+
+        self._digests = {}   # path -> ((mtime_ns, size), sha256) of the last check
+
+    @property
+    def datasets(self):
+        return self.toc["datasets"]
+
+    def matches(self, name, path):
+        """True if the entry for name was built from the current contents of path by the current code."""
+        entry = self.datasets.get(name)
+        if entry is None or not self.current or os.path.basename(path) != entry["source"]:
+            return False
+        try:
+            st = os.stat(path)
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return entry["sha256"] is None
+        if st.st_size != entry["size"]:
+            return False
+        cached = self._digests.get(path)
+        if cached is None or cached[0] != signature:
+            cached = self._digests[path] = (signature, file_digest(path)[1])
+        return cached[1] == entry["sha256"]
+
+    def load(self, name, path):
+        if not self.matches(name, path):
+            return None
+        entry = self.datasets[name]
+        view = memoryview(self._mm)
+        buffers = [view[off:off + n] for off, n in entry["buffers"]]
+        off, n = entry["pickle"]
+        return pickle.loads(view[off:off + n], buffers=buffers)
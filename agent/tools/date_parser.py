@@ -0,0 +1,198 @@
+"""
+Deterministic date-range parser for appointment queries.
+Turns "next week", "Tuesday afternoon", "in 3 days", "March 5th" or "2025-03-01 to 2025-03-07"
+into { start, end (ISO dates), start_time, end_time ("HH:MM" or None) } anchored to a request
+clock, so the LLM does not have to do calendar arithmetic from the date in its prompt.
+
+The clock is a context variable: run_agent() pins it once per request (request_clock), tools
+called during that request resolve against the same "today".
+"""
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, timedelta
+
+_request_today = ContextVar("request_today", default=None)
+
+# No 3-letter weekday abbreviations: "sat", "wed" and "sun" are ordinary words in free text
+_WEEKDAYS = {name: i for i, names in enumerate((
+    ("monday",), ("tuesday", "tues"), ("wednesday",), ("thursday", "thurs"),
+    ("friday",), ("saturday",), ("sunday",),
+)) for name in names}
+_MONTHS = {name: i + 1 for i, names in enumerate((
+    ("january", "jan"), ("february", "feb"), ("march", "mar"), ("april", "apr"), ("may",), ("june", "jun"),
+    ("july", "jul"), ("august", "aug"), ("september", "sep", "sept"), ("october", "oct"),
+    ("november", "nov"), ("december", "dec"),
+)) for name in names}
+_PARTS_OF_DAY = {
+    "morning": ("00:00", "12:00"),
+    "afternoon": ("12:00", "17:00"),
+    "evening": ("17:00", "24:00"),
+}
+_NUMBERS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+            "eight": 8, "nine": 9, "ten": 10}
+
+_ISO = r"\d{4}-\d{2}-\d{2}"
+_WD = "|".join(sorted(_WEEKDAYS, key=len, reverse=True))
+_MON = "|".join(sorted(_MONTHS, key=len, reverse=True))
+_NUM = r"\d+|" + "|".join(_NUMBERS)
+# A number followed by one of these counts something ("I may 3 times a day"), it is not a day
+_COUNT_WORDS = (r"times?|x|pills?|tablets?|tabs?|capsules?|caps?|doses?|puffs?|drops?|units?|mg|mcg|ml"
+                r"|hours?|hrs?|minutes?|mins?|days?|weeks?|months?|years?|more|or\s+more")
+
+# Alternatives are tried left to right at each position; longer forms come first
+_EXPRESSION_RE = re.compile(
+    rf"\b(?:"
+    rf"(?:between\s+)?(?P<iso_a>{_ISO})\s*(?:to|through|until|-|and)\s*(?P<iso_b>{_ISO})"
+    rf"|(?P<iso>{_ISO})"
+    rf"|(?P<md_month>{_MON})\.?\s+(?P<md_day>\d{{1,2}})(?:st|nd|rd|th)?\b(?!\s+(?:{_COUNT_WORDS})\b)"
+    rf"|(?P<dm_day>\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<dm_month>{_MON})\b"
+    rf"|(?P<rel_day>day after tomorrow|today|tonight|tomorrow)"
+    rf"|(?P<week_which>this|next)\s+(?P<week_unit>weekend|week|month)\b"
+    rf"|(?:(?P<span_pre>in|within|over|for)\s+)?(?:the\s+)?(?P<span_next>next\s+)?(?P<span_n>{_NUM})\s+(?P<span_unit>days?|weeks?)\b"
+    rf"|(?:(?P<wd_which>this|next|coming)\s+)?(?P<wd>{_WD})\b"
+    rf")"
+    rf"(?:\s+(?:in\s+the\s+)?(?P<part>morning|afternoon|evening))?",
+    re.I,
+)
+_PART_ONLY_RE = re.compile(r"\b(?:this\s+)?(?P<part>morning|afternoon|evening)\b", re.I)
+# Phrases that are only an ISO date or ISO range, i.e. nothing relative to resolve
+_ISO_PHRASE_RE = re.compile(rf"(?:between\s+)?{_ISO}(?:\s*(?:to|through|until|-|and)\s*{_ISO})?", re.I)
+
+
+def today():
+    """The request's 'today' if one is pinned, else the system date."""
+    return _request_today.get() or date.today()
+
+
+@contextmanager
+def request_clock(day=None):
+    """Pin 'today' for everything resolved during one request (defaults to the current date)."""
+    token = _request_today.set(day or date.today())
+    try:
+        yield _request_today.get()
+    finally:
+        _request_today.reset(token)
+
+
+def _month_end(d):
+    nxt = (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return nxt - timedelta(days=1)
+
+
+def _month_day(anchor, month, day):
+    """Next occurrence of month/day on or after anchor (rolls into next year once passed)."""
+    try:
+        d = date(anchor.year, month, day)
+        if d < anchor:
+            d = date(anchor.year + 1, month, day)
+    except ValueError:
+        return None
+    return d
+
+
+def _resolve(m, anchor):
+    """(start, end) dates for one regex match, or None if it does not denote a valid date."""
+    g = m.groupdict()
+    if g["iso_a"]:
+        try:
+            a, b = date.fromisoformat(g["iso_a"]), date.fromisoformat(g["iso_b"])
+        except ValueError:
+            return None
+        return (a, b) if a <= b else (b, a)
+    if g["iso"]:
+        try:
+            d = date.fromisoformat(g["iso"])
+        except ValueError:
+            return None
+        return d, d
+    if g["md_month"] or g["dm_month"]:
+        month = _MONTHS[(g["md_month"] or g["dm_month"]).lower()]
+        d = _month_day(anchor, month, int(g["md_day"] or g["dm_day"]))
+        return (d, d) if d else None
+    if g["rel_day"]:
+        offset = {"today": 0, "tonight": 0, "tomorrow": 1, "day after tomorrow": 2}[g["rel_day"].lower()]
+        d = anchor + timedelta(days=offset)
+        return d, d
+    if g["week_unit"]:
+        which, unit = g["week_which"].lower(), g["week_unit"].lower()
+        if unit == "month":
+            if which == "this":
+                return anchor, _month_end(anchor)
+            first = _month_end(anchor) + timedelta(days=1)
+            return first, _month_end(first)
+        monday = anchor - timedelta(days=anchor.weekday())
+        if which == "next":
+            monday += timedelta(days=7)
+        if unit == "weekend":
+            return max(anchor, monday + timedelta(days=5)), monday + timedelta(days=6)
+        return max(anchor, monday), monday + timedelta(days=6)
+    if g["span_unit"]:
+        raw = g["span_n"].lower()
+        n = _NUMBERS[raw] if raw in _NUMBERS else int(raw)
+        days = n * (7 if g["span_unit"].lower().startswith("week") else 1)
+        if (g["span_pre"] or "").lower() == "in" and not g["span_next"]:
+            d = anchor + timedelta(days=days)  # "in 3 days": that day
+            return d, d
+        # "within 2 weeks", "next 5 days": a window starting today
+        return anchor, anchor + timedelta(days=max(days - 1, 0) if g["span_next"] else days)
+    if g["wd"]:
+        target = _WEEKDAYS[g["wd"].lower()]
+        delta = (target - anchor.weekday()) % 7
+        if (g["wd_which"] or "").lower() == "next":
+            # "next tuesday" = the Tuesday of next week
+            monday_next = anchor - timedelta(days=anchor.weekday()) + timedelta(days=7)
+            d = monday_next + timedelta(days=target)
+        else:
+            d = anchor + timedelta(days=delta)
+        return d, d
+    return None
+
+
+def is_iso_phrase(phrase):
+    """True for "2025-03-01" or "2025-03-01 to 2025-03-07": explicit dates, no relative words."""
+    return bool(phrase) and _ISO_PHRASE_RE.fullmatch(phrase.strip()) is not None
+
+
+def _result(start, end, part, phrase):
+    times = _PARTS_OF_DAY.get((part or "").lower(), (None, None))
+    return {"start": start.isoformat(), "end": end.isoformat(),
+            "start_time": times[0], "end_time": times[1], "phrase": phrase}
+
+
+def find_date_ranges(text, anchor=None):
+    """Every date expression in free text, resolved: [{ start, end, start_time, end_time, phrase }]."""
+    if not text or not isinstance(text, str):
+        return []
+    anchor = anchor or today()
+    out = []
+    for m in _EXPRESSION_RE.finditer(text):
+        span = _resolve(m, anchor)
+        if span is not None:
+            out.append(_result(span[0], span[1], m.group("part"), m.group(0).strip()))
+    if not out:
+        m = _PART_ONLY_RE.search(text)
+        if m:  # "afternoon" alone means today
+            out.append(_result(anchor, anchor, m.group("part"), m.group(0).strip()))
+    return out
+
+
+def parse_date_range(text, anchor=None):
+    """
+    Resolve a date_range argument to { start, end, start_time, end_time, phrase }, or None.
+    Several expressions ("Monday to Wednesday") span from the first start to the last end.
+    """
+    found = find_date_ranges(text, anchor)
+    if not found:
+        return None
+    if len(found) == 1:
+        return found[0]
+    first, last = found[0], found[-1]
+    if last["start"] < first["start"]:
+        # "monday to wednesday": the second end is the next one on or after the first start
+        later = find_date_ranges(last["phrase"], date.fromisoformat(first["start"]))
+        if later:
+            last = later[0]
+    start, end = min(first["start"], last["start"]), max(first["end"], last["end"])
+    return {"start": start, "end": end, "start_time": first["start_time"] or last["start_time"],
+            "end_time": first["end_time"] or last["end_time"], "phrase": text.strip()}
@@ -1,27 +1,127 @@
 """
 Hero tool: check drug–drug interactions from a curated static dataset.
 PRE_SEARCH: curated static dataset for sprint; production = API (e.g. RxNorm/FDA).
+Lookup is tiered: the curated pair index answers first; live openFDA only fills gaps.
 TDD: make tests in tests/unit/test_drug_interaction_check.py pass.
 """
-import json
 import os
-import urllib.request
-import urllib.parse
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 
+from agent.tools.dataset_registry import registry
+from agent.tools.fda_cache import get_fda_cache
+from agent.tools.fda_client import get_fda_client
+from agent.tools.medication_names import resolve_medications
 from agent.tools.schemas import tool_result
 
 # Path to curated dataset (relative to project root)
 _DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "drug_interactions.json")
 
 _severity_order = ("none", "minor", "major", "contraindicated")
+_severity_rank = {sev: i for i, sev in enumerate(_severity_order)}
 
-def _load_dataset():
-    """Load and return the curated drug-interaction pairs. Cached in memory."""
-    if not os.path.isfile(_DATA_PATH):
-        return []
-    with open(_DATA_PATH, encoding="utf-8") as f:
-        data = json.load(f)
-    return data.get("pairs", [])
+# Pair checks fan out on a shared bounded pool; the whole fan-out for one request
+# must finish within the deadline or the stragglers are dropped (reported as incomplete).
+_FDA_MAX_WORKERS = int(os.getenv("FDA_MAX_WORKERS", "32"))
+_FDA_REQUEST_DEADLINE = float(os.getenv("FDA_REQUEST_DEADLINE", "5.0"))
+# Below this much remaining budget the live tier is skipped rather than started
+_FDA_MIN_BUDGET = 0.25
+# _check_fda_pairs result for a pair whose check timed out or raised: not checked, unlike None
+FDA_INCOMPLETE = "incomplete"
+_fda_executor = ThreadPoolExecutor(max_workers=_FDA_MAX_WORKERS, thread_name_prefix="openfda")
+
+def _build_index(data):
+    """
+    Build from the curated data:
+      pairs:          (drug1, drug2) -> { severity, description }   (exact-name rules)
+      adjacency:      drug -> set of drugs it interacts with (for graph mode)
+      drug_classes:   drug -> frozenset of classes it belongs to
+      class_partners: class -> set of classes it has a rule with
+      class_rules:    (class1, class2) -> { severity, description }
+    Class rules (e.g. nsaid x anticoagulant) are never expanded into drug pairs;
+    queries resolve them from the membership table with set intersections.
+    """
+    lookup = {}
+    adjacency = {}
+    for item in data.get("pairs", []):
+        drugs = item.get("drugs", [])
+        if len(drugs) >= 2:
+            key = _pair_key(drugs[0], drugs[1])
+            lookup[key] = {
+                "severity": item.get("severity", "minor"),
+                "description": item.get("description", ""),
+            }
+            adjacency.setdefault(key[0], set()).add(key[1])
+            adjacency.setdefault(key[1], set()).add(key[0])
+
+    drug_classes = {}
+    for cls, members in data.get("classes", {}).items():
+        for drug in members:
+            drug_classes.setdefault(_normalize(drug), set()).add(_normalize(cls))
+    drug_classes = {drug: frozenset(classes) for drug, classes in drug_classes.items()}
+
+    class_rules = {}
+    class_partners = {}
+    for rule in data.get("class_rules", []):
+        classes = rule.get("classes", [])
+        if len(classes) >= 2:
+            key = _pair_key(classes[0], classes[1])
+            class_rules[key] = {
+                "severity": rule.get("severity", "minor"),
+                "description": rule.get("description", ""),
+            }
+            class_partners.setdefault(key[0], set()).add(key[1])
+            class_partners.setdefault(key[1], set()).add(key[0])
+
+    return {
+        "pairs": lookup,
+        "adjacency": adjacency,
+        "drug_classes": drug_classes,
+        "class_partners": class_partners,
+        "class_rules": class_rules,
+    }
+
+def _class_hits(meds, index):
+    """
+    Resolve class-level rules for a medication list.
+    Groups the listed drugs by class, intersects each present class's rule partners with
+    the classes present, and only then pairs up members: work scales with actual hits,
+    not with n^2 pairs x rules. Pairs with an exact-name rule are left to that rule.
+    Returns (drug1, drug2) -> { severity, description, classes }, highest severity kept.
+    """
+    drug_classes = index["drug_classes"]
+    if not drug_classes:
+        return {}
+    members = {}
+    for drug in meds:
+        for cls in drug_classes.get(drug, ()):
+            members.setdefault(cls, []).append(drug)
+    if not members:
+        return {}
+
+    class_partners, class_rules, exact = index["class_partners"], index["class_rules"], index["pairs"]
+    present = members.keys()
+    hits = {}
+    for cls in members:
+        for other in class_partners.get(cls, set()) & present:
+            if other < cls:
+                continue  # each class pair once
+            rule = class_rules[(cls, other)]
+            for a in members[cls]:
+                for b in members[other]:
+                    if a == b:
+                        continue
+                    key = _pair_key(a, b)
+                    if key in exact:
+                        continue
+                    current = hits.get(key)
+                    if current is None or _severity_rank.get(rule["severity"], 0) > _severity_rank.get(current["severity"], 0):
+                        hits[key] = {**rule, "classes": [cls, other]}
+    return hits
+
+def _get_index():
+    """Curated pair index, loaded once per process via the dataset registry."""
+    return registry.get("drug_interactions")
 
 def _normalize(name):
     """Normalize medication name for lookup (lowercase, strip)."""
@@ -36,86 +136,226 @@ def _pair_key(drug_a, drug_b):
         return (a, b)
     return (b, a)
 
-def _check_fda_api(drug_a, drug_b):
+def _fetch_fda(drug_a, drug_b):
     """
-    Check the live openFDA API for interactions between two drugs.
-    Returns (severity, description) if found, else None.
+    Query the live openFDA API for interactions between two drugs.
+    Returns (severity, description) if found, None if openFDA answered with no match.
+    Raises (FDAUnavailable) on open circuit, network errors, timeouts and 5xx,
+    so callers never cache a failed lookup.
     """
     query = f'drug_interactions:"{drug_a}" AND drug_interactions:"{drug_b}"'
-    url = f'https://api.fda.gov/drug/label.json?search={urllib.parse.quote(query)}&limit=1'
+    data = get_fda_client().search(query, limit=1)
+    if data is None:
+        return None
+    if 'results' in data and len(data['results']) > 0 and 'drug_interactions' in data['results'][0]:
+        description = data['results'][0]['drug_interactions'][0]
+        # Keep the description somewhat brief
+        if len(description) > 400:
+            description = description[:397] + "..."
+        # If they are flagged together on an FDA label, we consider it a major interaction
+        return "major", f"(Source: Live openFDA API) {description}"
+    return None
+
+def _check_fda_api(drug_a, drug_b):
+    """
+    Check openFDA for interactions between two drugs, through the persistent response cache.
+    Returns (severity, description) if found, None if openFDA answered with no match, or
+    FDA_INCOMPLETE if it could not answer (open circuit, network error, timeout, 5xx/429):
+    an outage must show up as an unchecked pair, never as "no interaction".
+    """
+    cache = get_fda_cache()
+    key = _pair_key(drug_a, drug_b)
+    if cache is not None:
+        hit, value = cache.get(key)
+        if hit:
+            return value
     try:
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req, timeout=3.0) as response:
-            data = json.loads(response.read().decode())
-            if 'results' in data and len(data['results']) > 0 and 'drug_interactions' in data['results'][0]:
-                description = data['results'][0]['drug_interactions'][0]
-                # Keep the description somewhat brief
-                if len(description) > 400:
-                    description = description[:397] + "..."
-                # If they are flagged together on an FDA label, we consider it a major interaction
-                return "major", f"(Source: Live openFDA API) {description}"
+        result = _fetch_fda(drug_a, drug_b)
     except Exception:
-        pass # Fallback to local dataset on any network error or 404
-    return None
+        return FDA_INCOMPLETE  # not cached: the next request asks openFDA again
+    if cache is not None:
+        cache.set(key, result)
+    return result
+
+
+registry.register("drug_interactions", _DATA_PATH, _build_index)
 
-def _lookup_interactions(medications):
+
+def _check_fda_pairs(pairs, deadline=None):
     """
-    Look up all pairs in the medication list against the dataset/live API.
-    Returns (list of interaction dicts, overall severity).
+    Run _check_fda_api for every (drug_a, drug_b) pair concurrently on the shared pool.
+    Returns a list aligned with pairs: (severity, description), None when no interaction
+    was found, or FDA_INCOMPLETE when openFDA could not answer, the check raised, or it did
+    not finish before the per-request deadline.
     """
-    pairs_data = _load_dataset()
-    # Build lookup: (drug1, drug2) -> { severity, description }
-    lookup = {}
-    for item in pairs_data:
-        drugs = item.get("drugs", [])
-        if len(drugs) >= 2:
-            key = _pair_key(drugs[0], drugs[1])
-            lookup[key] = {
-                "severity": item.get("severity", "minor"),
-                "description": item.get("description", ""),
-            }
+    if not pairs:
+        return []
+    deadline = _FDA_REQUEST_DEADLINE if deadline is None else deadline
+    futures = [_fda_executor.submit(_check_fda_api, d1, d2) for d1, d2 in pairs]
+    wait(futures, timeout=max(0.0, deadline))
 
-    interactions = []
-    meds = [_normalize(m) for m in medications if _normalize(m)]
-    if len(meds) < 2:
-        return [], "none"
-
-    for i in range(len(meds)):
-        for j in range(i + 1, len(meds)):
-            d1, d2 = meds[i], meds[j]
-            key = _pair_key(d1, d2)
-            
-            # 1. Try Live FDA API
-            api_result = _check_fda_api(d1, d2)
-            
-            if api_result:
-                interactions.append({
-                    "drugs": [d1, d2],
-                    "severity": api_result[0],
-                    "description": api_result[1],
-                })
-
-    if not interactions:
-        return [], "none"
-        
-    # Overall severity = max severity among interactions
-    severities = [s["severity"] for s in interactions]
+    results = []
+    for fut in futures:
+        if fut.done() and not fut.cancelled() and fut.exception() is None:
+            results.append(fut.result())
+        else:
+            fut.cancel()  # never started: free the pool slot for the next request
+            results.append(FDA_INCOMPLETE)
+    return results
+
+
+def _interaction(pair, hit, tier):
+    """Interaction dict for the response; class-rule hits also name the matched classes."""
+    out = {
+        "drugs": [pair[0], pair[1]],
+        "severity": hit["severity"],
+        "description": hit["description"],
+        "tier": tier,
+    }
+    if "classes" in hit:
+        out["classes"] = hit["classes"]
+    return out
+
+
+def _overall_severity(interactions):
+    """Overall severity = max severity among interactions ("none" if empty)."""
+    severities = {s["severity"] for s in interactions}
     overall = "none"
     for sev in _severity_order:
         if sev in severities:
             overall = sev
-    return interactions, overall
+    return overall
+
+
+def _tiered_lookup(medications, latency_budget=None):
+    """
+    Resolve every medication pair through the lookup tiers:
+      1. "local": the curated pair index, O(1) per pair, plus class-level rules; no network.
+      2. "fda":   live openFDA (via the response cache), only for pairs the curated set
+                  does not cover, and only if the remaining latency budget allows.
+    Returns (interactions in pair order, each tagged with its tier; per-tier pair counts;
+    unchecked pairs). "fda" counts only FDA checks that finished; "fda_incomplete" counts
+    those that timed out or errored and "skipped" those never sent for lack of budget.
+    Both kinds are listed in unchecked as { drugs, reason } so "no interaction" is never
+    inferred for a pair nobody checked.
+    """
+    started = time.monotonic()
+    budget = _FDA_REQUEST_DEADLINE if latency_budget is None else latency_budget
+    tiers = {"local": 0, "fda": 0, "fda_incomplete": 0, "skipped": 0}
+    unchecked = []
+
+    meds = list(dict.fromkeys(m for m in resolve_medications(medications)[0] if m))
+    pairs = [(meds[i], meds[j]) for i in range(len(meds)) for j in range(i + 1, len(meds))]
+    if not pairs:
+        return [], tiers, unchecked
+
+    # 1. Local tier: exact-name pairs, then class-level rules resolved for the whole list
+    index = _get_index()
+    lookup = index["pairs"]
+    class_hits = _class_hits(meds, index)
+    answers = {}
+    uncovered = []
+    for pair in pairs:
+        key = _pair_key(*pair)
+        local = lookup.get(key) or class_hits.get(key)
+        if local is not None:
+            answers[pair] = (local, "local")
+        else:
+            uncovered.append(pair)
+    tiers["local"] = len(pairs) - len(uncovered)
+
+    # 2. Live FDA tier for the rest, concurrently, within what is left of the budget
+    remaining = budget - (time.monotonic() - started)
+    if uncovered and remaining >= _FDA_MIN_BUDGET:
+        for pair, api_result in zip(uncovered, _check_fda_pairs(uncovered, deadline=remaining)):
+            if api_result is FDA_INCOMPLETE:
+                tiers["fda_incomplete"] += 1
+                unchecked.append({"drugs": [pair[0], pair[1]], "reason": "fda_incomplete"})
+                continue
+            tiers["fda"] += 1
+            if api_result:
+                answers[pair] = ({"severity": api_result[0], "description": api_result[1]}, "fda")
+    else:
+        tiers["skipped"] = len(uncovered)
+        unchecked.extend({"drugs": [a, b], "reason": "skipped"} for a, b in uncovered)
+
+    # Merge in pair order so output is stable regardless of which tier answered
+    interactions = []
+    for pair in pairs:
+        if pair in answers:
+            hit, tier = answers[pair]
+            interactions.append(_interaction(pair, hit, tier))
+    return interactions, tiers, unchecked
 
 
-def drug_interaction_check(medications):
+def _lookup_interactions(medications, latency_budget=None):
+    """
+    Look up all pairs in the medication list against the dataset/live API.
+    Returns (list of interaction dicts, overall severity).
+    """
+    interactions, _, _ = _tiered_lookup(medications, latency_budget=latency_budget)
+    return interactions, _overall_severity(interactions)
+
+
+def _interaction_graph(medications):
+    """
+    Polypharmacy mode: walk the adjacency index instead of enumerating every pair.
+    Each drug only visits partners it can interact with that are also on the list,
+    so the cost is roughly O(n + k) for n medications and k actual interactions.
+    Class-level rules are added via _class_hits. Returns (interactions, by_drug, tiers) where
+    by_drug groups each interacting drug's partners with a severity rollup and
+    tiers["skipped"] counts the pairs the curated data does not cover.
+    Curated (local) data only: no network, so those pairs are left unchecked.
+    """
+    index = _get_index()
+    lookup, adjacency = index["pairs"], index["adjacency"]
+    meds = list(dict.fromkeys(m for m in resolve_medications(medications)[0] if m))
+    present = set(meds)
+
+    edges = []
+    for drug in meds:
+        partners = adjacency.get(drug)
+        if not partners:
+            continue
+        for other in sorted(partners & present):
+            if other > drug:  # each undirected edge is emitted once, from its smaller endpoint
+                edges.append(((drug, other), lookup[(drug, other)]))
+    edges.extend(sorted(_class_hits(meds, index).items()))
+
+    interactions = []
+    by_drug = {}
+    for (drug, other), hit in edges:
+        severity = hit["severity"]
+        interactions.append(_interaction((drug, other), hit, "local"))
+        for a, b in ((drug, other), (other, drug)):
+            group = by_drug.get(a)
+            if group is None:
+                group = by_drug[a] = {"severity": "none", "interacts_with": []}
+            group["interacts_with"].append({"drug": b, "severity": severity})
+            if _severity_rank.get(severity, 0) > _severity_rank[group["severity"]]:
+                group["severity"] = severity
+
+    for group in by_drug.values():
+        group["interaction_count"] = len(group["interacts_with"])
+    total = len(meds) * (len(meds) - 1) // 2
+    tiers = {"local": len(edges), "fda": 0, "fda_incomplete": 0, "skipped": total - len(edges)}
+    return interactions, by_drug, tiers
+
+
+def drug_interaction_check(medications, mode=None):
     """
     Check for interactions between a list of medications.
-    Returns { success, data: { interactions, severity }?, error? }.
+    mode: "pairs" (tiered local + live FDA per pair) or "graph" (curated adjacency index,
+    grouped per drug; opt-in, as pairs outside the curated set go unchecked and are counted
+    in pairs_by_tier.skipped).
+    Returns { success, data: { interactions, severity, unchecked_pairs?, note? }?, error? }.
     """
     if medications is None:
         return tool_result(success=False, error="medications must be a list")
     if not isinstance(medications, list):
         return tool_result(success=False, error="medications must be a list")
+    if mode not in (None, "pairs", "graph"):
+        return tool_result(success=False, error="mode must be 'pairs' or 'graph'")
 
     if len(medications) == 0:
         return tool_result(
@@ -128,13 +368,38 @@ def drug_interaction_check(medications):
         },
         )
 
-    interactions, severity = _lookup_interactions(medications)
-    return tool_result(
-        success=True,
-        data={
+    # Brand names, doses and misspellings resolved to generics; echoed back so the LLM
+    # can see what was matched instead of retrying with a new spelling
+    _, resolved_names = resolve_medications(medications)
+
+    if mode == "graph":
+        interactions, by_drug, tiers = _interaction_graph(medications)
+        data = {
+            "mode": "graph",
             "interactions": interactions,
-            "severity": severity,
+            "severity": _overall_severity(interactions),
+            "by_drug": by_drug,
+            "pairs_by_tier": tiers,
             "can_diagnose": False,
             "requires_provider_consultation": True
-        },
-    )
+        }
+        if tiers["skipped"]:
+            data["note"] = (f"{tiers['skipped']} medication pair(s) are not in the curated data and were not "
+                            "checked in graph mode; use mode 'pairs' to check them against openFDA.")
+    else:
+        interactions, tiers, unchecked = _tiered_lookup(medications)
+        data = {
+            "interactions": interactions,
+            "severity": _overall_severity(interactions),
+            "pairs_by_tier": tiers,
+            "can_diagnose": False,
+            "requires_provider_consultation": True
+        }
+        if unchecked:
+            # severity covers checked pairs only; say so rather than imply "none" for the rest
+            data["unchecked_pairs"] = unchecked
+            data["note"] = (f"{len(unchecked)} medication pair(s) could not be checked "
+                            "(openFDA timed out, failed or was skipped); their interactions are unknown.")
+    if resolved_names:
+        data["resolved_names"] = resolved_names
+    return tool_result(success=True, data=data)
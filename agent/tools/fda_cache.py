@@ -0,0 +1,152 @@
+"""
+Persistent openFDA response cache (SQLite), keyed by the normalized drug pair.
+Stores both hits ("interaction found") and definitive misses ("no interaction found")
+with separate TTLs. The file is shared by every uvicorn worker (WAL mode) and
+survives restarts. Hit/miss/eviction counters are per process; size is global.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+_DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "fda_cache.sqlite3")
+POSITIVE_TTL = float(os.getenv("FDA_CACHE_TTL", str(7 * 24 * 3600)))
+NEGATIVE_TTL = float(os.getenv("FDA_CACHE_NEGATIVE_TTL", str(24 * 3600)))
+MAX_ENTRIES = int(os.getenv("FDA_CACHE_MAX_ENTRIES", "100000"))
+
+# How many writes between capacity checks (COUNT(*) is not free on a big table)
+_TRIM_EVERY = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fda_cache (
+    pair TEXT PRIMARY KEY,
+    found INTEGER NOT NULL,
+    severity TEXT,
+    description TEXT,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fda_cache_created ON fda_cache (created_at);
+"""
+
+
+def _pair_to_text(pair) -> str:
+    """Serialize an order-independent (drug_a, drug_b) key for the primary key column."""
+    return "|".join(pair)
+
+
+class FDACache:
+    """
+    get(pair) -> (hit, value): value is (severity, description) for a cached interaction,
+    or None for a cached "no interaction found". set(pair, value) stores either kind.
+    """
+
+    def __init__(self, path: str, positive_ttl: float = POSITIVE_TTL,
+                 negative_ttl: float = NEGATIVE_TTL, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._local = threading.local()  # one connection per thread (fan-out runs on a pool)
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "negative_hits": 0, "writes": 0, "evictions": 0}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def get(self, pair) -> tuple[bool, Optional[tuple[str, str]]]:
+        key = _pair_to_text(pair)
+        row = self._conn().execute(
+            "SELECT found, severity, description, expires_at FROM fda_cache WHERE pair = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self._count("misses")
+            return False, None
+        found, severity, description, expires_at = row
+        if expires_at <= time.time():
+            self._conn().execute("DELETE FROM fda_cache WHERE pair = ? AND expires_at <= ?", (key, time.time()))
+            self._count("evictions")
+            self._count("misses")
+            return False, None
+        self._count("hits")
+        if not found:
+            self._count("negative_hits")
+            return True, None
+        return True, (severity, description)
+
+    def set(self, pair, value: Optional[tuple[str, str]]) -> None:
+        now = time.time()
+        ttl = self.positive_ttl if value else self.negative_ttl
+        severity, description = value if value else (None, None)
+        self._conn().execute(
+            "INSERT OR REPLACE INTO fda_cache (pair, found, severity, description, created_at, expires_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (_pair_to_text(pair), 1 if value else 0, severity, description, now, now + ttl),
+        )
+        self._count("writes")
+        if self._counters["writes"] % _TRIM_EVERY == 0:
+            self.trim()
+
+    def trim(self) -> int:
+        """Drop expired rows, then the oldest rows beyond max_entries. Returns rows removed."""
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM fda_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        overflow = self.size() - self.max_entries
+        if overflow > 0:
+            removed += conn.execute(
+                "DELETE FROM fda_cache WHERE pair IN "
+                "(SELECT pair FROM fda_cache ORDER BY created_at LIMIT ?)",
+                (overflow,),
+            ).rowcount
+        if removed:
+            self._count("evictions", removed)
+        return removed
+
+    def size(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM fda_cache").fetchone()[0]
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM fda_cache")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 4) if lookups else 0.0
+        counters["size"] = self.size()
+        counters["path"] = self.path
+        return counters
+
+
+_cache: Optional[FDACache] = None
+_cache_lock = threading.Lock()
+
+
+def get_fda_cache() -> Optional[FDACache]:
+    """
+    Process-wide cache instance. Path from FDA_CACHE_PATH (default data/fda_cache.sqlite3);
+    set FDA_CACHE_PATH to an empty string to disable caching.
+    """
+    global _cache
+    if _cache is not None:
+        return _cache
+    path = os.getenv("FDA_CACHE_PATH", _DEFAULT_PATH)
+    if not path:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = FDACache(path)
+    return _cache
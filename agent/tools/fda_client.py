@@ -0,0 +1,238 @@
+"""
+openFDA HTTP client: pooled keep-alive connections plus a circuit breaker.
+During an outage the breaker opens after N failures/timeouts inside a rolling window
+and calls fail fast instead of each waiting out the full timeout; after a cool-down a
+single half-open probe decides whether to close it again. metrics() reports state.
+Failing fast raises FDAUnavailable; drug_interaction_check reports those pairs as
+unchecked (fda_incomplete), so an open breaker is visible in the response, not hidden.
+"""
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+import urllib.parse
+from collections import deque
+from typing import Any, Optional
+
+DEFAULT_BASE_URL = "https://api.fda.gov/drug/label.json"
+
+
+class FDAUnavailable(Exception):
+    """Raised when the circuit is open (or the request failed) and openFDA should be skipped."""
+
+
+class CircuitBreaker:
+    """
+    closed -> open after failure_threshold failures within window seconds.
+    open -> half_open once reset_timeout has elapsed; one probe call is let through.
+    half_open -> closed on probe success, back to open on probe failure.
+    """
+
+    def __init__(self, failure_threshold: int = 5, window: float = 30.0, reset_timeout: float = 15.0):
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = deque()
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._counters = {"successes": 0, "failures": 0, "short_circuited": 0, "times_opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == "open" and now - self._opened_at >= self.reset_timeout:
+            self._state = "half_open"
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now. Counts a short-circuit when it may not."""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._counters["short_circuited"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._counters["successes"] += 1
+            if self._state == "half_open":
+                self._state = "closed"
+                self._failures.clear()
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._counters["failures"] += 1
+            if self._state == "half_open":
+                self._trip(now)
+                return
+            self._failures.append(now)
+            while self._failures and now - self._failures[0] > self.window:
+                self._failures.popleft()
+            if self._state == "closed" and len(self._failures) >= self.failure_threshold:
+                self._trip(now)
+
+    def _trip(self, now: float) -> None:
+        self._state = "open"
+        self._opened_at = now
+        self._probe_in_flight = False
+        self._failures.clear()
+        self._counters["times_opened"] += 1
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            return {
+                "state": state,
+                "recent_failures": len(self._failures),
+                "failure_threshold": self.failure_threshold,
+                "open_for_s": round(now - self._opened_at, 3) if state == "open" else 0.0,
+                **self._counters,
+            }
+
+
+class FDAClient:
+    """
+    Minimal keep-alive client for the openFDA label search endpoint.
+    search(query, limit) -> parsed JSON dict, or None when openFDA answers 404 ("No matches").
+    Raises FDAUnavailable on open circuit, network errors, timeouts and 5xx/429.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, timeout: float = 3.0,
+                 pool_size: int = 32, breaker: Optional[CircuitBreaker] = None):
+        parsed = urllib.parse.urlsplit(base_url)
+        self._https = parsed.scheme == "https"
+        self._host = parsed.hostname
+        self._port = parsed.port
+        self._path = parsed.path or "/"
+        self.base_url = base_url
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "connections_opened": 0, "connections_reused": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        """Return (connection, reused): an idle keep-alive connection if any, else a new one."""
+        try:
+            conn = self._idle.get_nowait()
+            self._count("connections_reused")
+            return conn, True
+        except queue.Empty:
+            pass
+        cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        self._count("connections_opened")
+        return cls(self._host, self._port, timeout=self.timeout), False
+
+    def _roundtrip(self, url: str) -> tuple[http.client.HTTPResponse, bytes]:
+        conn, reused = self._acquire()
+        try:
+            conn.request("GET", url, headers={"User-Agent": "Mozilla/5.0", "Connection": "keep-alive"})
+            response = conn.getresponse()
+            body = response.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not reused:
+                raise
+            # The server closed an idle keep-alive socket; retry once on a fresh connection
+            return self._roundtrip(url)
+        except Exception:
+            conn.close()
+            raise
+        self._release(conn, reusable=not response.will_close)
+        return response, body
+
+    def _release(self, conn: http.client.HTTPConnection, reusable: bool) -> None:
+        if reusable:
+            try:
+                self._idle.put_nowait(conn)
+                return
+            except queue.Full:
+                pass
+        conn.close()
+
+    def search(self, query: str, limit: int = 1) -> Optional[dict]:
+        if not self.breaker.allow():
+            raise FDAUnavailable("openFDA circuit is open")
+        self._count("requests")
+        url = f"{self._path}?search={urllib.parse.quote(query)}&limit={limit}"
+        try:
+            response, body = self._roundtrip(url)
+        except Exception as e:  # timeout, refused, reset
+            self.breaker.record_failure()
+            raise FDAUnavailable(f"openFDA request failed: {e}") from e
+
+        if response.status == 404:  # openFDA's "No matches found!"
+            self.breaker.record_success()
+            return None
+        if response.status >= 500 or response.status == 429:
+            self.breaker.record_failure()
+            raise FDAUnavailable(f"openFDA returned HTTP {response.status}")
+        self.breaker.record_success()
+        if response.status != 200:
+            raise FDAUnavailable(f"openFDA returned HTTP {response.status}")
+        return json.loads(body.decode())
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        counters["idle_connections"] = self._idle.qsize()
+        counters["breaker"] = self.breaker.metrics()
+        return counters
+
+
+_client: Optional[FDAClient] = None
+_client_lock = threading.Lock()
+
+
+def get_fda_client() -> FDAClient:
+    """Process-wide client. Endpoint from OPENFDA_API_URL; breaker tuning from FDA_BREAKER_* env vars."""
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            _client = FDAClient(
+                base_url=os.getenv("OPENFDA_API_URL", DEFAULT_BASE_URL),
+                pool_size=int(os.getenv("FDA_MAX_WORKERS", "32")),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(os.getenv("FDA_BREAKER_THRESHOLD", "5")),
+                    window=float(os.getenv("FDA_BREAKER_WINDOW", "30")),
+                    reset_timeout=float(os.getenv("FDA_BREAKER_RESET", "15")),
+                ),
+            )
+    return _client
+
+
+def set_fda_client(client: Optional[FDAClient]) -> None:
+    """Swap the process-wide client (tests, benchmarks, stub servers). None rebuilds from env."""
+    global _client
+    with _client_lock:
+        if _client is not None and _client is not client:
+            _client.close()
+        _client = client
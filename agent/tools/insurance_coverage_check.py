@@ -1,22 +1,44 @@
 """
-Insurance coverage check: mock for MVP. Returns whether a procedure is covered under a plan.
+Insurance coverage check: mock for MVP. Returns whether a procedure is covered under a plan,
+or, for bulk_coverage_check, whether each code of a claim is; covering_plans answers the
+reverse question (which plans cover a procedure) from the dense coverage matrix.
+With DATASET_BACKEND=sqlite the same queries run against the SQLite store instead.
 PRE_SEARCH: mock for sprint; production = OpenEMR billing / clearinghouse.
 """
-import json
 import os
 
+from agent.tools.coverage_matrix import COVERED, NOT_COVERED, CoverageMatrix
+from agent.tools.dataset_registry import registry
 from agent.tools.schemas import tool_result
+from agent.tools.sqlite_store import get_dataset_store
 
 _DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "insurance_coverage.json")
+_MAX_BULK_CODES = 100
+_NOT_FOUND = "No coverage information found for this procedure and plan."
 
 
-def _load_coverage():
-    """Load procedure_code + plan_id -> coverage from JSON."""
-    if not os.path.isfile(_DATA_PATH):
-        return []
-    with open(_DATA_PATH, encoding="utf-8") as f:
-        data = json.load(f)
-    return data.get("coverage", [])
+def _build_index(data):
+    """Build (procedure_code, plan_id) -> coverage row from JSON. First row wins on duplicates."""
+    index = {}
+    for row in data.get("coverage", []):
+        index.setdefault((row.get("procedure_code"), row.get("plan_id")), row)
+    return index
+
+
+def _build_matrix(data):
+    """Interned code/plan tables plus the procedure x plan status matrix."""
+    return CoverageMatrix.from_rows(data.get("coverage", []))
+
+
+registry.register("insurance_coverage", _DATA_PATH, _build_index)
+registry.register("insurance_coverage_matrix", _DATA_PATH, _build_matrix)
+
+
+def _coverage(row):
+    """{ covered, details } for the coverage row of one (procedure_code, plan_id) key, or None."""
+    if row is not None:
+        return {"covered": row.get("covered", False), "details": row.get("details")}
+    return {"covered": False, "details": _NOT_FOUND}
 
 
 def insurance_coverage_check(procedure_code=None, plan_id=None):
@@ -35,22 +57,90 @@ def insurance_coverage_check(procedure_code=None, plan_id=None):
 
     procedure_code = procedure_code.strip()
     plan_id = plan_id.strip()
-    coverage_list = _load_coverage()
-
-    for row in coverage_list:
-        if row.get("procedure_code") == procedure_code and row.get("plan_id") == plan_id:
-            return tool_result(
-                success=True,
-                data={
-                    "covered": row.get("covered", False),
-                    "details": row.get("details"),
-                },
-            )
+    store = get_dataset_store()
+    if store is not None:
+        row = store.coverage_row(procedure_code, plan_id)
+    else:
+        row = registry.get("insurance_coverage").get((procedure_code, plan_id))
+    return tool_result(success=True, data=_coverage(row))
+
+
+def bulk_coverage_check(codes=None, plan_id=None):
+    """
+    Check every procedure code of a claim against one plan in a single call.
+    Duplicate codes are answered once; results keep the order codes were given in.
+    Returns { success, data: { plan_id, results: [{ procedure_code, covered, details }],
+    covered_codes, not_covered_codes }?, error? }.
+    """
+    if plan_id is None:
+        return tool_result(success=False, error="plan_id is required")
+    if not isinstance(plan_id, str):
+        return tool_result(success=False, error="plan_id must be a string")
+    if not isinstance(codes, list) or not codes:
+        return tool_result(success=False, error="codes must be a non-empty list of procedure codes")
+    if len(codes) > _MAX_BULK_CODES:
+        return tool_result(success=False, error=f"at most {_MAX_BULK_CODES} codes per call")
+    if not all(isinstance(c, str) for c in codes):
+        return tool_result(success=False, error="each procedure code must be a string")
+
+    plan_id = plan_id.strip()
+    unique = list(dict.fromkeys(c.strip() for c in codes))
+    store = get_dataset_store()
+    if store is not None:
+        rows = store.coverage_rows(unique, plan_id)
+    else:
+        index = registry.get("insurance_coverage")
+        rows = {code: index.get((code, plan_id)) for code in unique}
+    results = []
+    covered, not_covered = [], []
+    for code in unique:
+        entry = _coverage(rows.get(code))
+        results.append({"procedure_code": code, **entry})
+        (covered if entry["covered"] else not_covered).append(code)
 
     return tool_result(
         success=True,
         data={
-            "covered": False,
-            "details": "No coverage information found for this procedure and plan.",
+            "plan_id": plan_id,
+            "results": results,
+            "covered_codes": covered,
+            "not_covered_codes": not_covered,
         },
     )
+
+
+def covering_plans(procedure_code=None):
+    """
+    Which plans cover a procedure: one vectorized row query on the coverage matrix.
+    Returns { success, data: { procedure_code, covered_plans: [{ plan_id, details }],
+    not_covered_plans, plans_known }?, error? }.
+    """
+    if procedure_code is None:
+        return tool_result(success=False, error="procedure_code is required")
+    if not isinstance(procedure_code, str):
+        return tool_result(success=False, error="procedure_code must be a string")
+
+    procedure_code = procedure_code.strip()
+    store = get_dataset_store()
+    if store is not None:
+        covered_rows, not_covered = store.plans_for(procedure_code)
+        covered = [{"plan_id": plan, "details": row.get("details")} for plan, row in covered_rows]
+        plans_known, known = store.plan_count(), bool(covered_rows or not_covered)
+    else:
+        matrix = registry.get("insurance_coverage_matrix")
+        index = registry.get("insurance_coverage")
+        covered = [
+            {"plan_id": plan, "details": index.get((procedure_code, plan), {}).get("details")}
+            for plan in matrix.plans_for(procedure_code, COVERED)
+        ]
+        not_covered = matrix.plans_for(procedure_code, NOT_COVERED)
+        plans_known, known = len(matrix.plans), matrix.has_code(procedure_code)
+    data = {
+        "procedure_code": procedure_code,
+        "covered_plans": covered,
+        "not_covered_plans": not_covered,
+        "plans_known": plans_known,
+    }
+    if not known:
+        data["details"] = "No coverage information found for this procedure under any plan."
+    return tool_result(success=True, data=data)
@@ -1,7 +1,11 @@
 """
 Lab result interpretation: compares patient lab values against standard reference ranges.
 Returns whether each value is normal, low, or high, along with reference ranges.
+classify_lab_batch / lab_result_batch_interpretation do the same for columnar input
+(test names + values arrays) with numpy comparisons, for population-scale jobs.
 """
+import numpy as np
+
 from agent.tools.schemas import tool_result
 
 # Standard reference ranges (adult, general)
@@ -30,6 +34,77 @@ def _normalize_key(key: str) -> str:
     if key in ["rbc", "red_blood_cells"]: return "hemoglobin" # Simplification
     return key
 
+# Batch status codes; BATCH_STATUSES[code] is the label
+BATCH_STATUSES = ("normal", "low", "high", "unknown", "error")
+_NORMAL, _LOW, _HIGH, _UNKNOWN, _ERROR = range(len(BATCH_STATUSES))
+
+# Reference ranges as arrays indexed by test id; the extra last slot is "no range" (unknown test)
+_TEST_IDS = {name: i for i, name in enumerate(REFERENCE_RANGES)}
+_RANGE_MIN = np.array([r["min"] for r in REFERENCE_RANGES.values()] + [-np.inf])
+_RANGE_MAX = np.array([r["max"] for r in REFERENCE_RANGES.values()] + [np.inf])
+_NO_RANGE = len(REFERENCE_RANGES)
+
+
+def _float_column(values):
+    """values as float64; entries that do not parse as numbers become NaN."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (ValueError, TypeError):
+        out = np.empty(len(values), dtype=np.float64)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except (ValueError, TypeError):
+                out[i] = np.nan
+        return out
+
+
+def lab_test_ids(test_names):
+    """Reference-range id per test name (_normalize_key applied once per distinct name)."""
+    ids = {name: _TEST_IDS.get(_normalize_key(name), _NO_RANGE) for name in set(test_names)}
+    return np.fromiter(map(ids.__getitem__, test_names), dtype=np.intp, count=len(test_names))
+
+
+def classify_lab_batch(test_names, values):
+    """
+    Status code per row for columnar lab results (see BATCH_STATUSES), via vectorized comparisons
+    against the range arrays. Unknown tests are "unknown"; non-numeric or non-finite (NaN, inf)
+    values are "error".
+    """
+    ids = lab_test_ids(test_names)
+    vals = _float_column(values)
+    codes = np.full(len(ids), _NORMAL, dtype=np.int8)
+    codes[vals < _RANGE_MIN[ids]] = _LOW
+    codes[vals > _RANGE_MAX[ids]] = _HIGH
+    codes[ids == _NO_RANGE] = _UNKNOWN
+    codes[~np.isfinite(vals)] = _ERROR
+    return codes
+
+
+def lab_result_batch_interpretation(test_names=None, values=None):
+    """
+    Interpret many lab results at once; no LLM involved.
+    Input is columnar: test_names[i] and values[i] describe row i (e.g. one row per patient result).
+    Returns { success, data: { statuses: [...], counts: { status: n }, flagged: [row indices] }?, error? }.
+    flagged lists the rows that are low or high.
+    """
+    if not isinstance(test_names, (list, tuple, np.ndarray)) or not isinstance(values, (list, tuple, np.ndarray)):
+        return tool_result(success=False, error="test_names and values must be lists of equal length")
+    if len(test_names) != len(values):
+        return tool_result(success=False, error="test_names and values must be lists of equal length")
+    if not all(isinstance(n, str) for n in test_names):
+        return tool_result(success=False, error="each test name must be a string")
+
+    codes = classify_lab_batch(test_names, values)
+    counts = np.bincount(codes, minlength=len(BATCH_STATUSES))
+    labels = np.array(BATCH_STATUSES, dtype=object)
+    return tool_result(success=True, data={
+        "statuses": labels[codes].tolist(),
+        "counts": {label: int(n) for label, n in zip(BATCH_STATUSES, counts)},
+        "flagged": np.flatnonzero((codes == _LOW) | (codes == _HIGH)).tolist(),
+    })
+
+
 def lab_result_interpretation(lab_values: dict) -> dict:
     """
     Interpret a dictionary of lab results.
@@ -46,6 +121,8 @@ def lab_result_interpretation(lab_values: dict) -> dict:
         
         try:
             val_float = float(value)
+            if not np.isfinite(val_float):
+                raise ValueError(value)
         except (ValueError, TypeError):
             interpretations.append({
                 "test_name": raw_test_name,
@@ -1,9 +1,13 @@
 """
 LangChain tool wrappers for the orchestrator.
 Each tool calls our existing Python function and returns a string for the LLM.
+Every tool also has a coroutine (used by agent.ainvoke) that runs the same wrapper in a worker
+thread, so blocking lookups (openFDA HTTP, dataset loads) never stall the event loop.
 """
+import asyncio
+import functools
 import json
-from typing import Any, Dict
+from typing import Any, Dict, Literal
 
 from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
@@ -13,9 +17,15 @@ from agent.tools import (
     symptom_lookup,
     provider_search,
     appointment_availability,
+    earliest_availability,
+    hold_appointment,
+    book_appointment,
     insurance_coverage_check,
+    bulk_coverage_check,
+    covering_plans,
     lab_result_interpretation,
     contraindication_check,
+    contraindication_batch_check,
 )
 from agent.tools.procedure_lookup import procedure_lookup
 
@@ -27,9 +37,17 @@ def _result_to_string(result: dict) -> str:
     return json.dumps(result.get("data", {}), indent=2)
 
 
-def _drug_interaction_invoke(medications: list[str]) -> str:
+def _async_invoke(invoke):
+    """Coroutine twin of a sync tool wrapper, with its signature (for the args schema)."""
+    @functools.wraps(invoke)
+    async def ainvoke(**kwargs):
+        return await asyncio.to_thread(invoke, **kwargs)
+    return ainvoke
+
+
+def _drug_interaction_invoke(medications: list[str], mode: Literal["pairs", "graph"] = "pairs") -> str:
     try:
-        out = drug_interaction_check(medications=medications)
+        out = drug_interaction_check(medications=medications, mode=mode)
         return _result_to_string(out)
     except Exception as e:
         return f"Error executing tool: {str(e)}. Please check your arguments and try again."
@@ -41,9 +59,11 @@ def _symptom_lookup_invoke(symptoms: list[str]) -> str:
     except Exception as e:
         return f"Error executing tool: {str(e)}. Please check your arguments and try again."
 
-def _provider_search_invoke(specialty: str, location: str) -> str:
+def _provider_search_invoke(specialty: str, location: str = "", latitude: float = None, longitude: float = None,
+                            radius_km: float = None, cursor: str = None) -> str:
     try:
-        out = provider_search(specialty=specialty, location=location)
+        out = provider_search(specialty=specialty, location=location, latitude=latitude, longitude=longitude,
+                              radius_km=radius_km, cursor=cursor)
         return _result_to_string(out)
     except Exception as e:
         return f"Error executing tool: {str(e)}. Please check your arguments and try again."
@@ -55,6 +75,27 @@ def _appointment_availability_invoke(provider_id: str, date_range: str) -> str:
     except Exception as e:
         return f"Error executing tool: {str(e)}. Please check your arguments and try again."
 
+def _earliest_availability_invoke(specialty: str, location: str = "", date_range: str = None, k: int = 5) -> str:
+    try:
+        out = earliest_availability(specialty=specialty, location=location, date_range=date_range, k=k)
+        return _result_to_string(out)
+    except Exception as e:
+        return f"Error executing tool: {str(e)}. Please check your arguments and try again."
+
+def _hold_appointment_invoke(provider_id: str, date: str, start_time: str) -> str:
+    try:
+        out = hold_appointment(provider_id=provider_id, date=date, start_time=start_time)
+        return _result_to_string(out)
+    except Exception as e:
+        return f"Error executing tool: {str(e)}. Please check your arguments and try again."
+
+def _book_appointment_invoke(hold_id: str, patient: str = None) -> str:
+    try:
+        out = book_appointment(hold_id=hold_id, patient=patient)
+        return _result_to_string(out)
+    except Exception as e:
+        return f"Error executing tool: {str(e)}. Please check your arguments and try again."
+
 def _insurance_coverage_invoke(procedure_code: str, plan_id: str) -> str:
     try:
         out = insurance_coverage_check(procedure_code=procedure_code, plan_id=plan_id)
@@ -62,9 +103,26 @@ def _insurance_coverage_invoke(procedure_code: str, plan_id: str) -> str:
     except Exception as e:
         return f"Error executing tool: {str(e)}. Please check your arguments and try again."
 
-def _procedure_lookup_invoke(query: str) -> str:
+def _bulk_coverage_invoke(codes: list[str], plan_id: str) -> str:
+    try:
+        out = bulk_coverage_check(codes=codes, plan_id=plan_id)
+        return _result_to_string(out)
+    except Exception as e:
+        return f"Error executing tool: {str(e)}. Please check your arguments and try again."
+
+def _covering_plans_invoke(procedure_code: str) -> str:
     try:
-        out = procedure_lookup(query=query)
+        out = covering_plans(procedure_code=procedure_code)
+        return _result_to_string(out)
+    except Exception as e:
+        return f"Error executing tool: {str(e)}. Please check your arguments and try again."
+
+def _procedure_lookup_invoke(query: str = None, mode: Literal["search", "range", "prefix"] = "search",
+                             code_start: str = None, code_end: str = None, cursor: str = None,
+                             limit: int = None) -> str:
+    try:
+        out = procedure_lookup(query=query, mode=mode, code_start=code_start, code_end=code_end,
+                               cursor=cursor, limit=limit)
         return _result_to_string(out)
     except Exception as e:
         return f"Error executing tool: {str(e)}. Please check your arguments and try again."
@@ -92,46 +150,97 @@ def _contraindication_check_invoke(procedure_code: str, patient_conditions: list
     except Exception as e:
         return f"Error executing tool: {str(e)}. Please check your arguments and try again."
 
+def _contraindication_batch_invoke(procedure_codes: list[str], patient_conditions: list[str] = None,
+                                   patient_medications: list[str] = None) -> str:
+    try:
+        out = contraindication_batch_check(procedure_codes=procedure_codes, patient_conditions=patient_conditions,
+                                           patient_medications=patient_medications)
+        return _result_to_string(out)
+    except Exception as e:
+        return f"Error executing tool: {str(e)}. Please check your arguments and try again."
+
 
 # LangChain tools with descriptions and schemas for the LLM
 drug_interaction_tool = StructuredTool.from_function(
     func=_drug_interaction_invoke,
+    coroutine=_async_invoke(_drug_interaction_invoke),
     name="drug_interaction_check",
-    description="Check for drug-drug interactions between a list of medications. Input: list of medication names (e.g. aspirin, ibuprofen). Returns interactions and severity (none, minor, major, contraindicated).",
+    description="Check for drug-drug interactions between a list of medications. Input: list of medication names (e.g. aspirin, ibuprofen). Returns interactions and severity (none, minor, major, contraindicated); pairs listed in unchecked_pairs were not checked, so their interactions are unknown. mode: pairs (default; curated data plus live openFDA for every pair) or graph (curated data only, grouped per drug in by_drug; fast for long medication lists, but pairs outside the curated set are not checked).",
 )
 
 symptom_lookup_tool = StructuredTool.from_function(
     func=_symptom_lookup_invoke,
+    coroutine=_async_invoke(_symptom_lookup_invoke),
     name="symptom_lookup",
     description="Look up possible conditions and urgency level for given symptoms. Input: list of symptom strings. Returns possible_conditions and urgency (low, medium, high). Does NOT diagnose; always advise user to consult a provider.",
 )
 
 provider_search_tool = StructuredTool.from_function(
     func=_provider_search_invoke,
+    coroutine=_async_invoke(_provider_search_invoke),
     name="provider_search",
-    description="Search for healthcare providers by specialty and location. Input: specialty (e.g. cardiology, pediatrics) and location (e.g. Austin, TX).",
+    description="Search for healthcare providers by specialty and location. Input: specialty (e.g. cardiology, pediatrics) and location (e.g. Austin, TX); for 'near me' pass latitude, longitude and optional radius_km (default 25). Results are paged: total is the match count and next_cursor, when present, can be passed back as cursor for more.",
 )
 
 appointment_availability_tool = StructuredTool.from_function(
     func=_appointment_availability_invoke,
+    coroutine=_async_invoke(_appointment_availability_invoke),
     name="appointment_availability",
-    description="Get available appointment slots for a provider in a date range. Input: provider_id (e.g. prov_001) and date_range (e.g. '2025-03-01' or '2025-03-01 to 2025-03-07').",
+    description="Get available appointment slots for a provider in a date range. Input: provider_id (e.g. prov_001) and date_range (e.g. '2025-03-01', '2025-03-01 to 2025-03-07', or a phrase such as 'next week', 'Tuesday afternoon', 'tomorrow morning'; phrases are resolved to dates for you and echoed as resolved_date_range).",
+)
+
+earliest_availability_tool = StructuredTool.from_function(
+    func=_earliest_availability_invoke,
+    coroutine=_async_invoke(_earliest_availability_invoke),
+    name="earliest_availability",
+    description="Find the soonest open appointment slots across ALL providers of a specialty in a location, in one call (use instead of provider_search + appointment_availability per provider for questions like 'who is the first cardiologist available?'). Input: specialty (e.g. cardiology), location (e.g. Austin, TX), optional date_range (e.g. '2025-03-01 to 2025-03-07', 'next week', 'Friday morning'; default: next 14 days) and k (number of slots, default 5). Returns slots with provider_id, provider_name, date, start_time, end_time.",
+)
+
+hold_appointment_tool = StructuredTool.from_function(
+    func=_hold_appointment_invoke,
+    coroutine=_async_invoke(_hold_appointment_invoke),
+    name="hold_appointment",
+    description="Temporarily hold an open appointment slot (10 minutes) while the user confirms. Input: provider_id (e.g. prov_001), date (YYYY-MM-DD) and start_time (HH:MM) from an availability result. Returns hold_id; fails if the slot was taken meanwhile.",
+)
+
+book_appointment_tool = StructuredTool.from_function(
+    func=_book_appointment_invoke,
+    coroutine=_async_invoke(_book_appointment_invoke),
+    name="book_appointment",
+    description="Confirm a held slot as a booked appointment, only after the user explicitly confirms. Input: hold_id from hold_appointment and optional patient name. Returns appointment_id.",
 )
 
 insurance_coverage_tool = StructuredTool.from_function(
     func=_insurance_coverage_invoke,
+    coroutine=_async_invoke(_insurance_coverage_invoke),
     name="insurance_coverage_check",
     description="Check if a procedure is covered under an insurance plan. Input: procedure_code (e.g. 99213) and plan_id (e.g. plan_001). Returns covered (true/false) and details.",
 )
 
+bulk_coverage_tool = StructuredTool.from_function(
+    func=_bulk_coverage_invoke,
+    coroutine=_async_invoke(_bulk_coverage_invoke),
+    name="bulk_coverage_check",
+    description="Check many procedure codes against one insurance plan in a single call (e.g. every CPT code on a claim); use instead of calling insurance_coverage_check once per code. Input: codes (list, e.g. ['99213', '93000', '80053']) and plan_id (e.g. plan_001). Returns results per code plus covered_codes and not_covered_codes.",
+)
+
+covering_plans_tool = StructuredTool.from_function(
+    func=_covering_plans_invoke,
+    coroutine=_async_invoke(_covering_plans_invoke),
+    name="covering_plans",
+    description="Find which insurance plans cover a procedure (e.g. 'which of our plans cover CPT 27447?'). Input: procedure_code (e.g. 27447). Returns covered_plans (plan_id and details), not_covered_plans and plans_known.",
+)
+
 procedure_lookup_tool = StructuredTool.from_function(
     func=_procedure_lookup_invoke,
+    coroutine=_async_invoke(_procedure_lookup_invoke),
     name="procedure_lookup",
-    description="Search for a medical procedure by name to get its CPT code, or search by CPT code to get its name. Input: query (e.g., 'Knee Replacement' or '27447').",
+    description="Search for a medical procedure by name to get its CPT code, or search by CPT code to get its name. mode 'search' (default): query (e.g., 'Knee Replacement', 'knee repl' or '27447'), optional limit (default 10); returns the best matches first plus total_matches. mode 'range': code_start and code_end (e.g. 99202 and 99215) list every code in between; mode 'prefix': query is a code prefix (e.g. '274' or '274xx'). Range and prefix results are in code order, 20 per page by default, with total and next_cursor (pass it back as cursor for the next page).",
 )
 
 lab_result_interpretation_tool = StructuredTool.from_function(
     func=_lab_result_interpretation_invoke,
+    coroutine=_async_invoke(_lab_result_interpretation_invoke),
     name="lab_result_interpretation",
     description="Interpret lab results by checking them against standard medical reference ranges. Input: one object 'lab_values' mapping lab test names to numbers, e.g. lab_values: { glucose: 115, hdl: 35, potassium: 4.0 }. Returns whether each result is normal, low, or high.",
     args_schema=LabResultInterpretationInput,
@@ -139,10 +248,18 @@ lab_result_interpretation_tool = StructuredTool.from_function(
 
 contraindication_check_tool = StructuredTool.from_function(
     func=_contraindication_check_invoke,
+    coroutine=_async_invoke(_contraindication_check_invoke),
     name="contraindication_check",
     description="Check if a specific medical procedure is contraindicated based on a patient's conditions and medications. Input: procedure_code (e.g., '27447'), patient_conditions (list of strings, e.g., ['active infection']), patient_medications (list of strings, e.g., ['warfarin']).",
 )
 
+contraindication_batch_tool = StructuredTool.from_function(
+    func=_contraindication_batch_invoke,
+    coroutine=_async_invoke(_contraindication_batch_invoke),
+    name="contraindication_batch_check",
+    description="Check many candidate procedures against one patient's conditions and medications in a single call (e.g. pre-op planning: 'which of these procedures are flagged for this patient?'); use instead of calling contraindication_check once per procedure. Input: procedure_codes (list, e.g. ['27447', '45380', '93015']), patient_conditions (list of strings), patient_medications (list of strings). Returns flagged (procedure_code, procedure_name, flagged_issues, reason), safe_codes and no_data_codes.",
+)
+
 def get_langchain_tools():
     """Return list of LangChain tools for the agent."""
     return [
@@ -150,8 +267,14 @@ def get_langchain_tools():
         symptom_lookup_tool,
         provider_search_tool,
         appointment_availability_tool,
+        earliest_availability_tool,
+        hold_appointment_tool,
+        book_appointment_tool,
         insurance_coverage_tool,
+        bulk_coverage_tool,
+        covering_plans_tool,
         procedure_lookup_tool,
         lab_result_interpretation_tool,
         contraindication_check_tool,
+        contraindication_batch_tool,
     ]
@@ -0,0 +1,227 @@
+"""
+Medication name resolver shared by drug_interaction_check and contraindication_check.
+Maps what users type ("Tylenol", "acetaminophen 500mg", "ibuprofin") to one canonical
+generic name, so the curated datasets match on the first tool call instead of the LLM
+retrying with new spellings. Resolution order:
+  exact generic -> brand/synonym -> dose/form stripped -> near-complete unique prefix -> trigram fuzzy.
+Fuzzy matches are typo-sized only (edit distance, same first letter, no extra stem such as
+es-omeprazole): look-alike drugs never resolve to each other, an unclear name stays unknown.
+Data: data/medication_synonyms.json (generics + brand/alias map), via the dataset registry.
+"""
+import math
+import os
+import re
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+
+from agent.tools.dataset_registry import registry
+
+_DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "medication_synonyms.json")
+
+# "500mg", "0.5 mg", "10 mL", "5%", ...
+_DOSE_RE = re.compile(r"\b\d+(?:\.\d+)?\s*(?:mg|mcg|ug|g|ml|l|units?|iu|meq|%)(?=\W|$)|\b\d+(?:\.\d+)?\b", re.I)
+_FORM_WORDS = frozenset({
+    "tablet", "tablets", "tab", "tabs", "capsule", "capsules", "cap", "caps", "oral", "po",
+    "er", "xr", "sr", "dr", "ec", "extended", "delayed", "release", "chewable", "solution",
+    "suspension", "injection", "daily", "bid", "tid", "qd", "prn",
+})
+_MIN_FUZZY_LEN = 4
+_MIN_PREFIX_LEN = 6
+_MIN_PREFIX_COVERAGE = 0.6  # share of the matched name the prefix must spell out
+_FUZZY_THRESHOLD = 0.55   # trigram Dice, candidate filter only
+_FUZZY_CANDIDATES = 16
+_MAX_EDITS_SHORT = 1      # names under _LONG_NAME_LEN characters
+_MAX_EDITS = 2
+_LONG_NAME_LEN = 8
+_MEMO_LIMIT = 8192
+
+
+def _normalize(name):
+    """Lowercase, strip, collapse internal whitespace."""
+    if not name or not isinstance(name, str):
+        return ""
+    return " ".join(name.strip().lower().split())
+
+
+def _strip_dose_and_form(name):
+    """Drop strengths and dosage-form words: 'tylenol 500mg tablet' -> 'tylenol'."""
+    cleaned = _DOSE_RE.sub(" ", name)
+    words = [w for w in re.split(r"[\s,/()]+", cleaned) if w and w not in _FORM_WORDS]
+    return " ".join(words)
+
+
+def _trigrams(s):
+    padded = f"  {s} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a, b, limit):
+    """Optimal string alignment distance (Damerau-Levenshtein with adjacent swaps); limit + 1 once above limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _typo_distance(key, name):
+    """
+    Edit distance if name is a plausible misspelling target for key, else None. Look-alike
+    drugs differ by a stem at the start (fosinopril/lisinopril, felodipine/amlodipine) or by
+    a whole prefix/suffix (esomeprazole/omeprazole); both are rejected, not corrected.
+    """
+    if key[0] != name[0] or key.startswith(name) or name.startswith(key) \
+            or key.endswith(name) or name.endswith(key):
+        return None
+    limit = _MAX_EDITS if min(len(key), len(name)) >= _LONG_NAME_LEN else _MAX_EDITS_SHORT
+    distance = _edit_distance(key, name, limit)
+    return distance if distance <= limit else None
+
+
+class MedicationResolver:
+    """Index over every known name (generics + synonyms): hash map, sorted list, trigram postings."""
+
+    def __init__(self, generics, synonyms):
+        self.canonical = {}
+        for g in generics:
+            g = _normalize(g)
+            if g:
+                self.canonical[g] = g
+        for alias, generic in synonyms.items():
+            alias, generic = _normalize(alias), _normalize(generic)
+            if alias and generic:
+                self.canonical[alias] = generic
+                self.canonical.setdefault(generic, generic)
+
+        self.names = sorted(self.canonical)
+        self._name_trigrams = []
+        self._postings = {}
+        for i, name in enumerate(self.names):
+            grams = _trigrams(name)
+            self._name_trigrams.append(grams)
+            for g in grams:
+                self._postings.setdefault(g, []).append(i)
+        self._memo = {}
+
+    def resolve(self, name):
+        """Return (canonical name, method). Unknown names come back normalized with method 'unknown'."""
+        key = _normalize(name)
+        cached = self._memo.get(key)
+        if cached is not None:
+            return cached
+        result = self._resolve(key)
+        if len(self._memo) >= _MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[key] = result
+        return result
+
+    def _resolve(self, key):
+        if not key:
+            return "", "unknown"
+        hit = self.canonical.get(key)
+        if hit is not None:
+            return hit, ("exact" if hit == key else "synonym")
+
+        stripped = _strip_dose_and_form(key)
+        if stripped and stripped != key:
+            hit = self.canonical.get(stripped)
+            if hit is not None:
+                return hit, "stripped"
+            key = stripped
+
+        match = self._prefix_match(key) or self._fuzzy_match(key)
+        if match is not None:
+            return self.canonical[match[0]], match[1]
+        return key, "unknown"
+
+    def _prefix_match(self, key):
+        """
+        Nearly complete names ('acetamin'): accept only if all names with that prefix agree on
+        one generic and the prefix spells out most of one of them. A short stem ('levo', 'metf')
+        is unclear input, not a name, and stays unknown.
+        """
+        if len(key) < _MIN_PREFIX_LEN:
+            return None
+        i = bisect_left(self.names, key)
+        targets = set()
+        best = None
+        while i < len(self.names) and self.names[i].startswith(key):
+            if best is None or len(self.names[i]) < len(best):
+                best = self.names[i]
+            targets.add(self.canonical[self.names[i]])
+            if len(targets) > 1:
+                return None
+            i += 1
+        if best is None or len(key) < _MIN_PREFIX_COVERAGE * len(best):
+            return None
+        return best, "prefix"
+
+    def _fuzzy_match(self, key):
+        """
+        Misspellings ('ibuprofin'): trigram candidates, accepted only at typo distance.
+        A name reaching the Dice threshold must share at least s_min of the query's q
+        trigrams, so it must contain one of the q - s_min + 1 rarest ones; only those (short)
+        posting lists are scanned. The top candidates are then checked with _typo_distance;
+        the closest wins, and a tie between different generics resolves nothing.
+        """
+        if len(key) < _MIN_FUZZY_LEN:
+            return None
+        grams = _trigrams(key)
+        postings = sorted((self._postings[g] for g in grams if g in self._postings), key=len)
+        if not postings:
+            return None
+        s_min = math.ceil(_FUZZY_THRESHOLD * len(grams) / (2 - _FUZZY_THRESHOLD))
+        probe = postings[:max(1, len(grams) - s_min + 1)]
+        overlaps = Counter(chain.from_iterable(probe))
+        best, best_distance, targets = None, None, set()
+        for i, _ in overlaps.most_common(_FUZZY_CANDIDATES):
+            name_grams = self._name_trigrams[i]
+            if 2.0 * len(grams & name_grams) / (len(grams) + len(name_grams)) < _FUZZY_THRESHOLD:
+                continue
+            distance = _typo_distance(key, self.names[i])
+            if distance is None or (best_distance is not None and distance > best_distance):
+                continue
+            if best_distance is None or distance < best_distance:
+                best, best_distance, targets = self.names[i], distance, set()
+            targets.add(self.canonical[self.names[i]])
+        if best is None or len(targets) > 1:
+            return None
+        return best, "fuzzy"
+
+
+def _build_index(data):
+    return MedicationResolver(data.get("generics", []), data.get("synonyms", {}))
+
+
+registry.register("medication_synonyms", _DATA_PATH, _build_index)
+
+
+def resolve_medication(name):
+    """Canonical generic name for a user-supplied medication string (normalized if unknown)."""
+    return registry.get("medication_synonyms").resolve(name)[0]
+
+
+def resolve_medications(names):
+    """
+    Resolve a list of names. Returns (canonical names in input order, notes) where notes maps
+    each input that changed beyond case/whitespace to { resolved, method } for the response.
+    """
+    resolver = registry.get("medication_synonyms")
+    canonical = []
+    notes = {}
+    for name in names:
+        resolved, method = resolver.resolve(name)
+        canonical.append(resolved)
+        if resolved and method != "exact" and resolved != _normalize(name):
+            notes[name] = {"resolved": resolved, "method": method}
+    return canonical, notes
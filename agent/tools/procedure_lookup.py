@@ -1,53 +1,271 @@
-import json
+"""
+Procedure lookup: CPT code <-> procedure name.
+Text search is an inverted index over name and description tokens, ranked with BM25 and
+cut to the top k. Every query token also matches as a prefix ("repl" -> "replacement"),
+so partial words and autocomplete input work. Built once per dataset load.
+Code range ("99202-99215") and prefix ("274xx") queries bisect a sorted code array and are
+paged with keyset cursors (the last code returned), so each page costs O(log n + page).
+With DATASET_BACKEND=sqlite, text search uses the store's FTS5 index (bm25, name weighted 2x,
+prefix terms) and code pages its code-key B-tree, with the same cursors.
+"""
+import base64
+import math
 import os
+import re
+import zlib
+from bisect import bisect_left, bisect_right
 
+import numpy as np
+
+from agent.tools.dataset_registry import registry
 from agent.tools.schemas import tool_result
+from agent.tools.sqlite_store import get_dataset_store
 
 _DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "procedures.json")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset({"a", "an", "and", "the", "of", "or", "for", "with", "to", "in", "on", "at", "by"})
+_NAME_WEIGHT = 2        # a name token counts as this many occurrences (names are short and precise)
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_MIN_PREFIX_LEN = 2
+_MAX_PREFIX_TERMS = 64  # most frequent expansions kept for a very short prefix
+_DEFAULT_LIMIT = 10
+_MAX_LIMIT = 50
+_DEFAULT_PAGE_SIZE = 20
+_MAX_PAGE_SIZE = 100
+_MODES = ("search", "range", "prefix")
+_RANGE_RE = re.compile(r"^\s*([A-Za-z0-9]+)\s*(?:-|–|—|to|through)\s*([A-Za-z0-9]+)\s*$", re.I)
+
+
+def _tokens(s):
+    return [t for t in _TOKEN_RE.findall((s or "").lower()) if t not in _STOP_WORDS]
+
+
+def _code_key(code):
+    return str(code or "").strip().upper()
 
-def _load_procedures():
-    """Load procedure -> code mapping from JSON."""
-    if not os.path.isfile(_DATA_PATH):
-        return []
-    with open(_DATA_PATH, encoding="utf-8") as f:
-        data = json.load(f)
-    return data.get("procedures", [])
 
-def procedure_lookup(query: str):
+class ProcedureIndex:
+    """
+    BM25 inverted index over procedures. postings[term] = (doc ids int32, BM25 weights float32);
+    weights are precomputed at build time, so a query only sums per-term vectors.
+    """
+
+    def __init__(self, procedures):
+        self.procedures = list(procedures)
+        self.by_code = {}
+        tfs = []
+        doc_len = np.zeros(len(self.procedures), dtype=np.float32)
+        for i, proc in enumerate(self.procedures):
+            self.by_code.setdefault(_code_key(proc.get("code")), i)
+            tf = {}
+            for t in _tokens(proc.get("name")):
+                tf[t] = tf.get(t, 0) + _NAME_WEIGHT
+            for t in _tokens(proc.get("description")):
+                tf[t] = tf.get(t, 0) + 1
+            tfs.append(tf)
+            doc_len[i] = sum(tf.values())
+
+        n = len(self.procedures)
+        avgdl = float(doc_len.mean()) if n else 1.0
+        norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * doc_len / (avgdl or 1.0))
+        raw = {}
+        for i, tf in enumerate(tfs):
+            for t, f in tf.items():
+                raw.setdefault(t, ([], []))
+                raw[t][0].append(i)
+                raw[t][1].append(f)
+
+        self.postings = {}
+        for t, (ids, freqs) in raw.items():
+            ids = np.array(ids, dtype=np.int32)
+            freqs = np.array(freqs, dtype=np.float32)
+            idf = math.log(1 + (n - len(ids) + 0.5) / (len(ids) + 0.5))
+            self.postings[t] = (ids, (idf * freqs * (_BM25_K1 + 1) / (freqs + norm[ids])).astype(np.float32))
+        self.vocabulary = sorted(self.postings)
+        # Sorted code array (one entry per distinct code) for range and prefix queries
+        self.codes = sorted(c for c in self.by_code if c)
+        self.code_ids = [self.by_code[c] for c in self.codes]
+
+    def expand(self, token):
+        """Vocabulary terms starting with token (the token itself first if it is a term)."""
+        if len(token) < _MIN_PREFIX_LEN:
+            return [token] if token in self.postings else []
+        lo = bisect_left(self.vocabulary, token)
+        hi = bisect_left(self.vocabulary, token + "\uffff", lo)
+        terms = self.vocabulary[lo:hi]
+        if len(terms) > _MAX_PREFIX_TERMS:
+            terms = sorted(terms, key=lambda t: (t != token, -len(self.postings[t][0])))[:_MAX_PREFIX_TERMS]
+        return terms
+
+    def search(self, query, limit=_DEFAULT_LIMIT):
+        """
+        (doc ids best first, total matches). Documents matching every query token (exactly or by
+        prefix) are preferred; if there are none, any-token matches are ranked instead.
+        A token's score is its best-scoring expansion, so a prefix with many completions does not
+        outweigh a precise word.
+        """
+        n = len(self.procedures)
+        per_token = []
+        for tok in dict.fromkeys(_tokens(query)):
+            scores = np.zeros(n, dtype=np.float32)
+            for term in self.expand(tok):
+                ids, weights = self.postings[term]
+                scores[ids] = np.maximum(scores[ids], weights)  # ids are unique within a posting list
+            per_token.append(scores)
+        if not per_token:
+            return np.empty(0, dtype=np.int64), 0
+
+        stacked = np.vstack(per_token)
+        total = stacked.sum(axis=0)
+        hits = np.flatnonzero((stacked > 0).all(axis=0))
+        if not len(hits):
+            hits = np.flatnonzero(total > 0)
+        count = len(hits)
+        if count > limit:
+            hits = hits[np.argpartition(-total[hits], limit - 1)[:limit]]
+        return hits[np.lexsort((hits, -total[hits]))], count
+
+
+    def code_span(self, start, end):
+        """(lo, hi) positions in self.codes of codes with start <= code <= end."""
+        return bisect_left(self.codes, start), bisect_right(self.codes, end)
+
+    def prefix_span(self, prefix):
+        """(lo, hi) positions in self.codes of codes starting with prefix."""
+        lo = bisect_left(self.codes, prefix)
+        return lo, bisect_left(self.codes, prefix + "\uffff", lo)
+
+    def page(self, lo, hi, after=None, limit=_DEFAULT_PAGE_SIZE):
+        """Doc ids of up to limit codes in [lo, hi) that sort after the code `after`, in code order."""
+        if after is not None:
+            lo = max(lo, bisect_right(self.codes, after))
+        return self.code_ids[lo:min(lo + limit, hi)], lo + limit < hi
+
+
+def _build_index(data):
+    """BM25 inverted index over the procedure catalog, plus a code -> procedure map."""
+    return ProcedureIndex(data.get("procedures", []))
+
+
+registry.register("procedures", _DATA_PATH, _build_index)
+
+
+def _fingerprint(*parts):
+    return zlib.crc32(repr(parts).encode()) & 0xFFFFFFFF
+
+
+def _encode_cursor(last_code, fingerprint):
+    return base64.urlsafe_b64encode(f"{last_code}:{fingerprint:08x}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor, fingerprint):
+    """Last code of the previous page for a cursor issued for the same query; None otherwise."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        last_code, fp = raw.rsplit(":", 1)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if fp != f"{fingerprint:08x}" or not last_code:
+        return None
+    return last_code
+
+
+def procedure_lookup(query=None, limit=None, mode="search", code_start=None, code_end=None, cursor=None):
     """
     Search for a medical procedure by name to get its CPT code, or search by code to get its name.
-    Returns { success, data: { procedures: list }, error? }
+    mode "search" (default): name searches return the top `limit` procedures by relevance (default 10).
+    mode "range": every code from code_start to code_end (or query "99202-99215"), in code order.
+    mode "prefix": every code starting with query ("274" or "274xx"), in code order.
+    Range and prefix results are paged (limit default 20); pass next_cursor back as cursor.
+    Returns { success, data: { procedures: list, total_matches } or { procedures, total, next_cursor }, error? }
     """
+    if mode not in _MODES:
+        return tool_result(success=False, error=f"mode must be one of: {', '.join(_MODES)}")
+    if mode == "range":
+        return _range_lookup(query, code_start, code_end, cursor, limit)
+    if mode == "prefix":
+        return _prefix_lookup(query, cursor, limit)
+
     if not query or not isinstance(query, str):
         return tool_result(success=False, error="query must be a non-empty string")
+    if limit is None:
+        limit = _DEFAULT_LIMIT
+    if not isinstance(limit, int) or not 1 <= limit <= _MAX_LIMIT:
+        return tool_result(success=False, error=f"limit must be an integer between 1 and {_MAX_LIMIT}")
 
-    procedures_data = _load_procedures()
-    query_lower = query.strip().lower()
-
-    results = []
-    for proc in procedures_data:
-        code = proc.get("code", "").lower()
-        name = proc.get("name", "").lower()
-        desc = proc.get("description", "").lower()
-        
-        # Check for exact code match first
-        if query_lower == code:
-            results.append(proc)
-            continue
-            
-        # Then check for partial name/description match
-        if query_lower in name or query_lower in desc:
-            results.append(proc)
-
-    if not results:
+    store = get_dataset_store()
+    if store is not None:
+        exact = store.procedure_by_code(_code_key(query))
+        if exact is not None:
+            return tool_result(success=True, data={"procedures": [exact], "total_matches": 1})
+        procedures, total = store.procedure_search(list(dict.fromkeys(_tokens(query))), limit, _MIN_PREFIX_LEN)
+    else:
+        index = registry.get("procedures")
+        i = index.by_code.get(_code_key(query))
+        if i is not None:
+            return tool_result(success=True, data={"procedures": [index.procedures[i]], "total_matches": 1})
+        ids, total = index.search(query, limit=limit)
+        procedures = [index.procedures[i] for i in ids]
+    if not procedures:
         return tool_result(
-            success=True, 
+            success=True,
             data={"procedures": [], "message": f"No procedure found matching '{query}'"}
         )
 
     return tool_result(
         success=True,
         data={
-            "procedures": results
+            "procedures": procedures,
+            "total_matches": total,
         }
     )
+
+
+def _range_lookup(query, code_start, code_end, cursor, limit):
+    if code_start is None and code_end is None and isinstance(query, str):
+        m = _RANGE_RE.match(query)
+        if m:
+            code_start, code_end = m.groups()
+    if not isinstance(code_start, str) or not isinstance(code_end, str) or not code_start.strip() or not code_end.strip():
+        return tool_result(success=False, error="range mode needs code_start and code_end (or query like '99202-99215')")
+    start, end = sorted((_code_key(code_start), _code_key(code_end)))
+    return _code_page(start, end, ("range", start, end), cursor, limit)
+
+
+def _prefix_lookup(query, cursor, limit):
+    if not isinstance(query, str):
+        return tool_result(success=False, error="prefix mode needs query, a code prefix like '274' or '274xx'")
+    prefix = _code_key(query).rstrip("X*")
+    if not prefix:
+        return tool_result(success=False, error="prefix mode needs query, a code prefix like '274' or '274xx'")
+    return _code_page(prefix, prefix + "\uffff", ("prefix", prefix), cursor, limit)
+
+
+def _code_page(start, end, query_key, cursor, limit):
+    """One page of codes with start <= code <= end, as compact { code, name } rows."""
+    if limit is None:
+        limit = _DEFAULT_PAGE_SIZE
+    if not isinstance(limit, int) or not 1 <= limit <= _MAX_PAGE_SIZE:
+        return tool_result(success=False, error=f"limit must be an integer between 1 and {_MAX_PAGE_SIZE}")
+    fingerprint = _fingerprint(*query_key)
+    after = None
+    if cursor:
+        after = _decode_cursor(cursor, fingerprint)
+        if after is None:
+            return tool_result(success=False, error="invalid cursor; repeat the query without a cursor")
+
+    store = get_dataset_store()
+    if store is not None:
+        procedures, total, more = store.procedure_code_page(start, end, after, limit)
+    else:
+        index = registry.get("procedures")
+        lo, hi = index.code_span(start, end)
+        ids, more = index.page(lo, hi, after=after, limit=limit)
+        procedures, total = [index.procedures[i] for i in ids], hi - lo
+    page = [{"code": p.get("code"), "name": p.get("name")} for p in procedures]
+    return tool_result(success=True, data={
+        "procedures": page,
+        "total": total,
+        "next_cursor": _encode_cursor(_code_key(page[-1]["code"]), fingerprint) if more else None,
+    })
@@ -1,51 +1,252 @@
 """
 Provider search: mock for MVP. Returns providers filtered by specialty and location.
 PRE_SEARCH: mock for sprint; production = OpenEMR provider directory / FHIR.
+
+Index (built once per dataset version): postings keyed by (specialty, location key) where
+either side may be "" for "any"; location keys are the full "city, st", the city alone and
+the state alone. Providers with lat/lon are also bucketed into a lat/long grid for radius
+("near me") queries. Results are paginated with opaque cursors.
+With DATASET_BACKEND=sqlite the same postings live in the store's tables (an R*Tree for the
+radius candidates) and pages are read with LIMIT/OFFSET; ordering and totals are unchanged.
 """
+import base64
+import hashlib
 import json
+import math
 import os
+import zlib
 
+from agent.tools.dataset_registry import registry
 from agent.tools.schemas import tool_result
+from agent.tools.sqlite_store import get_dataset_store
 
 _DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "providers.json")
 
+_GRID_DEG = 0.25            # ~28 km cells
+_KM_PER_DEG_LAT = 111.0
+_EARTH_RADIUS_KM = 6371.0
+_DEFAULT_RADIUS_KM = 25.0
+_MAX_RADIUS_KM = 500.0
+_DEFAULT_PAGE_SIZE = 20
+_MAX_PAGE_SIZE = 100
+
+
+def _normalize(s):
+    """Lowercase, strip, collapse whitespace."""
+    return " ".join((s or "").strip().lower().split())
+
+
+def _location_keys(location):
+    """'Austin, TX' -> {'austin, tx', 'austin', 'tx'}."""
+    loc = _normalize(location)
+    if not loc:
+        return set()
+    keys = {loc}
+    city, _, state = loc.rpartition(",")
+    if city:
+        keys.add(city.strip())
+        keys.add(state.strip())
+    return keys
+
+
+def _cell(lat, lon):
+    return (math.floor(lat / _GRID_DEG), math.floor(lon / _GRID_DEG))
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * _EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _build_index(data):
+    """
+    Build the provider index: postings[(specialty, location key)] -> provider positions
+    (file order), the distinct location keys, and grid cell -> positions for geo queries.
+    """
+    providers = data.get("providers", [])
+    postings = {}
+    specialties = []
+    all_keys = set()
+    grid = {}
+    for i, p in enumerate(providers):
+        spec = _normalize(p.get("specialty"))
+        keys = _location_keys(p.get("location"))
+        specialties.append(spec)
+        all_keys |= keys
+        for s in {spec, ""}:
+            for k in keys | {""}:
+                postings.setdefault((s, k), []).append(i)
+        lat, lon = p.get("lat"), p.get("lon")
+        if isinstance(lat, (int, float)) and isinstance(lon, (int, float)):
+            grid.setdefault(_cell(lat, lon), []).append(i)
+    return {
+        "providers": providers,
+        "postings": postings,
+        "specialties": specialties,
+        "all_location_keys": sorted(all_keys),
+        "grid": grid,
+        # Content hash, not a build counter: every worker and a compiled snapshot of the same
+        # data agree on it, and cursors issued before the data changed are rejected
+        "build_id": hashlib.sha256(json.dumps(providers, sort_keys=True).encode()).hexdigest()[:16],
+    }
+
+
+registry.register("providers", _DATA_PATH, _build_index)
+
 
-def _load_providers():
-    """Load mock provider list from JSON."""
-    if not os.path.isfile(_DATA_PATH):
+def _text_matches(index, specialty_n, location_n):
+    """Positions matching specialty + location text, in file order."""
+    postings = index["postings"]
+    hit = postings.get((specialty_n, location_n))
+    if hit is not None or not location_n:
+        return hit or []
+    # Not an indexed key ("austin, texas", "ust"): substring over distinct location keys, not providers
+    keys = [k for k in index["all_location_keys"] if location_n in k]
+    if not keys:
         return []
-    with open(_DATA_PATH, encoding="utf-8") as f:
-        data = json.load(f)
-    return data.get("providers", [])
+    merged = set()
+    for k in keys:
+        merged.update(postings.get((specialty_n, k), ()))
+    return sorted(merged)
 
 
-def provider_search(specialty=None, location=None):
+def matching_providers(specialty, location):
+    """All providers matching specialty and location text (unpaged, file order); "" means any."""
+    store = get_dataset_store()
+    if store is not None:
+        return store.provider_rows(_normalize(specialty), _normalize(location))
+    index = registry.get("providers")
+    providers = index["providers"]
+    return [providers[i] for i in _text_matches(index, _normalize(specialty), _normalize(location))]
+
+
+def _radius_cells(lat, lon, radius_km):
+    """Grid cells (r0, c0), (r1, c1) bounding the radius around lat/lon."""
+    dlat = radius_km / _KM_PER_DEG_LAT
+    dlon = radius_km / (_KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 0.01))
+    return _cell(lat - dlat, lon - dlon), _cell(lat + dlat, lon + dlon)
+
+
+def _geo_matches(index, specialty_n, location_n, lat, lon, radius_km):
+    """(distance km, position) within radius, nearest first; scans only grid cells overlapping the radius."""
+    (r0, c0), (r1, c1) = _radius_cells(lat, lon, radius_km)
+    providers, grid = index["providers"], index["grid"]
+    location_ok = set(_text_matches(index, specialty_n, location_n)) if location_n else None
+    found = []
+    for r in range(r0, r1 + 1):
+        for c in range(c0, c1 + 1):
+            for i in grid.get((r, c), ()):
+                if specialty_n and index["specialties"][i] != specialty_n:
+                    continue
+                if location_ok is not None and i not in location_ok:
+                    continue
+                d = _haversine_km(lat, lon, providers[i]["lat"], providers[i]["lon"])
+                if d <= radius_km:
+                    found.append((d, i))
+    found.sort()
+    return found
+
+
+def _store_geo_matches(store, specialty_n, location_n, lat, lon, radius_km):
+    """_geo_matches over the store: same candidate cells, queried as one R*Tree box."""
+    (r0, c0), (r1, c1) = _radius_cells(lat, lon, radius_km)
+    candidates = store.providers_in_box(specialty_n, r0 * _GRID_DEG, (r1 + 1) * _GRID_DEG,
+                                        c0 * _GRID_DEG, (c1 + 1) * _GRID_DEG)
+    location_ok = store.provider_positions(specialty_n, location_n) if location_n else None
+    found = []
+    for i, p in candidates:
+        if location_ok is not None and i not in location_ok:
+            continue
+        d = _haversine_km(lat, lon, p["lat"], p["lon"])
+        if d <= radius_km:
+            found.append((d, i, p))
+    found.sort(key=lambda f: f[:2])
+    return found
+
+
+def _fingerprint(*parts):
+    return zlib.crc32(repr(parts).encode()) & 0xFFFFFFFF
+
+
+def _encode_cursor(offset, fingerprint):
+    return base64.urlsafe_b64encode(f"{offset}:{fingerprint:08x}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor, fingerprint):
+    """Offset for a cursor issued for the same query; None when malformed or from another query."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        offset, fp = raw.split(":")
+        offset = int(offset)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if fp != f"{fingerprint:08x}" or offset < 0:
+        return None
+    return offset
+
+
+def provider_search(specialty=None, location=None, latitude=None, longitude=None, radius_km=None,
+                    cursor=None, limit=None):
     """
-    Search for providers by specialty and location.
-    Returns { success, data: { providers: [...] }?, error? }.
-    Mock: filters static list; production would query OpenEMR FHIR.
+    Search for providers by specialty and location, optionally within radius_km of latitude/longitude.
+    Returns { success, data: { providers: [...], total, next_cursor }?, error? }.
+    Pass next_cursor back as cursor for the next page. Mock: static list; production would query OpenEMR FHIR.
     """
+    geo = latitude is not None or longitude is not None
     if specialty is None:
         return tool_result(success=False, error="specialty is required")
-    if location is None:
+    if location is None and not geo:
         return tool_result(success=False, error="location is required")
     if not isinstance(specialty, str):
         return tool_result(success=False, error="specialty must be a string")
-    if not isinstance(location, str):
+    if location is not None and not isinstance(location, str):
         return tool_result(success=False, error="location must be a string")
+    if geo:
+        if not all(isinstance(v, (int, float)) for v in (latitude, longitude)):
+            return tool_result(success=False, error="latitude and longitude must both be numbers")
+        if radius_km is None:
+            radius_km = _DEFAULT_RADIUS_KM
+        if not isinstance(radius_km, (int, float)) or not 0 < radius_km <= _MAX_RADIUS_KM:
+            return tool_result(success=False, error=f"radius_km must be between 0 and {_MAX_RADIUS_KM:g}")
+    if limit is None:
+        limit = _DEFAULT_PAGE_SIZE
+    if not isinstance(limit, int) or not 1 <= limit <= _MAX_PAGE_SIZE:
+        return tool_result(success=False, error=f"limit must be an integer between 1 and {_MAX_PAGE_SIZE}")
 
-    providers = _load_providers()
-    specialty_n = (specialty or "").strip().lower()
-    location_n = (location or "").strip().lower()
+    store = get_dataset_store()
+    index = registry.get("providers") if store is None else None
+    specialty_n = _normalize(specialty)
+    location_n = _normalize(location)
+    build_id = store.import_id if store is not None else index["build_id"]
+    fingerprint = _fingerprint(specialty_n, location_n, latitude, longitude, radius_km, build_id)
+    offset = 0
+    if cursor:
+        offset = _decode_cursor(cursor, fingerprint)
+        if offset is None:
+            return tool_result(success=False, error="invalid or expired cursor; repeat the search without a cursor")
 
-    filtered = []
-    for p in providers:
-        if specialty_n and p.get("specialty", "").lower() != specialty_n:
-            continue
-        if location_n:
-            loc = (p.get("location") or "").lower()
-            if location_n not in loc:
-                continue
-        filtered.append(p)
+    if store is not None:
+        if geo:
+            found = _store_geo_matches(store, specialty_n, location_n, latitude, longitude, radius_km)
+            total = len(found)
+            page = [dict(p, distance_km=round(d, 1)) for d, _, p in found[offset:offset + limit]]
+        else:
+            page, total = store.provider_page(specialty_n, location_n, offset, limit)
+    elif geo:
+        providers = index["providers"]
+        found = _geo_matches(index, specialty_n, location_n, latitude, longitude, radius_km)
+        total = len(found)
+        page = [dict(providers[i], distance_km=round(d, 1)) for d, i in found[offset:offset + limit]]
+    else:
+        positions = _text_matches(index, specialty_n, location_n)
+        total = len(positions)
+        page = [index["providers"][i] for i in positions[offset:offset + limit]]
 
-    return tool_result(success=True, data={"providers": filtered})
+    next_offset = offset + limit
+    return tool_result(success=True, data={
+        "providers": page,
+        "total": total,
+        "next_cursor": _encode_cursor(next_offset, fingerprint) if next_offset < total else None,
+    })
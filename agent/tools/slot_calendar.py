@@ -0,0 +1,105 @@
+"""
+Materialized appointment slot calendar (mock scheduling backend for appointment tools).
+Per provider: a sorted list of ISO dates plus, per date, the day's slots sorted by start
+time, so a date-range query is two bisects instead of regenerating and filtering every
+slot. The window [today, today + horizon) is advanced incrementally when the day rolls
+over: past days are dropped and only the new days are generated.
+
+Which template slots are open on a given date is derived from crc32(provider|start) and the
+absolute date, so every worker process (and every day) sees the same calendar.
+PRE_SEARCH: mock for sprint; production = OpenEMR scheduling API.
+"""
+import threading
+import zlib
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+
+def _slot_open(provider_seed, day):
+    """Deterministic pseudo-random gaps: roughly one template slot in three is taken."""
+    return (day.toordinal() + provider_seed) % 3 != 0
+
+
+class SlotCalendar:
+    """
+    schedules: provider_id -> [(start "HH:MM", end "HH:MM"), ...] weekday template.
+    today: zero-arg callable returning the current date (injectable for tests/benchmarks).
+    """
+
+    def __init__(self, schedules, horizon_days=14, today=date.today):
+        self.horizon_days = horizon_days
+        self._today = today
+        self._lock = threading.Lock()
+        self._templates = {}
+        for provider_id, times in schedules.items():
+            times = sorted(tuple(t) for t in times)
+            seeds = [zlib.crc32(f"{provider_id}|{start}".encode()) for start, _ in times]
+            self._templates[provider_id] = list(zip(times, seeds))
+        # provider -> (sorted ISO dates, per-day [(start, end)] lists); replaced as a unit on rollover
+        # so lock-free readers always see a consistent pair
+        self._calendar = {pid: ([], []) for pid in self._templates}
+        self._anchor = None
+        self._roll(self._today())
+
+    def _day_slots(self, provider_id, day):
+        return [times for times, seed in self._templates[provider_id] if _slot_open(seed, day)]
+
+    def _roll(self, today):
+        """Advance the window to start at today: drop past days, generate only the missing ones."""
+        with self._lock:
+            if self._anchor == today:
+                return
+            start_iso = today.isoformat()
+            end = today + timedelta(days=self.horizon_days)
+            rebuild = (self._anchor is None or today < self._anchor
+                       or today >= self._anchor + timedelta(days=self.horizon_days))
+            first_new = today if rebuild else self._anchor + timedelta(days=self.horizon_days)
+            new_days = []
+            d = first_new
+            while d < end:
+                if d.weekday() < 5:  # weekends closed
+                    new_days.append((d, d.isoformat()))
+                d += timedelta(days=1)
+            for pid in self._templates:
+                days, slots = ([], []) if rebuild else self._calendar[pid]
+                cut = bisect_left(days, start_iso)
+                days, slots = days[cut:], slots[cut:]
+                for d, iso in new_days:
+                    day_slots = self._day_slots(pid, d)
+                    if day_slots:
+                        days.append(iso)
+                        slots.append(day_slots)
+                self._calendar[pid] = (days, slots)
+            self._anchor = today
+
+    def _current(self):
+        today = self._today()
+        if today != self._anchor:
+            self._roll(today)
+
+    def providers(self):
+        return list(self._templates)
+
+    def iter_slots(self, provider_id, start_date, end_date, start_time=None, end_time=None):
+        """
+        Lazily yield open slots for provider_id with start_date <= date <= end_date (ISO strings),
+        optionally limited to slots starting in [start_time, end_time) ("HH:MM"), in time order.
+        """
+        self._current()
+        days, per_day = self._calendar.get(provider_id, ((), ()))
+        lo, hi = bisect_left(days, start_date), bisect_right(days, end_date)
+        for k in range(lo, hi):
+            day, day_slots = days[k], per_day[k]
+            a = 0 if start_time is None else bisect_left(day_slots, (start_time,))
+            b = len(day_slots) if end_time is None else bisect_left(day_slots, (end_time,))
+            for start, end in day_slots[a:b]:
+                yield {"provider_id": provider_id, "date": day, "start_time": start, "end_time": end}
+
+    def slots(self, provider_id, start_date, end_date, start_time=None, end_time=None):
+        """All open slots for the range as a list (see iter_slots)."""
+        return list(self.iter_slots(provider_id, start_date, end_date, start_time, end_time))
+
+    def window(self):
+        """(first date, last date) currently materialized, as ISO strings."""
+        self._current()
+        return self._anchor.isoformat(), (self._anchor + timedelta(days=self.horizon_days - 1)).isoformat()
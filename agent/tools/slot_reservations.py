@@ -0,0 +1,363 @@
+"""
+Slot holds and bookings on top of the SlotCalendar (mock scheduling backend).
+A hold reserves one slot for hold_ttl seconds so a patient can confirm it; book() turns a
+live hold into an appointment. Each provider has its own lock, so concurrent bookings for
+different providers never wait on each other. Hold expiry is driven by a hashed timer
+wheel advanced opportunistically by callers, so no thread scans every hold.
+ReservationBook keeps holds and bookings in process memory: one worker only, lost on restart.
+SQLiteReservationBook has the same interface over a SQLite file shared by every worker, with
+one row per (provider, slot) as the constraint that stops two workers taking the same slot.
+PRE_SEARCH: mock for sprint; production = OpenEMR scheduling API.
+"""
+import itertools
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class ReservationError(Exception):
+    """Hold/book request that cannot be satisfied (slot taken, unknown or expired hold, no such slot)."""
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel: schedule()/cancel() are O(1); advance(now) visits only the buckets
+    for ticks elapsed since the last advance (at most one full rotation) and returns the keys
+    whose deadline has passed. Deadlines further than one rotation away stay in their bucket
+    until a later pass reaches them.
+    """
+
+    def __init__(self, tick=1.0, size=512, now=0.0):
+        self._tick = tick
+        self._size = size
+        self._buckets = [{} for _ in range(size)]   # key -> deadline
+        self._where = {}                            # key -> bucket index
+        self._current = int(now // tick)
+        self._lock = threading.Lock()
+
+    def schedule(self, key, deadline):
+        with self._lock:
+            self._cancel(key)
+            # First tick at or after the deadline, so the bucket is visited once now >= deadline
+            b = max(math.ceil(deadline / self._tick), self._current + 1) % self._size
+            self._buckets[b][key] = deadline
+            self._where[key] = b
+
+    def cancel(self, key):
+        with self._lock:
+            self._cancel(key)
+
+    def _cancel(self, key):
+        b = self._where.pop(key, None)
+        if b is not None:
+            self._buckets[b].pop(key, None)
+
+    def advance(self, now, blocking=True):
+        """Expired keys up to now. With blocking=False, returns [] if another thread is advancing."""
+        if not self._lock.acquire(blocking=blocking):
+            return []
+        try:
+            target = int(now // self._tick)
+            expired = []
+            for t in range(self._current + 1, self._current + 1 + min(target - self._current, self._size)):
+                bucket = self._buckets[t % self._size]
+                for key, deadline in list(bucket.items()):
+                    if deadline <= now:
+                        del bucket[key]
+                        del self._where[key]
+                        expired.append(key)
+            self._current = max(self._current, target)
+            return expired
+        finally:
+            self._lock.release()
+
+    def __len__(self):
+        return len(self._where)
+
+
+class Hold:
+    __slots__ = ("hold_id", "provider_id", "slot", "holder", "expires_at")
+
+    def __init__(self, hold_id, provider_id, slot, holder, expires_at):
+        self.hold_id = hold_id
+        self.provider_id = provider_id
+        self.slot = slot            # calendar slot dict
+        self.holder = holder
+        self.expires_at = expires_at
+
+
+class _ProviderBook:
+    __slots__ = ("lock", "holds", "booked", "conflicts", "expired")
+
+    def __init__(self, lock=None):
+        self.lock = lock or threading.Lock()
+        self.holds = {}     # (date, start_time) -> Hold
+        self.booked = {}    # (date, start_time) -> appointment dict
+        self.conflicts = 0
+        self.expired = 0
+
+
+def _find_slot(calendar, provider_id, date, start_time):
+    for slot in calendar.iter_slots(provider_id, date, date, start_time=start_time):
+        if slot["start_time"] == start_time:
+            return slot
+        break
+    raise ReservationError(f"no open slot for {provider_id} on {date} at {start_time}")
+
+
+class ReservationBook:
+    """
+    Holds and bookings for every provider in a SlotCalendar.
+    clock: monotonic seconds (injectable for tests); hold_ttl: seconds a hold stays valid.
+    """
+
+    def __init__(self, calendar, hold_ttl=300.0, clock=time.monotonic, wheel_tick=1.0, wheel_size=512):
+        self.calendar = calendar
+        self.hold_ttl = hold_ttl
+        self._clock = clock
+        self._books = {}
+        self._holds = {}    # hold_id -> Hold
+        self._wheel = TimerWheel(tick=wheel_tick, size=wheel_size, now=clock())
+        self._appointment_ids = itertools.count(1)
+
+    def _provider(self, provider_id):
+        book = self._books.get(provider_id)
+        if book is None:
+            book = self._books.setdefault(provider_id, _ProviderBook())
+        return book
+
+    def _find_slot(self, provider_id, date, start_time):
+        return _find_slot(self.calendar, provider_id, date, start_time)
+
+    def expire(self, blocking=False):
+        """Drop holds whose deadline passed (timer wheel); returns how many were released."""
+        now = self._clock()
+        released = 0
+        for hold_id in self._wheel.advance(now, blocking=blocking):
+            hold = self._holds.get(hold_id)
+            if hold is None:
+                continue
+            book = self._provider(hold.provider_id)
+            key = (hold.slot["date"], hold.slot["start_time"])
+            with book.lock:
+                if book.holds.get(key) is hold:
+                    del book.holds[key]
+                    book.expired += 1
+                    released += 1
+            self._holds.pop(hold_id, None)
+        return released
+
+    def hold(self, provider_id, date, start_time, holder=None):
+        """Reserve a slot for hold_ttl seconds. Raises ReservationError if it is held, booked or absent."""
+        self.expire()
+        slot = self._find_slot(provider_id, date, start_time)
+        key = (date, start_time)
+        book = self._provider(provider_id)
+        now = self._clock()
+        with book.lock:
+            current = book.holds.get(key)
+            if key in book.booked or (current is not None and current.expires_at > now):
+                book.conflicts += 1
+                raise ReservationError(f"slot {date} {start_time} with {provider_id} is no longer available")
+            if current is not None:  # expired but not yet swept by the wheel
+                book.expired += 1
+                self._holds.pop(current.hold_id, None)
+                self._wheel.cancel(current.hold_id)
+            hold = Hold(f"hold_{uuid.uuid4().hex[:12]}", provider_id, slot, holder, now + self.hold_ttl)
+            book.holds[key] = hold
+            self._holds[hold.hold_id] = hold
+        self._wheel.schedule(hold.hold_id, hold.expires_at)
+        return hold
+
+    def book(self, hold_id, patient=None):
+        """Confirm a live hold; returns the appointment dict. Raises ReservationError otherwise."""
+        self.expire()
+        hold = self._holds.get(hold_id)
+        if hold is None:
+            raise ReservationError("unknown or expired hold; check availability and hold a slot again")
+        book = self._provider(hold.provider_id)
+        key = (hold.slot["date"], hold.slot["start_time"])
+        with book.lock:
+            if book.holds.get(key) is not hold or hold.expires_at <= self._clock():
+                self._holds.pop(hold_id, None)
+                raise ReservationError("unknown or expired hold; check availability and hold a slot again")
+            del book.holds[key]
+            appointment = dict(hold.slot, appointment_id=f"appt_{next(self._appointment_ids):06d}",
+                               patient=patient or hold.holder)
+            book.booked[key] = appointment
+            self._holds.pop(hold_id, None)
+        self._wheel.cancel(hold_id)
+        return appointment
+
+    def release(self, hold_id):
+        """Give a held slot back early. Returns False if the hold is unknown or already gone."""
+        hold = self._holds.pop(hold_id, None)
+        if hold is None:
+            return False
+        self._wheel.cancel(hold_id)
+        book = self._provider(hold.provider_id)
+        key = (hold.slot["date"], hold.slot["start_time"])
+        with book.lock:
+            if book.holds.get(key) is hold:
+                del book.holds[key]
+                return True
+        return False
+
+    def taken(self, provider_id):
+        """(date, start_time) keys currently held (unexpired) or booked for provider_id."""
+        book = self._books.get(provider_id)
+        if book is None:
+            return frozenset()
+        now = self._clock()
+        with book.lock:
+            return frozenset(book.booked).union(k for k, h in book.holds.items() if h.expires_at > now)
+
+    def stats(self):
+        books = list(self._books.values())
+        return {
+            "active_holds": len(self._holds),
+            "bookings": sum(len(b.booked) for b in books),
+            "conflicts": sum(b.conflicts for b in books),
+            "expired_holds": sum(b.expired for b in books),
+        }
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reservations (
+    provider_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    hold_id TEXT NOT NULL UNIQUE,
+    holder TEXT,
+    expires_at REAL,                -- NULL once booked
+    appointment_id TEXT UNIQUE,
+    patient TEXT,
+    slot TEXT NOT NULL,
+    PRIMARY KEY (provider_id, date, start_time)
+);
+CREATE INDEX IF NOT EXISTS idx_reservations_expires ON reservations (expires_at);
+CREATE TABLE IF NOT EXISTS reservation_counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+_LIVE = "(expires_at IS NULL OR expires_at > ?)"
+
+
+class SQLiteReservationBook:
+    """
+    ReservationBook over a SQLite file (WAL), for several uvicorn workers and restarts.
+    clock must be wall-clock seconds (time.time), since deadlines are compared across processes.
+    hold/book/release are single autocommit statements conditioned on the slot's row (insert if
+    absent, take over or confirm only while the hold is expired or live), so workers contend
+    only for the row they touch, never for a transaction. Expired rows are already ignored by
+    every read, so the DELETE sweep only reclaims space: it runs at most once per sweep_interval.
+    """
+
+    def __init__(self, calendar, path, hold_ttl=300.0, clock=time.time, sweep_interval=60.0):
+        self.calendar = calendar
+        self.path = path
+        self.hold_ttl = hold_ttl
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._next_sweep = clock() + sweep_interval
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name, n=1):
+        """Bump a counter; returns its new value."""
+        return self._conn().execute(
+            "INSERT INTO reservation_counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value RETURNING value",
+            (name, n),
+        ).fetchall()[0][0]
+
+    def _maybe_expire(self, now):
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_interval
+            self.expire()
+
+    def expire(self):
+        """Drop holds whose deadline passed (index range on expires_at); returns how many were released."""
+        released = self._conn().execute(
+            "DELETE FROM reservations WHERE expires_at <= ?", (self._clock(),)
+        ).rowcount
+        if released:
+            self._count("expired", released)
+        return released
+
+    def hold(self, provider_id, date, start_time, holder=None):
+        """Reserve a slot for hold_ttl seconds. Raises ReservationError if it is held, booked or absent."""
+        slot = _find_slot(self.calendar, provider_id, date, start_time)
+        key = (provider_id, date, start_time)
+        now = self._clock()
+        self._maybe_expire(now)
+        hold = Hold(f"hold_{uuid.uuid4().hex[:12]}", provider_id, slot, holder, now + self.hold_ttl)
+        conn = self._conn()
+        values = (hold.hold_id, holder, hold.expires_at, json.dumps(slot))
+        # An expired hold not yet swept is taken over in place; otherwise insert if the slot is free
+        if conn.execute(
+            "UPDATE reservations SET hold_id = ?, holder = ?, expires_at = ?, slot = ? "
+            "WHERE provider_id = ? AND date = ? AND start_time = ? AND expires_at <= ?",
+            values + key + (now,),
+        ).rowcount:
+            self._count("expired")
+        elif not conn.execute(
+            "INSERT INTO reservations (hold_id, holder, expires_at, slot, provider_id, date, start_time) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (provider_id, date, start_time) DO NOTHING",
+            values + key,
+        ).rowcount:
+            self._count("conflicts")
+            raise ReservationError(f"slot {date} {start_time} with {provider_id} is no longer available")
+        return hold
+
+    def book(self, hold_id, patient=None):
+        """Confirm a live hold; returns the appointment dict. Raises ReservationError otherwise."""
+        rows = self._conn().execute(
+            "UPDATE reservations SET expires_at = NULL, patient = COALESCE(?, holder) "
+            "WHERE hold_id = ? AND expires_at > ? RETURNING slot, patient",
+            (patient or None, hold_id, self._clock()),
+        ).fetchall()
+        if not rows:
+            raise ReservationError("unknown or expired hold; check availability and hold a slot again")
+        slot, patient = rows[0]
+        appointment_id = f"appt_{self._count('appointments'):06d}"
+        self._conn().execute("UPDATE reservations SET appointment_id = ? WHERE hold_id = ?", (appointment_id, hold_id))
+        return dict(json.loads(slot), appointment_id=appointment_id, patient=patient)
+
+    def release(self, hold_id):
+        """Give a held slot back early. Returns False if the hold is unknown or already gone."""
+        return self._conn().execute(
+            "DELETE FROM reservations WHERE hold_id = ? AND expires_at IS NOT NULL", (hold_id,)
+        ).rowcount > 0
+
+    def taken(self, provider_id):
+        """(date, start_time) keys currently held (unexpired) or booked for provider_id."""
+        rows = self._conn().execute(
+            f"SELECT date, start_time FROM reservations WHERE provider_id = ? AND {_LIVE}",
+            (provider_id, self._clock()),
+        )
+        return frozenset(rows)
+
+    def stats(self):
+        conn = self._conn()
+        now = self._clock()
+        counters = dict(conn.execute("SELECT name, value FROM reservation_counters"))
+        return {
+            "active_holds": conn.execute("SELECT COUNT(*) FROM reservations WHERE expires_at > ?", (now,)).fetchone()[0],
+            "bookings": conn.execute("SELECT COUNT(*) FROM reservations WHERE expires_at IS NULL").fetchone()[0],
+            "conflicts": counters.get("conflicts", 0),
+            "expired_holds": counters.get("expired", 0),
+            "path": self.path,
+        }
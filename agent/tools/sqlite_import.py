@@ -0,0 +1,146 @@
+"""
+Importer: data/*.json -> the SQLite dataset database served by sqlite_store.
+Rows are normalized with the same helpers the in-memory indexes use (location keys, symptom
+tokens and trigrams, code keys), and duplicates resolve the same way (first row wins), so
+both backends answer alike. The database is written to a temp file and swapped in atomically;
+running workers switch to the new file within about a second (see get_dataset_store), and
+calls already in flight finish on the old one.
+"""
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+from agent.tools.dataset_registry import _read_json
+from agent.tools.procedure_lookup import _code_key
+from agent.tools.provider_search import _location_keys
+from agent.tools.provider_search import _normalize as _normalize_specialty
+from agent.tools.sqlite_store import _CONDITION, _MEDICATION, SCHEMA, SCHEMA_VERSION
+from agent.tools.symptom_lookup import _URGENCY_ORDER, _tokens as _symptom_tokens, _trigrams
+from agent.tools.symptom_lookup import _normalize as _normalize_symptom
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+SOURCES = {
+    "providers": "providers.json",
+    "coverage": "insurance_coverage.json",
+    "procedures": "procedures.json",
+    "contraindications": "contraindications.json",
+    "symptoms": "symptom_lookup.json",
+}
+
+
+def _import_providers(conn, data):
+    providers = data.get("providers", [])
+    keys = set()
+    rows, locations, geo = [], [], []
+    for i, p in enumerate(providers):
+        spec = _normalize_specialty(p.get("specialty"))
+        rows.append((i, spec, json.dumps(p)))
+        for k in _location_keys(p.get("location")):
+            keys.add(k)
+            locations.append((k, spec, i))
+        lat, lon = p.get("lat"), p.get("lon")
+        if isinstance(lat, (int, float)) and isinstance(lon, (int, float)):
+            geo.append((i, lat, lat, lon, lon))
+    conn.executemany("INSERT INTO providers (pos, specialty_n, doc) VALUES (?, ?, ?)", rows)
+    conn.executemany("INSERT OR IGNORE INTO provider_locations (location_key, specialty_n, pos) VALUES (?, ?, ?)", locations)
+    conn.executemany("INSERT INTO location_keys (location_key) VALUES (?)", ((k,) for k in sorted(keys)))
+    conn.executemany("INSERT INTO provider_geo (pos, min_lat, max_lat, min_lon, max_lon) VALUES (?, ?, ?, ?, ?)", geo)
+    return len(rows)
+
+
+def _import_coverage(conn, data):
+    plans = {}
+    rows = []
+    for row in data.get("coverage", []):
+        code, plan = row.get("procedure_code"), row.get("plan_id")
+        if not isinstance(code, str) or not isinstance(plan, str):
+            continue
+        rows.append((code, plan, plans.setdefault(plan, len(plans)), 1 if row.get("covered") else 0, json.dumps(row)))
+    conn.executemany("INSERT OR IGNORE INTO coverage (procedure_code, plan_id, plan_ord, covered, doc) "
+                     "VALUES (?, ?, ?, ?, ?)", rows)
+    conn.executemany("INSERT INTO plans (plan_id, plan_ord) VALUES (?, ?)", plans.items())
+    return len(rows)
+
+
+def _import_procedures(conn, data):
+    procedures = data.get("procedures", [])
+    conn.executemany("INSERT INTO procedures (id, doc) VALUES (?, ?)", ((i, json.dumps(p)) for i, p in enumerate(procedures)))
+    conn.executemany("INSERT OR IGNORE INTO procedure_codes (code_key, id) VALUES (?, ?)",
+                     ((_code_key(p.get("code")), i) for i, p in enumerate(procedures)))
+    conn.executemany("INSERT INTO procedures_fts (rowid, name, description) VALUES (?, ?, ?)",
+                     ((i, p.get("name") or "", p.get("description") or "") for i, p in enumerate(procedures)))
+    return len(procedures)
+
+
+def _import_contraindications(conn, data):
+    entries, flags = {}, []
+    for item in data.get("contraindications", []):
+        code = item.get("procedure_code")
+        if not isinstance(code, str) or code in entries:
+            continue
+        entries[code] = json.dumps(item)
+        for kind, field in ((_CONDITION, "flagged_conditions"), (_MEDICATION, "flagged_medications")):
+            flags.extend((kind, term, code) for term in item.get(field) or [] if isinstance(term, str))
+    conn.executemany("INSERT INTO contraindications (procedure_code, doc) VALUES (?, ?)", entries.items())
+    conn.executemany("INSERT OR IGNORE INTO contraindication_flags (kind, term, procedure_code) VALUES (?, ?, ?)", flags)
+    return len(entries)
+
+
+def _import_symptoms(conn, data):
+    entries = data.get("symptoms", [])
+    rows, exact, tokens, vocabulary = [], [], [], set()
+    for i, entry in enumerate(entries):
+        toks = set(_symptom_tokens(entry.get("symptom")))
+        vocabulary |= toks
+        conditions = list(dict.fromkeys(entry.get("possible_conditions", [])))
+        urgency = entry.get("urgency", "low")
+        rows.append((i, entry.get("symptom"), _URGENCY_ORDER.index(urgency) if urgency in _URGENCY_ORDER else 0,
+                     " ".join(sorted(toks)), len(toks), json.dumps(conditions)))
+        exact.append((_normalize_symptom(entry.get("symptom")), i))
+        tokens.extend((t, i) for t in toks)
+    conn.executemany("INSERT INTO symptoms (id, symptom, urgency, tokens, token_count, conditions) "
+                     "VALUES (?, ?, ?, ?, ?, ?)", rows)
+    conn.executemany("INSERT OR IGNORE INTO symptom_exact (symptom_n, id) VALUES (?, ?)", exact)
+    conn.executemany("INSERT INTO symptom_tokens (token, id) VALUES (?, ?)", tokens)
+    conn.executemany("INSERT INTO symptom_vocab (token, grams) VALUES (?, ?)",
+                     ((t, len(_trigrams(t))) for t in sorted(vocabulary)))
+    conn.executemany("INSERT INTO symptom_trigrams (gram, token) VALUES (?, ?)",
+                     ((g, t) for t in sorted(vocabulary) for g in _trigrams(t)))
+    return len(rows)
+
+
+_IMPORTERS = {
+    "providers": _import_providers,
+    "coverage": _import_coverage,
+    "procedures": _import_procedures,
+    "contraindications": _import_contraindications,
+    "symptoms": _import_symptoms,
+}
+
+
+def import_json_datasets(db_path, data_dir=DATA_DIR):
+    """Build the dataset database at db_path from the JSON files in data_dir. Returns { dataset: rows }."""
+    tmp_path = f"{db_path}.tmp{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    counts = {}
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(SCHEMA)
+        conn.execute("BEGIN")
+        for name, importer in _IMPORTERS.items():
+            counts[name] = importer(conn, _read_json(os.path.join(data_dir, SOURCES[name])))
+        meta = {"schema_version": SCHEMA_VERSION, "import_id": uuid.uuid4().hex, "imported_at": time.time(),
+                **{f"rows.{name}": n for name, n in counts.items()}}
+        conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", ((k, str(v)) for k, v in meta.items()))
+        conn.execute("COMMIT")
+        conn.execute("INSERT INTO procedures_fts (procedures_fts) VALUES ('optimize')")
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return counts
@@ -0,0 +1,327 @@
+"""
+SQLite storage backend for the tool datasets (providers, insurance coverage, procedures,
+contraindications, symptoms), for data too large to hold as Python indexes in every worker.
+Enabled with DATASET_BACKEND=sqlite; the database (DATASET_DB, default data/datasets.sqlite3)
+is built from the JSON files by sqlite_import / scripts/import_datasets_sqlite.py.
+
+Workers open it read-only, one connection per thread, with the file memory-mapped so the page
+cache is shared. A re-import swaps in a new file; get_dataset_store notices (file identity,
+checked at most once per second) and opens it, while calls already running finish on the old one. Every query is a constant SQL string (list arguments go through json_each),
+so each statement is prepared once per connection and reused from sqlite3's statement cache.
+Rows that tools return verbatim are stored as their original JSON (doc columns).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+SCHEMA_VERSION = 1
+_DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "datasets.sqlite3")
+_MMAP_BYTES = 1 << 30
+# How often get_dataset_store checks whether the importer swapped in a new file
+_RELOAD_CHECK_SECONDS = 1.0
+_CONDITION, _MEDICATION = 0, 1
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+
+CREATE TABLE providers (pos INTEGER PRIMARY KEY, specialty_n TEXT NOT NULL, doc TEXT NOT NULL);
+CREATE INDEX idx_providers_specialty ON providers (specialty_n, pos);
+CREATE TABLE provider_locations (
+    location_key TEXT NOT NULL, specialty_n TEXT NOT NULL, pos INTEGER NOT NULL,
+    PRIMARY KEY (location_key, specialty_n, pos)
+) WITHOUT ROWID;
+CREATE INDEX idx_provider_locations_pos ON provider_locations (location_key, pos);
+CREATE TABLE location_keys (location_key TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE VIRTUAL TABLE provider_geo USING rtree(pos, min_lat, max_lat, min_lon, max_lon);
+
+CREATE TABLE coverage (
+    procedure_code TEXT NOT NULL, plan_id TEXT NOT NULL, plan_ord INTEGER NOT NULL,
+    covered INTEGER NOT NULL, doc TEXT NOT NULL,
+    PRIMARY KEY (procedure_code, plan_id)
+) WITHOUT ROWID;
+CREATE TABLE plans (plan_id TEXT PRIMARY KEY, plan_ord INTEGER NOT NULL) WITHOUT ROWID;
+
+CREATE TABLE procedures (id INTEGER PRIMARY KEY, doc TEXT NOT NULL);
+CREATE TABLE procedure_codes (code_key TEXT PRIMARY KEY, id INTEGER NOT NULL) WITHOUT ROWID;
+CREATE VIRTUAL TABLE procedures_fts USING fts5(name, description, content='', prefix='2 3');
+
+CREATE TABLE contraindications (procedure_code TEXT PRIMARY KEY, doc TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE contraindication_flags (
+    kind INTEGER NOT NULL, term TEXT NOT NULL, procedure_code TEXT NOT NULL,
+    PRIMARY KEY (kind, term, procedure_code)
+) WITHOUT ROWID;
+
+CREATE TABLE symptoms (
+    id INTEGER PRIMARY KEY, symptom TEXT, urgency INTEGER NOT NULL,
+    tokens TEXT NOT NULL, token_count INTEGER NOT NULL, conditions TEXT NOT NULL
+);
+CREATE TABLE symptom_exact (symptom_n TEXT PRIMARY KEY, id INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE symptom_tokens (token TEXT NOT NULL, id INTEGER NOT NULL, PRIMARY KEY (token, id)) WITHOUT ROWID;
+CREATE TABLE symptom_vocab (token TEXT PRIMARY KEY, grams INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE symptom_trigrams (gram TEXT NOT NULL, token TEXT NOT NULL, PRIMARY KEY (gram, token)) WITHOUT ROWID;
+"""
+
+_IN = "(SELECT value FROM json_each(?))"
+
+# Providers: text match is an exact location key if it has rows, else keys containing the text
+_PROVIDERS_ANY = "SELECT pos FROM providers"
+_PROVIDERS_SPECIALTY = "SELECT pos FROM providers WHERE specialty_n = ?"
+_PROVIDERS_KEY = "SELECT pos FROM provider_locations WHERE location_key = ?"
+_PROVIDERS_KEY_SPECIALTY = "SELECT pos FROM provider_locations WHERE location_key = ? AND specialty_n = ?"
+_PROVIDERS_KEYS = f"SELECT DISTINCT pos FROM provider_locations WHERE location_key IN {_IN}"
+_PROVIDERS_KEYS_SPECIALTY = (f"SELECT DISTINCT pos FROM provider_locations "
+                             f"WHERE location_key IN {_IN} AND specialty_n = ?")
+
+
+def _json(doc):
+    return json.loads(doc)
+
+
+def _file_id(path):
+    """Identity of the file at path: changes when the importer replaces it (new inode) or it is rewritten."""
+    st = os.stat(path)
+    return st.st_dev, st.st_ino, st.st_mtime_ns
+
+
+class SQLiteDatasetStore:
+    """Read-only query methods per dataset; results match the in-memory indexes' semantics."""
+
+    def __init__(self, path: str):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(
+                f"dataset database {path} not found; build it with scripts/import_datasets_sqlite.py"
+            )
+        self.path = path
+        self.file_id = _file_id(path)
+        self._local = threading.local()
+        self.meta = dict(self._conn().execute("SELECT key, value FROM meta"))
+        if int(self.meta.get("schema_version", 0)) != SCHEMA_VERSION:
+            raise RuntimeError(f"{path} has schema version {self.meta.get('schema_version')}, "
+                               f"expected {SCHEMA_VERSION}; re-run the importer")
+        self.import_id = self.meta.get("import_id", "")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            uri = "file:" + os.path.abspath(self.path) + "?mode=ro"
+            conn = self._local.conn = sqlite3.connect(uri, uri=True)
+            conn.execute(f"PRAGMA mmap_size={_MMAP_BYTES}")
+            conn.execute("PRAGMA query_only=1")
+        return conn
+
+    def _all(self, sql, params=()):
+        return self._conn().execute(sql, params).fetchall()
+
+    def _one(self, sql, params=()):
+        return self._conn().execute(sql, params).fetchone()
+
+    # Insurance coverage
+
+    def coverage_row(self, procedure_code: str, plan_id: str) -> Optional[dict]:
+        row = self._one("SELECT doc FROM coverage WHERE procedure_code = ? AND plan_id = ?", (procedure_code, plan_id))
+        return _json(row[0]) if row else None
+
+    def coverage_rows(self, procedure_codes: list, plan_id: str) -> dict:
+        """{ procedure_code: row } for the codes that have a row under plan_id."""
+        rows = self._all(f"SELECT procedure_code, doc FROM coverage WHERE plan_id = ? AND procedure_code IN {_IN}",
+                         (plan_id, json.dumps(procedure_codes)))
+        return {code: _json(doc) for code, doc in rows}
+
+    def plans_for(self, procedure_code: str) -> tuple[list, list]:
+        """(covering plan rows, not-covering plan IDs) for a code, plans in first-seen order."""
+        covered, not_covered = [], []
+        for plan_id, is_covered, doc in self._all(
+            "SELECT plan_id, covered, doc FROM coverage WHERE procedure_code = ? ORDER BY plan_ord", (procedure_code,)
+        ):
+            if is_covered:
+                covered.append((plan_id, _json(doc)))
+            else:
+                not_covered.append(plan_id)
+        return covered, not_covered
+
+    def plan_count(self) -> int:
+        return self._one("SELECT COUNT(*) FROM plans")[0]
+
+    # Contraindications
+
+    def contraindication(self, procedure_code: str):
+        """(entry, flagged condition set, flagged medication set), like the in-memory index, or None."""
+        row = self._one("SELECT doc FROM contraindications WHERE procedure_code = ?", (procedure_code,))
+        if row is None:
+            return None
+        item = _json(row[0])
+        return item, frozenset(item.get("flagged_conditions", [])), frozenset(item.get("flagged_medications", []))
+
+    def contraindication_entries(self, procedure_codes: list) -> dict:
+        """{ procedure_code: entry } for the codes with contraindication data."""
+        rows = self._all(f"SELECT procedure_code, doc FROM contraindications WHERE procedure_code IN {_IN}",
+                         (json.dumps(procedure_codes),))
+        return {code: _json(doc) for code, doc in rows}
+
+    def contraindication_hits(self, procedure_codes: list, conditions: list, medications: list) -> list:
+        """(procedure_code, is_medication, term) for every candidate flagged by one of the patient's terms."""
+        return self._all(
+            f"SELECT procedure_code, kind, term FROM contraindication_flags "
+            f"WHERE ((kind = {_CONDITION} AND term IN {_IN}) OR (kind = {_MEDICATION} AND term IN {_IN})) "
+            f"AND procedure_code IN {_IN}",
+            (json.dumps(conditions), json.dumps(medications), json.dumps(procedure_codes)),
+        )
+
+    # Procedures
+
+    def procedure_by_code(self, code_key: str) -> Optional[dict]:
+        row = self._one("SELECT p.doc FROM procedure_codes c JOIN procedures p ON p.id = c.id WHERE c.code_key = ?",
+                        (code_key,))
+        return _json(row[0]) if row else None
+
+    def procedure_search(self, tokens: list, limit: int, min_prefix_len: int) -> tuple[list, int]:
+        """
+        (top procedures, total matches) by FTS5 bm25 with the name column weighted 2x. Tokens
+        match as prefixes; documents matching every token are preferred, else any token.
+        """
+        terms = ['"%s"%s' % (t, "*" if len(t) >= min_prefix_len else "") for t in tokens]
+        for op in (" AND ", " OR "):
+            query = op.join(terms)
+            total = self._one("SELECT COUNT(*) FROM procedures_fts WHERE procedures_fts MATCH ?", (query,))[0]
+            if total:
+                rows = self._all(
+                    "SELECT p.doc FROM (SELECT rowid, bm25(procedures_fts, 2.0, 1.0) AS score FROM procedures_fts "
+                    "WHERE procedures_fts MATCH ? ORDER BY score, rowid LIMIT ?) m JOIN procedures p ON p.id = m.rowid "
+                    "ORDER BY m.score, m.rowid",
+                    (query, limit),
+                )
+                return [_json(doc) for doc, in rows], total
+            if len(terms) == 1:
+                break
+        return [], 0
+
+    def procedure_code_page(self, start: str, end: str, after: Optional[str], limit: int) -> tuple[list, int, bool]:
+        """(procedures with start <= code <= end sorting after `after`, in code order; total in range; more)."""
+        total = self._one("SELECT COUNT(*) FROM procedure_codes WHERE code_key BETWEEN ? AND ?", (start, end))[0]
+        rows = self._all(
+            "SELECT p.doc FROM procedure_codes c JOIN procedures p ON p.id = c.id "
+            "WHERE c.code_key BETWEEN ? AND ? AND c.code_key > ? ORDER BY c.code_key LIMIT ?",
+            (start, end, after if after is not None else "", limit + 1),
+        )
+        return [_json(doc) for doc, in rows[:limit]], total, len(rows) > limit
+
+    # Providers
+
+    def _provider_positions(self, specialty_n: str, location_n: str):
+        """(SQL selecting matching positions, params): the in-memory postings / substring rules."""
+        if not location_n:
+            return (_PROVIDERS_SPECIALTY, (specialty_n,)) if specialty_n else (_PROVIDERS_ANY, ())
+        exact = (_PROVIDERS_KEY_SPECIALTY, (location_n, specialty_n)) if specialty_n else (_PROVIDERS_KEY, (location_n,))
+        if self._one(exact[0] + " LIMIT 1", exact[1]):
+            return exact
+        keys = json.dumps([k for k, in self._all("SELECT location_key FROM location_keys WHERE instr(location_key, ?) > 0",
+                                                  (location_n,))])
+        return (_PROVIDERS_KEYS_SPECIALTY, (keys, specialty_n)) if specialty_n else (_PROVIDERS_KEYS, (keys,))
+
+    def provider_page(self, specialty_n: str, location_n: str, offset: int, limit: int) -> tuple[list, int]:
+        """(providers matching specialty + location text in file order, sliced; total matches)."""
+        sql, params = self._provider_positions(specialty_n, location_n)
+        total = self._one(f"SELECT COUNT(*) FROM ({sql})", params)[0]
+        rows = self._all(f"SELECT p.doc FROM ({sql}) m JOIN providers p ON p.pos = m.pos ORDER BY m.pos LIMIT ? OFFSET ?",
+                         params + (limit, offset))
+        return [_json(doc) for doc, in rows], total
+
+    def provider_rows(self, specialty_n: str, location_n: str) -> list:
+        """All providers matching specialty + location text, in file order."""
+        sql, params = self._provider_positions(specialty_n, location_n)
+        rows = self._all(f"SELECT p.doc FROM ({sql}) m JOIN providers p ON p.pos = m.pos ORDER BY m.pos", params)
+        return [_json(doc) for doc, in rows]
+
+    def provider_positions(self, specialty_n: str, location_n: str) -> set:
+        sql, params = self._provider_positions(specialty_n, location_n)
+        return {pos for pos, in self._all(sql, params)}
+
+    def providers_in_box(self, specialty_n: str, min_lat, max_lat, min_lon, max_lon) -> list:
+        """(pos, provider) for providers with coordinates inside the box (R*Tree), optionally one specialty."""
+        rows = self._all(
+            "SELECT p.pos, p.specialty_n, p.doc FROM provider_geo g JOIN providers p ON p.pos = g.pos "
+            "WHERE g.max_lat >= ? AND g.min_lat <= ? AND g.max_lon >= ? AND g.min_lon <= ?",
+            (min_lat, max_lat, min_lon, max_lon),
+        )
+        return [(pos, _json(doc)) for pos, spec, doc in rows if not specialty_n or spec == specialty_n]
+
+    # Symptoms
+
+    def symptom_exact(self, symptom_n: str) -> Optional[int]:
+        row = self._one("SELECT id FROM symptom_exact WHERE symptom_n = ?", (symptom_n,))
+        return row[0] if row else None
+
+    def symptom_token_known(self, token: str) -> bool:
+        return self._one("SELECT 1 FROM symptom_vocab WHERE token = ?", (token,)) is not None
+
+    def symptom_closest_token(self, grams: list, threshold: float, probes: int, candidates: int) -> Optional[str]:
+        """
+        SymptomIndex.correct_token in SQL: the top candidates by trigrams shared within the probes
+        rarest query trigrams, then the highest Dice similarity (>= threshold); ties by token.
+        """
+        row = self._one(
+            f"WITH q AS {_IN}, "
+            f"probe AS (SELECT gram FROM symptom_trigrams WHERE gram IN q GROUP BY gram "
+            f"ORDER BY COUNT(*), gram LIMIT ?), "
+            f"cand AS (SELECT token FROM symptom_trigrams WHERE gram IN probe GROUP BY token "
+            f"ORDER BY COUNT(*) DESC, token LIMIT ?) "
+            f"SELECT t.token, 2.0 * COUNT(*) / (? + v.grams) AS score FROM symptom_trigrams t "
+            f"JOIN symptom_vocab v ON v.token = t.token WHERE t.token IN cand AND t.gram IN q "
+            f"GROUP BY t.token ORDER BY score DESC, t.token LIMIT 1",
+            (json.dumps(grams), probes, candidates, len(grams)),
+        )
+        return row[0] if row and row[1] >= threshold else None
+
+    def symptom_matches(self, tokens: list) -> list:
+        """Ids of symptoms all of whose tokens are in tokens, ascending."""
+        return [i for i, in self._all(
+            f"SELECT t.id FROM symptom_tokens t JOIN symptoms s ON s.id = t.id WHERE t.token IN {_IN} "
+            f"GROUP BY t.id HAVING COUNT(*) = MAX(s.token_count) ORDER BY t.id",
+            (json.dumps(tokens),),
+        )]
+
+    def symptom_rows(self, ids: list) -> dict:
+        """{ id: (symptom, urgency rank, conditions, token set) }."""
+        rows = self._all(f"SELECT id, symptom, urgency, conditions, tokens FROM symptoms WHERE id IN {_IN}",
+                         (json.dumps(ids),))
+        return {i: (symptom, urgency, _json(conditions), frozenset(tokens.split())) for i, symptom, urgency, conditions, tokens in rows}
+
+    def stats(self) -> dict[str, Any]:
+        """Path, import id and per-table row counts recorded by the importer."""
+        rows = {k.split(".", 1)[1]: int(v) for k, v in self.meta.items() if k.startswith("rows.")}
+        return {"path": self.path, "import_id": self.import_id, "rows": rows}
+
+
+_stores: dict[str, SQLiteDatasetStore] = {}
+_checked: dict[str, float] = {}     # path -> monotonic time of the last file identity check
+_stores_lock = threading.Lock()
+
+
+def get_dataset_store() -> Optional[SQLiteDatasetStore]:
+    """
+    The SQLite store when DATASET_BACKEND=sqlite (path from DATASET_DB, default
+    data/datasets.sqlite3); None for the default in-memory backend (JSON via the registry).
+    """
+    if os.getenv("DATASET_BACKEND", "memory").strip().lower() != "sqlite":
+        return None
+    path = os.getenv("DATASET_DB") or _DEFAULT_PATH
+    store = _stores.get(path)
+    now = time.monotonic()
+    if store is not None and now - _checked.get(path, 0.0) < _RELOAD_CHECK_SECONDS:
+        return store
+    with _stores_lock:
+        store = _stores.get(path)
+        _checked[path] = now
+        if store is not None:
+            try:
+                if _file_id(path) == store.file_id:
+                    return store
+            except OSError:
+                return store  # file missing mid-swap: keep serving the open one
+        # First use, or a re-import replaced the file: open it; the old store's connections
+        # close once the calls still holding it return
+        store = _stores[path] = SQLiteDatasetStore(path)
+    return store
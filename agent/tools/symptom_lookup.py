@@ -1,23 +1,39 @@
 """
 Symptom lookup: mock for MVP. Returns possible conditions and urgency only — no diagnosis.
 PRE_SEARCH: mock for sprint; production = clinical knowledge base.
+
+Matching: a knowledge-base symptom matches an input when all of its tokens appear in the
+input ("severe headache" -> "headache", "pain in chest" -> "chest pain"). Input tokens that
+are not in the vocabulary are corrected by trigram similarity ("headahce" -> "headache").
+Ranking: conditions are ordered by how many input symptoms support them, computed from a
+sparse symptom x condition incidence matrix (CSR arrays) with numpy.
+With DATASET_BACKEND=sqlite the postings, vocabulary trigrams and rows are read from the store
+per query; fuzzy correction there picks the same candidates with the same tie-breaks.
 """
-import json
+import math
 import os
+import re
+from collections import Counter
+from itertools import chain
+
+import numpy as np
 
+from agent.tools.dataset_registry import registry
 from agent.tools.schemas import tool_result
+from agent.tools.sqlite_store import get_dataset_store
 
 _DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "symptom_lookup.json")
 _URGENCY_ORDER = ("low", "medium", "high")
-
-
-def _load_symptoms():
-    """Load symptom -> conditions + urgency from JSON."""
-    if not os.path.isfile(_DATA_PATH):
-        return []
-    with open(_DATA_PATH, encoding="utf-8") as f:
-        data = json.load(f)
-    return data.get("symptoms", [])
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Modifiers and filler that never identify a symptom on their own
+_STOP_WORDS = frozenset({
+    "a", "an", "and", "the", "of", "in", "on", "my", "with", "have", "has", "i", "am", "is",
+    "severe", "mild", "moderate", "bad", "very", "sudden", "constant", "slight", "some",
+})
+_MIN_FUZZY_LEN = 4
+_FUZZY_THRESHOLD = 0.5
+_FUZZY_CANDIDATES = 8
+_EMPTY = np.empty(0, dtype=np.int32)
 
 
 def _normalize(s):
@@ -25,10 +41,216 @@ def _normalize(s):
     return (s or "").strip().lower()
 
 
+def _tokens(s):
+    return [t for t in _TOKEN_RE.findall(_normalize(s)) if t not in _STOP_WORDS]
+
+
+def _trigrams(s):
+    padded = f"  {s} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _probe_count(q):
+    """
+    A token reaching the Dice threshold must share s_min of the query's q trigrams, so it
+    appears in one of the rarest q - s_min + 1 posting lists: only those are scanned.
+    """
+    s_min = math.ceil(_FUZZY_THRESHOLD * q / (2 - _FUZZY_THRESHOLD))
+    return max(1, q - s_min + 1)
+
+
+class SymptomIndex:
+    """
+    Token inverted index + trigram index over the token vocabulary + CSR incidence matrix.
+    entries[i] is the raw JSON entry; conditions[j] is a condition name.
+    """
+
+    def __init__(self, entries):
+        self.entries = list(entries)
+        self.exact = {}
+        self.conditions = []
+        condition_ids = {}
+        postings = {}
+        token_counts = []
+        indptr = [0]
+        indices = []
+        for i, entry in enumerate(self.entries):
+            self.exact.setdefault(_normalize(entry.get("symptom")), i)
+            toks = set(_tokens(entry.get("symptom")))
+            token_counts.append(len(toks))
+            for t in toks:
+                postings.setdefault(t, []).append(i)
+            row = []
+            for c in entry.get("possible_conditions", []):
+                j = condition_ids.get(c)
+                if j is None:
+                    j = condition_ids[c] = len(self.conditions)
+                    self.conditions.append(c)
+                if j not in row:
+                    row.append(j)
+            indices.extend(row)
+            indptr.append(len(indices))
+
+        self.postings = {t: np.array(ids, dtype=np.int32) for t, ids in postings.items()}
+        self.token_counts = np.array(token_counts, dtype=np.int32)
+        self.token_sets = None  # built lazily; only needed to drop less specific matches
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int32)
+        self.urgency = np.array(
+            [_URGENCY_ORDER.index(e.get("urgency", "low")) if e.get("urgency", "low") in _URGENCY_ORDER else 0
+             for e in self.entries],
+            dtype=np.int8,
+        )
+
+        self.vocabulary = sorted(self.postings)
+        self._vocab_trigrams = []
+        self._trigram_postings = {}
+        for k, tok in enumerate(self.vocabulary):
+            grams = _trigrams(tok)
+            self._vocab_trigrams.append(grams)
+            for g in grams:
+                self._trigram_postings.setdefault(g, []).append(k)
+
+    def correct_token(self, token):
+        """Known token as-is; otherwise the most similar vocabulary token (Dice over trigrams) or None."""
+        if token in self.postings:
+            return token
+        if len(token) < _MIN_FUZZY_LEN:
+            return None
+        grams = _trigrams(token)
+        # Rarest lists first (ties by trigram) so the probe is the same set the SQLite store picks
+        postings = [self._trigram_postings[g] for g in sorted(grams) if g in self._trigram_postings]
+        if not postings:
+            return None
+        postings.sort(key=len)
+        overlaps = Counter(chain.from_iterable(postings[:_probe_count(len(grams))]))
+        # Vocabulary ids follow token order, so (-overlap, id) and (-score, id) break ties by token
+        candidates = sorted(overlaps, key=lambda k: (-overlaps[k], k))[:_FUZZY_CANDIDATES]
+        best, best_score = None, 0.0
+        for k in sorted(candidates):
+            other = self._vocab_trigrams[k]
+            score = 2.0 * len(grams & other) / (len(grams) + len(other))
+            if score > best_score:
+                best, best_score = k, score
+        return self.vocabulary[best] if best is not None and best_score >= _FUZZY_THRESHOLD else None
+
+    def match(self, symptom):
+        """Entry ids matching one input symptom: exact phrase, else every entry whose tokens are all present."""
+        i = self.exact.get(_normalize(symptom))
+        if i is not None:
+            return np.array([i], dtype=np.int32)
+        tokens = {t for t in (self.correct_token(tok) for tok in _tokens(symptom)) if t is not None}
+        if not tokens:
+            return _EMPTY
+        ids, hits = np.unique(np.concatenate([self.postings[t] for t in tokens]), return_counts=True)
+        matched = ids[hits == self.token_counts[ids]]
+        if len(matched) > 1:
+            matched = self._most_specific(matched)
+        return matched
+
+    def _most_specific(self, matched):
+        """Drop entries whose tokens are a strict subset of another match ("pain" when "chest pain" matched)."""
+        if self.token_sets is None:
+            self.token_sets = [frozenset(_tokens(e.get("symptom"))) for e in self.entries]
+        sets = [self.token_sets[i] for i in matched]
+        keep = [i for i, s in zip(matched, sets) if not any(s < other for other in sets)]
+        return np.array(keep, dtype=np.int32)
+
+    def _gather(self, entry_ids):
+        """Condition ids of the given incidence-matrix rows, concatenated in row order."""
+        if len(entry_ids) == 0:
+            return _EMPTY
+        starts = self.indptr[entry_ids]
+        lengths = self.indptr[entry_ids + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return _EMPTY
+        # Flat positions of every nonzero in the selected rows
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        return self.indices[offsets + np.arange(total)]
+
+    def rank(self, symptoms):
+        """
+        Returns (ranked [(condition, support)], max urgency, matched {input: [kb symptoms]}).
+        Support = number of input symptoms whose matches list the condition; ties keep first-seen order.
+        """
+        rows = []
+        matched = {}
+        for sym in symptoms:
+            ids = self.match(sym)
+            if len(ids):
+                matched[sym] = [self.entries[i]["symptom"] for i in ids]
+                rows.append(ids)
+        if not rows:
+            return [], "low", matched
+
+        urgency = _URGENCY_ORDER[int(self.urgency[np.concatenate(rows)].max())]
+        gathered = [self._gather(ids) for ids in rows]
+        seen = np.concatenate(gathered)
+        if len(seen) == 0:
+            return [], urgency, matched
+        # Each input counts once per condition; ties keep the order conditions were first seen
+        support = np.bincount(np.concatenate([np.unique(g) for g in gathered]), minlength=len(self.conditions))
+        ids, first_seen = np.unique(seen, return_index=True)
+        order = np.lexsort((first_seen, -support[ids]))
+        return [(self.conditions[ids[k]], int(support[ids[k]])) for k in order], urgency, matched
+
+
+def _build_index(data):
+    """Build the symptom index (inverted index, fuzzy token index, incidence matrix) from JSON."""
+    return SymptomIndex(data.get("symptoms", []))
+
+
+registry.register("symptom_lookup", _DATA_PATH, _build_index)
+
+
+def _store_match(store, symptom):
+    """SymptomIndex.match over the SQLite store (before dropping less specific matches)."""
+    i = store.symptom_exact(_normalize(symptom))
+    if i is not None:
+        return [i]
+    tokens = set()
+    for tok in _tokens(symptom):
+        if store.symptom_token_known(tok):
+            tokens.add(tok)
+        elif len(tok) >= _MIN_FUZZY_LEN:
+            grams = _trigrams(tok)
+            corrected = store.symptom_closest_token(sorted(grams), _FUZZY_THRESHOLD, _probe_count(len(grams)),
+                                                    _FUZZY_CANDIDATES)
+            if corrected is not None:
+                tokens.add(corrected)
+    return store.symptom_matches(sorted(tokens)) if tokens else []
+
+
+def _store_rank(store, symptoms):
+    """SymptomIndex.rank over the SQLite store; same result shape and ordering rules."""
+    hits = [(sym, ids) for sym, ids in ((sym, _store_match(store, sym)) for sym in symptoms) if ids]
+    if not hits:
+        return [], "low", {}
+    rows = store.symptom_rows(sorted({i for _, ids in hits for i in ids}))
+    matched = {}
+    support = Counter()
+    first_seen = {}
+    urgency = 0
+    for sym, ids in hits:
+        if len(ids) > 1:
+            ids = [i for i in ids if not any(rows[i][3] < rows[j][3] for j in ids)]
+        matched[sym] = [rows[i][0] for i in ids]
+        conditions = {}
+        for i in ids:
+            urgency = max(urgency, rows[i][1])
+            for c in rows[i][2]:
+                conditions.setdefault(c, None)
+                first_seen.setdefault(c, len(first_seen))
+        support.update(conditions.keys())
+    ranked = sorted(first_seen, key=lambda c: (-support[c], first_seen[c]))
+    return [(c, support[c]) for c in ranked], _URGENCY_ORDER[urgency], matched
+
+
 def symptom_lookup(symptoms=None):
     """
     Look up possible conditions and urgency for given symptoms. No diagnosis.
-    Returns { success, data: { possible_conditions, urgency }?, error? }.
+    Returns { success, data: { possible_conditions, urgency, condition_support, matched_symptoms }?, error? }.
     """
     if symptoms is None:
         return tool_result(success=False, error="symptoms must be a list")
@@ -41,32 +263,19 @@ def symptom_lookup(symptoms=None):
             data={"possible_conditions": [], "urgency": "low"},
         )
 
-    symptom_data = _load_symptoms()
-    lookup = {_normalize(s["symptom"]): s for s in symptom_data}
-
-    possible_conditions = []
-    max_urgency = "low"
-    for sym in symptoms:
-        key = _normalize(sym)
-        if key in lookup:
-            entry = lookup[key]
-            possible_conditions.extend(entry.get("possible_conditions", []))
-            u = entry.get("urgency", "low")
-            if _URGENCY_ORDER.index(u) > _URGENCY_ORDER.index(max_urgency):
-                max_urgency = u
-
-    # Dedupe and cap conditions
-    seen = set()
-    unique = []
-    for c in possible_conditions:
-        if c not in seen:
-            seen.add(c)
-            unique.append(c)
+    inputs = [s for s in symptoms if isinstance(s, str)]
+    store = get_dataset_store()
+    if store is not None:
+        ranked, max_urgency, matched = _store_rank(store, inputs)
+    else:
+        ranked, max_urgency, matched = registry.get("symptom_lookup").rank(inputs)
 
     return tool_result(
         success=True,
         data={
-            "possible_conditions": unique if unique else ["No matching information in lookup; consult a provider."],
+            "possible_conditions": [c for c, _ in ranked] if ranked else ["No matching information in lookup; consult a provider."],
+            "condition_support": [{"condition": c, "supporting_symptoms": n} for c, n in ranked],
+            "matched_symptoms": matched,
             "urgency": max_urgency,
             "can_diagnose": False,
             "requires_provider_consultation": True
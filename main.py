@@ -3,19 +3,31 @@ FastAPI app for the healthcare agent. Run with:
   uvicorn main:app --reload
   uvicorn main:app --host 0.0.0.0 --port 8000  # for deployment
 """
+import json
 import os
+import time
 from typing import Any, Callable
 
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 
-from fastapi import FastAPI, HTTPException, Form, Response
+from fastapi import FastAPI, HTTPException, Form, Query, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from twilio.twiml.messaging_response import MessagingResponse
 
-from agent.orchestrator import run_agent
+from agent.lab_ingest import LabStreamInterpreter
+from agent.orchestrator import arun_agent, astream_agent
+from agent.tools.contraindication_check import contraindication_batch_check
+from agent.tools.dataset_registry import registry
+from agent.tools.fda_cache import get_fda_cache
+from agent.tools.sqlite_store import get_dataset_store
+from agent.tools.fda_client import get_fda_client
+from agent.tools.insurance_coverage_check import bulk_coverage_check
+from agent.tools.lab_result_interpretation import lab_result_batch_interpretation
 
 # Allowed origins for CORS (dev + dynamic from env)
 env_origins = os.getenv("CORS_ORIGINS", "")
@@ -29,7 +41,7 @@ class CORSPreflightMiddleware(BaseHTTPMiddleware):
     """Handle OPTIONS preflight before router so CORS always works."""
 
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        if request.method == "OPTIONS" and request.url.path in ("/chat", "/feedback"):
+        if request.method == "OPTIONS" and request.url.path in ("/chat", "/chat/stream", "/feedback"):
             origin = request.headers.get("origin", "")
             allow = origin if origin in CORS_ORIGINS else (CORS_ORIGINS[0] if CORS_ORIGINS else "*")
             return Response(
@@ -104,21 +116,22 @@ def _messages_to_history(messages: list[Any]) -> list[dict[str, str]]:
     return out
 
 
+def _tool_output(raw: Any) -> Any:
+    """Tool message content for display: parsed JSON when it is JSON, else as-is."""
+    try:
+        return json.loads(raw) if isinstance(raw, str) else raw
+    except Exception:
+        return raw
+
+
 def _extract_tools_used(messages: list[Any]) -> list[dict[str, Any]]:
     """Extract tool calls and outputs from agent messages for UI display."""
-    from langchain_core.messages import ToolMessage
-
     tool_outputs: dict[str, Any] = {}
     for m in messages:
         if getattr(m, "type", None) == "tool" or type(m).__name__ == "ToolMessage":
             tid = getattr(m, "tool_call_id", None)
             if tid:
-                raw = getattr(m, "content", None)
-                try:
-                    import json
-                    tool_outputs[tid] = json.loads(raw) if isinstance(raw, str) else raw
-                except Exception:
-                    tool_outputs[tid] = raw
+                tool_outputs[tid] = _tool_output(getattr(m, "content", None))
 
     tools_used: list[dict[str, Any]] = []
     for m in messages:
@@ -136,6 +149,7 @@ def _extract_tools_used(messages: list[Any]) -> list[dict[str, Any]]:
 
 
 @app.options("/chat")
+@app.options("/chat/stream")
 @app.options("/feedback")
 def cors_preflight(request: Request):
     """Handle CORS preflight so browser requests succeed."""
@@ -165,7 +179,12 @@ def root():
         "docs": "/docs",
         "health": "/health",
         "chat": "POST /chat with JSON body: {\"message\": \"...\"}",
-        "feedback": "POST /feedback"
+        "chat_stream": "POST /chat/stream with the /chat body; Server-Sent Events (token, tool_start, tool_end, final)",
+        "feedback": "POST /feedback",
+        "coverage": "POST /coverage/bulk with JSON body: {\"plan_id\": \"...\", \"codes\": [\"...\"]}",
+        "contraindications": "POST /contraindications/batch with JSON body: {\"procedure_codes\": [...], \"patient_conditions\": [...], \"patient_medications\": [...]}",
+        "labs": "POST /labs/interpret/batch with JSON body: {\"test_names\": [...], \"values\": [...]}",
+        "lab_ingest": "POST /labs/ingest with a CSV or NDJSON body; streams NDJSON results",
     }
 
 class FeedbackRequest(BaseModel):
@@ -179,12 +198,121 @@ def collect_feedback(feedback: FeedbackRequest):
     # In a real app, this would be saved to a database or sent to LangSmith / Braintrust.
     return {"status": "success", "recorded_rating": feedback.rating}
 
+class BulkCoverageRequest(BaseModel):
+    plan_id: str = Field(..., min_length=1, description="Insurance plan ID, e.g. plan_001")
+    codes: list[str] = Field(..., min_length=1, description="Procedure (CPT) codes on the claim")
+
+@app.post("/coverage/bulk")
+def coverage_bulk(request: BulkCoverageRequest):
+    """Check every procedure code of a claim against one plan; no LLM round-trip."""
+    result = bulk_coverage_check(codes=request.codes, plan_id=request.plan_id)
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result["data"]
+
+class ContraindicationBatchRequest(BaseModel):
+    procedure_codes: list[str] = Field(..., min_length=1, description="Candidate procedure (CPT) codes")
+    patient_conditions: list[str] = Field(default_factory=list, description="Patient conditions, e.g. active infection")
+    patient_medications: list[str] = Field(default_factory=list, description="Patient medications (brand or generic)")
+
+@app.post("/contraindications/batch")
+def contraindications_batch(request: ContraindicationBatchRequest):
+    """Which candidate procedures are flagged for one patient's conditions and medications; no LLM round-trip."""
+    result = contraindication_batch_check(
+        procedure_codes=request.procedure_codes,
+        patient_conditions=request.patient_conditions,
+        patient_medications=request.patient_medications,
+    )
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result["data"]
+
+class LabBatchRequest(BaseModel):
+    test_names: list[str] = Field(..., description="Test name per row, e.g. glucose, hdl, potassium")
+    values: list[float | str | None] = Field(..., description="Value per row (same length as test_names)")
+
+@app.post("/labs/interpret/batch")
+def labs_interpret_batch(request: LabBatchRequest):
+    """Classify many lab results (columnar) as normal/low/high against reference ranges; no LLM round-trip."""
+    result = lab_result_batch_interpretation(test_names=request.test_names, values=request.values)
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result["data"]
+
+# Optional upload limit in bytes (unset or 0: no limit, any file size streams through)
+_INGEST_MAX_BYTES = int(os.getenv("LABS_INGEST_MAX_BYTES") or 0)
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body generator may still be reading the request. Starlette's
+    StreamingResponse listens for http.disconnect on receive() while streaming, which would
+    swallow the request body messages the generator is waiting for; a client disconnect
+    instead surfaces as ClientDisconnect from request.stream().
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+@app.post("/labs/ingest")
+async def labs_ingest(request: Request, fmt: str | None = Query(default=None, alias="format")):
+    """
+    Bulk lab-result ingestion: read a CSV or NDJSON upload (raw request body) in chunks and
+    stream one NDJSON interpretation per row back, then a summary line. Format: ?format=csv|ndjson,
+    else the Content-Type (text/csv, application/x-ndjson), else detected from the first line.
+    Each request chunk is interpreted as it arrives and its rows are written back before the next
+    chunk is read, so memory stays bounded by the row batch size whatever the file size. Clients
+    must read the response while uploading (full duplex); one that sends the whole body first
+    stalls once the unread results fill the socket buffers. LABS_INGEST_MAX_BYTES, if set, caps
+    the upload: 413 up front from Content-Length, else reading stops at the limit and the summary
+    carries an error.
+    """
+    if fmt is None:
+        content_type = request.headers.get("content-type", "")
+        fmt = "csv" if "csv" in content_type else "ndjson" if "ndjson" in content_type or "jsonl" in content_type else None
+    try:
+        interpreter = LabStreamInterpreter(fmt=fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    length = request.headers.get("content-length", "")
+    if _INGEST_MAX_BYTES and length.isdigit() and int(length) > _INGEST_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"upload larger than {_INGEST_MAX_BYTES} bytes")
+
+    async def results():
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if _INGEST_MAX_BYTES and received > _INGEST_MAX_BYTES:
+                interpreter.abort(f"upload larger than {_INGEST_MAX_BYTES} bytes; rows after the limit were not read")
+                break
+            out = await run_in_threadpool(interpreter.feed, chunk)
+            if out:
+                yield out
+        yield interpreter.close()
+
+    return _DuplexStreamingResponse(results(), media_type="application/x-ndjson")
+
 @app.get("/health")
 def health():
     """Liveness/readiness for deployment."""
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+def metrics():
+    """Tool data-layer counters (datasets, openFDA cache and client/circuit breaker) for observability."""
+    fda_cache = get_fda_cache()
+    store = get_dataset_store()
+    return {
+        "datasets": registry.stats(),
+        "dataset_store": store.stats() if store is not None else None,
+        "fda_cache": fda_cache.stats() if fda_cache is not None else None,
+        "fda_client": get_fda_client().metrics(),
+    }
+
+
 from fastapi.responses import RedirectResponse
 
 @app.get("/video")
@@ -199,7 +327,7 @@ def redirect_to_social():
     return RedirectResponse(url="https://www.linkedin.com/posts/rujadughele_agentforge-healthcare-assistant-revolutionizing-activity-7434149629052755968-u-_9?utm_source=share&utm_medium=member_desktop&rcm=ACoAAA4V6ZgBWqALHufUh5CJtN7ydhAwslOs9Ec")
 
 @app.post("/chat", response_model=ChatResponse)
-def chat(request: ChatRequest):
+async def chat(request: ChatRequest):
     """
     Send a message to the agent. Optionally pass previous turns in history for context.
     Requires OPENAI_API_KEY or ANTHROPIC_API_KEY in the environment.
@@ -208,7 +336,7 @@ def chat(request: ChatRequest):
     if request.history:
         history = [{"role": m.role, "content": m.content} for m in request.history]
 
-    result = run_agent(request.message, chat_history=history)
+    result = await arun_agent(request.message, chat_history=history)
 
     if result.get("error"):
         raise HTTPException(status_code=500, detail=result["error"])
@@ -221,6 +349,46 @@ def chat(request: ChatRequest):
     )
 
 
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    /chat as Server-Sent Events: "token" {text} while the model writes, "tool_start" {id, name, args}
+    and "tool_end" {id, name, output} around each tool call, then "final" with the /chat response
+    fields (output is the verified reply; appended is what the safety/fact-check verifiers added
+    after the streamed text) and timing {ttfb_ms, total_ms}, or "error" {error}.
+    ttfb_ms is the time to the first event, measured from when the request reached the handler.
+    """
+    history = None
+    if request.history:
+        history = [{"role": m.role, "content": m.content} for m in request.history]
+    started = time.perf_counter()
+
+    async def events():
+        first = None
+        async for event, data in astream_agent(request.message, chat_history=history):
+            first = first or time.perf_counter()
+            if event == "tool_end":
+                data = {**data, "output": _tool_output(data["output"])}
+            elif event == "final":
+                messages = data.get("messages", [])
+                data = {
+                    "output": data["output"],
+                    "appended": data["appended"],
+                    "history": _messages_to_history(messages),
+                    "tools_used": _extract_tools_used(messages),
+                    "timing": {"ttfb_ms": round((first - started) * 1000, 1),
+                               "total_ms": round((time.perf_counter() - started) * 1000, 1)},
+                }
+            yield _sse(event, data)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.post("/sms")
 async def sms_reply(Body: str = Form(...)):
     """
@@ -229,7 +397,7 @@ async def sms_reply(Body: str = Form(...)):
     Returns an XML TwiML response.
     """
     # Call our agent with the incoming text
-    result = run_agent(query=Body, chat_history=None)
+    result = await arun_agent(query=Body, chat_history=None)
     
     # Extract the agent's response or an error message
     if result.get("error"):
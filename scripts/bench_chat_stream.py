@@ -0,0 +1,123 @@
+"""
+Benchmark: time to first byte vs total latency, POST /chat vs POST /chat/stream (SSE).
+Serves main.app with uvicorn on a local port (in a thread of this process) with the agent's
+model replaced by a stub: --latency seconds before each model call's first token and
+--token-delay seconds per answer word after it (two model calls per chat: tool call, then
+answer). A client measures, per request, the first response byte, the first "token" event
+and the full response; the stream's own final event reports server-side ttfb_ms/total_ms.
+
+Usage (from project root):
+  python scripts/bench_chat_stream.py
+  python scripts/bench_chat_stream.py --latency 1.5 --token-delay 0.05 --requests 20 --concurrency 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import httpx
+import uvicorn
+
+from scripts.stub_chat_model import stub_agent_model
+from main import app
+
+
+def _serve():
+    """Start uvicorn on a free port in a daemon thread; returns (server, base url)."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def _chat(client, body):
+    t0 = time.perf_counter()
+    async with client.stream("POST", "/chat", json=body) as response:
+        first = None
+        async for _ in response.aiter_bytes():
+            first = first or time.perf_counter()
+    response.raise_for_status()
+    total = time.perf_counter() - t0
+    return {"ttfb": first - t0, "first_token": total, "total": total}
+
+
+async def _chat_stream(client, body):
+    t0 = time.perf_counter()
+    first = first_token = None
+    event = server_timing = None
+    async with client.stream("POST", "/chat/stream", json=body) as response:
+        async for line in response.aiter_lines():
+            first = first or time.perf_counter()
+            if line.startswith("event: "):
+                event = line[7:]
+                if event == "token":
+                    first_token = first_token or time.perf_counter()
+            elif line.startswith("data: ") and event == "final":
+                server_timing = json.loads(line[6:])["timing"]
+    response.raise_for_status()
+    return {"ttfb": first - t0, "first_token": (first_token or time.perf_counter()) - t0,
+            "total": time.perf_counter() - t0, "server": server_timing}
+
+
+async def _measure(base_url, requests, concurrency):
+    body = {"message": "I have had a headache since this morning"}
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+        await _chat(client, body)  # build the agent outside the timings
+        results = {}
+        for label, call in (("/chat", _chat), ("/chat/stream", _chat_stream)):
+            gate = asyncio.Semaphore(concurrency)
+
+            async def one():
+                async with gate:
+                    return await call(client, body)
+
+            results[label] = await asyncio.gather(*(one() for _ in range(requests)))
+        return results
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=1.0, help="Stub seconds to first token per model call")
+    parser.add_argument("--token-delay", type=float, default=0.04, help="Stub seconds per answer word")
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+
+    with stub_agent_model(latency=args.latency, token_delay=args.token_delay):
+        server, base_url = _serve()
+        try:
+            results = asyncio.run(_measure(base_url, args.requests, args.concurrency))
+        finally:
+            server.should_exit = True
+
+    print(f"Stub model: {args.latency:g} s to first token per call, {args.token_delay:g} s per answer word; "
+          f"{args.requests} requests, {args.concurrency} at a time (medians)\n")
+    print(f"{'endpoint':14s} {'TTFB s':>8s} {'first token s':>14s} {'total s':>8s}")
+    for label, runs in results.items():
+        print(f"{label:14s} {_median(r['ttfb'] for r in runs):8.2f} {_median(r['first_token'] for r in runs):14.2f} "
+              f"{_median(r['total'] for r in runs):8.2f}")
+    server_side = [r["server"] for r in results["/chat/stream"]]
+    print(f"\n/chat/stream final event (server side): ttfb_ms {_median(t['ttfb_ms'] for t in server_side):.0f}, "
+          f"total_ms {_median(t['total_ms'] for t in server_side):.0f}")
+
+
+if __name__ == "__main__":
+    main()
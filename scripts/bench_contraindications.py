@@ -0,0 +1,103 @@
+"""
+Benchmark: reverse contraindication queries on a synthetic 10k-procedure dataset.
+For each synthetic patient (a few conditions and medications) and candidate list, compares
+the per-procedure path (hash lookup, then set membership per condition and medication, as
+contraindication_check does) against ContraindicationBitsets: one OR-ed patient mask and a
+vectorized bit test over all candidates. Reports per-patient latency for a 200-candidate
+pre-op list and for the whole catalog, plus bitset memory.
+
+Usage (from project root):
+  python scripts/bench_contraindications.py
+  python scripts/bench_contraindications.py --procedures 10000 --candidates 200 --patients 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent.tools.contraindication_bitsets import ContraindicationBitsets
+from agent.tools.contraindication_check import _build_index
+
+
+def synthetic_entries(n, n_conditions, n_medications, seed=21):
+    rng = random.Random(seed)
+    conditions = [f"condition {i}" for i in range(n_conditions)]
+    medications = [f"medication {i}" for i in range(n_medications)]
+    return [
+        {
+            "procedure_code": f"{10000 + i:05d}",
+            "procedure_name": f"Procedure {i}",
+            "flagged_conditions": rng.sample(conditions, rng.randint(0, 5)),
+            "flagged_medications": rng.sample(medications, rng.randint(0, 4)),
+            "reason": "Synthetic.",
+        }
+        for i in range(n)
+    ], conditions, medications
+
+
+def per_procedure(index, codes, conditions, medications):
+    """The single-check path applied to each candidate."""
+    out = []
+    for code in codes:
+        entry = index.get(code)
+        if not entry:
+            out.append(False)
+            continue
+        _, flagged_conditions, flagged_medications = entry
+        out.append(any(c in flagged_conditions for c in conditions) or any(m in flagged_medications for m in medications))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--procedures", type=int, default=10_000)
+    parser.add_argument("--candidates", type=int, default=200)
+    parser.add_argument("--patients", type=int, default=2_000)
+    parser.add_argument("--conditions", type=int, default=500, help="Distinct flagged conditions")
+    parser.add_argument("--medications", type=int, default=300, help="Distinct flagged medications")
+    args = parser.parse_args()
+
+    entries, conditions, medications = synthetic_entries(args.procedures, args.conditions, args.medications)
+    data = {"contraindications": entries}
+    index = _build_index(data)
+    t0 = time.perf_counter()
+    bitsets = ContraindicationBitsets.from_entries(entries)
+    build_s = time.perf_counter() - t0
+
+    rng = random.Random(22)
+    all_codes = [e["procedure_code"] for e in entries]
+    patients = [
+        (rng.sample(all_codes, args.candidates),
+         rng.sample(conditions, rng.randint(1, 6)),
+         rng.sample(medications, rng.randint(1, 8)))
+        for _ in range(args.patients)
+    ]
+
+    for label, lists in (
+        (f"{args.candidates} candidates", patients),
+        (f"whole catalog ({args.procedures:,})", [(all_codes, c, m) for _, c, m in patients[:200]]),
+    ):
+        t0 = time.perf_counter()
+        old = [per_procedure(index, codes, c, m) for codes, c, m in lists]
+        old_s = (time.perf_counter() - t0) / len(lists)
+        t0 = time.perf_counter()
+        new = [bitsets.flagged(codes, c, m) for codes, c, m in lists]
+        new_s = (time.perf_counter() - t0) / len(lists)
+        assert all(o == n.tolist() for o, n in zip(old, new))
+        flagged = np.mean([n.mean() for n in new])
+        print(f"{label}: per-procedure {old_s * 1000:8.3f} ms/patient, bitsets {new_s * 1000:8.3f} ms/patient "
+              f"({old_s / new_s:,.1f}x), {flagged:.0%} flagged")
+
+    print(f"Bitsets: {len(bitsets.conditions) + len(bitsets.medications):,} terms x {bitsets.words} words, "
+          f"{bitsets.nbytes / 2**20:.2f} MiB; build {build_s * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: reverse coverage queries on a synthetic plan x procedure table.
+Compares scanning the coverage row list (the only way to answer "which plans cover X"
+before), probing the (procedure_code, plan_id) hash index once per plan, and the dense
+CoverageMatrix row/column queries. Reports memory for the hash index and the matrix.
+
+Usage (from project root):
+  python scripts/bench_coverage_matrix.py
+  python scripts/bench_coverage_matrix.py --codes 10000 --plans 2000 --density 0.05
+"""
+import argparse
+import importlib
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent.tools.coverage_matrix import CoverageMatrix
+
+# agent.tools re-exports a function under the module's name
+coverage_module = importlib.import_module("agent.tools.insurance_coverage_check")
+
+_DETAILS = ["Copay may apply.", "Prior auth required.", "Not in network for this plan.", "Covered after deductible."]
+
+
+def synthetic_rows(n_codes, n_plans, density, seed=16):
+    rng = random.Random(seed)
+    codes = [f"{10000 + i:05d}" for i in range(n_codes)]
+    plans = [f"plan_{i:05d}" for i in range(n_plans)]
+    rows = []
+    for code in codes:
+        for plan in rng.sample(plans, max(1, int(n_plans * density * rng.uniform(0.5, 1.5)))):
+            rows.append({"procedure_code": code, "plan_id": plan, "covered": rng.random() < 0.7,
+                         "details": rng.choice(_DETAILS)})
+    return codes, plans, rows
+
+
+def scan_plans_for(rows, code):
+    """Old path: full scan of the row list."""
+    return [r["plan_id"] for r in rows if r["procedure_code"] == code and r["covered"]]
+
+
+def probe_plans_for(index, plans, code):
+    """Hash index: one (code, plan) probe per known plan."""
+    out = []
+    for plan in plans:
+        row = index.get((code, plan))
+        if row is not None and row.get("covered"):
+            out.append(plan)
+    return out
+
+
+def _timed(fn, args_list):
+    t0 = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - t0) / len(args_list)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--codes", type=int, default=10_000)
+    parser.add_argument("--plans", type=int, default=2_000)
+    parser.add_argument("--density", type=float, default=0.02, help="Share of cells with a coverage row")
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--scan-queries", type=int, default=5, help="Row scans are slow; sample them")
+    args = parser.parse_args()
+
+    codes, plans, rows = synthetic_rows(args.codes, args.plans, args.density)
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    index = coverage_module._build_index({"coverage": rows})
+    index_build_s = time.perf_counter() - t0
+    index_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    matrix = CoverageMatrix.from_rows(rows)
+    matrix_build_s = time.perf_counter() - t0
+
+    rng = random.Random(17)
+    code_queries = [(rng.choice(codes),) for _ in range(args.queries)]
+    plan_queries = [(rng.choice(plans),) for _ in range(args.queries)]
+
+    for (code,) in code_queries[:args.scan_queries]:
+        expected = set(scan_plans_for(rows, code))
+        assert set(probe_plans_for(index, plans, code)) == expected
+        assert set(matrix.plans_for(code)) == expected
+
+    scan_s = _timed(lambda c: scan_plans_for(rows, c), code_queries[:args.scan_queries])
+    probe_s = _timed(lambda c: probe_plans_for(index, plans, c), code_queries[:max(args.queries // 10, 1)])
+    row_s = _timed(matrix.plans_for, code_queries)
+    col_s = _timed(matrix.codes_for, plan_queries)
+    cell_s = _timed(matrix.lookup, [(c, p) for (c,), (p,) in zip(code_queries, plan_queries)])
+
+    print(f"Table: {len(codes):,} codes x {len(plans):,} plans, {len(rows):,} coverage rows "
+          f"({len(rows) / (len(codes) * len(plans)):.1%} of cells)")
+    print(f"Hash index build:           {index_build_s * 1000:10.1f} ms   {index_bytes / 2**20:8.1f} MiB (keys + dict)")
+    print(f"Matrix build:               {matrix_build_s * 1000:10.1f} ms   {matrix.nbytes / 2**20:8.1f} MiB (int8 status)")
+    print(f"Plans covering X, scan:     {scan_s * 1000:10.3f} ms/query")
+    print(f"Plans covering X, probes:   {probe_s * 1000:10.3f} ms/query")
+    print(f"Plans covering X, matrix:   {row_s * 1000:10.3f} ms/query  ({scan_s / row_s:,.0f}x vs scan)")
+    print(f"Codes covered by P, matrix: {col_s * 1000:10.3f} ms/query")
+    print(f"Single cell, matrix:        {cell_s * 1e6:10.2f} us/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Benchmark: cold dataset load and per-worker memory, JSON files vs the mmap'd snapshot.
+Writes scaled-up synthetic datasets (procedure catalog, insurance coverage rows,
+contraindications, providers; the other data/*.json files are copied as-is) to a temp
+directory and compiles them into a snapshot. Then starts --workers processes at once, like
+uvicorn workers, each cold-loading every registry index either from JSON (parse + build) or
+from the snapshot, and reports load time plus RSS, PSS (shared pages split between workers)
+and private memory per worker while all of them are alive.
+
+Usage (from project root):
+  python scripts/bench_dataset_snapshot.py
+  python scripts/bench_dataset_snapshot.py --procedures 20000 --plans 500 --workers 8
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_WORDS = ["knee", "hip", "shoulder", "spine", "heart", "colon", "skin", "lung", "replacement", "biopsy",
+          "repair", "injection", "resection", "arthroscopy", "imaging", "total", "partial", "open", "with",
+          "contrast", "laparoscopic", "bilateral", "revision", "guidance", "each", "additional", "level"]
+_SPECIALTIES = ["cardiology", "pediatrics", "dermatology", "orthopedics", "neurology", "oncology", "psychiatry"]
+_CITIES = ["Austin, TX", "Dallas, TX", "Houston, TX", "Denver, CO", "Boston, MA", "Seattle, WA", "Miami, FL"]
+_DETAILS = ["Copay may apply.", "Prior auth required.", "Not in network for this plan.", "Covered after deductible."]
+
+
+def write_datasets(out_dir, n_procedures, n_plans, density, n_providers, seed=22):
+    """Synthetic data files under the real file names; returns { file name: bytes }."""
+    rng = random.Random(seed)
+    codes = [f"{10000 + i:05d}" for i in range(n_procedures)]
+    plans = [f"plan_{i:04d}" for i in range(n_plans)]
+    conditions = [f"condition {i}" for i in range(400)]
+    medications = [f"medication {i}" for i in range(250)]
+    datasets = {
+        "procedures.json": {"procedures": [
+            {"code": c, "name": " ".join(rng.sample(_WORDS, 3)).title(),
+             "description": " ".join(rng.sample(_WORDS, rng.randint(6, 14))) + "."}
+            for c in codes
+        ]},
+        "insurance_coverage.json": {"coverage": [
+            {"procedure_code": c, "plan_id": p, "covered": rng.random() < 0.7, "details": rng.choice(_DETAILS)}
+            for c in codes for p in rng.sample(plans, max(1, int(n_plans * density)))
+        ]},
+        "contraindications.json": {"contraindications": [
+            {"procedure_code": c, "procedure_name": f"Procedure {c}",
+             "flagged_conditions": rng.sample(conditions, rng.randint(0, 5)),
+             "flagged_medications": rng.sample(medications, rng.randint(0, 4)), "reason": "Synthetic."}
+            for c in codes
+        ]},
+        "providers.json": {"providers": [
+            {"id": f"prov_{i:06d}", "name": f"Dr. Provider {i}", "specialty": rng.choice(_SPECIALTIES),
+             "location": rng.choice(_CITIES), "lat": round(rng.uniform(25, 48), 4), "lon": round(rng.uniform(-122, -71), 4)}
+            for i in range(n_providers)
+        ]},
+    }
+    for name in os.listdir(os.path.join(ROOT, "data")):
+        if name.endswith(".json") and name not in datasets:
+            shutil.copy(os.path.join(ROOT, "data", name), out_dir)
+    sizes = {}
+    for name, payload in datasets.items():
+        with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        sizes[name] = os.path.getsize(os.path.join(out_dir, name))
+    return sizes
+
+
+def _register_in(data_dir):
+    """Import the tools and point every registered dataset at data_dir."""
+    import agent.tools  # noqa: F401
+    import agent.tools.procedure_lookup  # noqa: F401
+    from agent.tools.dataset_registry import registry
+
+    for name, (path, builder) in registry.sources().items():
+        registry.register(name, os.path.join(data_dir, os.path.basename(path)), builder)
+    return registry
+
+
+def worker(data_dir, snapshot_path):
+    """Cold-load every index, report the time, then stay alive until the parent has measured memory."""
+    registry = _register_in(data_dir)
+    registry.attach_snapshot(snapshot_path)
+    t0 = time.perf_counter()
+    for name in registry.sources():
+        registry.get(name)
+    elapsed = time.perf_counter() - t0
+    gc.collect()
+    from_snapshot = sum(c["snapshot_loads"] for c in registry.stats()["datasets"].values())
+    print(json.dumps({"load_s": elapsed, "from_snapshot": from_snapshot}), flush=True)
+    sys.stdin.read()
+
+
+def _memory_kib(pid):
+    """Rss, Pss and private (clean + dirty) KiB from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return fields["Rss"], fields["Pss"], fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+
+
+def run_workers(n, data_dir, snapshot_path):
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", data_dir]
+    if snapshot_path:
+        cmd += ["--snapshot", snapshot_path]
+    procs = [subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True) for _ in range(n)]
+    try:
+        reports = [json.loads(p.stdout.readline()) for p in procs]
+        memory = [_memory_kib(p.pid) for p in procs]
+    finally:
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+    return reports, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--procedures", type=int, default=10_000)
+    parser.add_argument("--plans", type=int, default=300)
+    parser.add_argument("--density", type=float, default=0.1, help="Share of plans with a row per procedure")
+    parser.add_argument("--providers", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--worker", metavar="DATA_DIR", help=argparse.SUPPRESS)
+    parser.add_argument("--snapshot", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args.worker, args.snapshot)
+
+    from agent.tools.dataset_registry import _read_json
+    from agent.tools.dataset_snapshot import build_snapshot
+
+    data_dir = tempfile.mkdtemp(prefix="snapshot_bench_")
+    try:
+        sizes = write_datasets(data_dir, args.procedures, args.plans, args.density, args.providers)
+        snapshot_path = os.path.join(data_dir, "datasets.snapshot")
+        t0 = time.perf_counter()
+        build_snapshot(_register_in(data_dir).sources(), snapshot_path, _read_json)
+        build_s = time.perf_counter() - t0
+        total_json = sum(os.path.getsize(os.path.join(data_dir, f)) for f in os.listdir(data_dir) if f.endswith(".json"))
+        print(f"Datasets: {total_json / 2**20:.1f} MiB JSON "
+              f"({', '.join(f'{k} {v / 2**20:.1f}' for k, v in sizes.items())}); "
+              f"snapshot {os.path.getsize(snapshot_path) / 2**20:.1f} MiB, built in {build_s:.1f} s")
+
+        results = {}
+        for label, snap in (("JSON", None), ("snapshot", snapshot_path)):
+            reports, memory = run_workers(args.workers, data_dir, snap)
+            assert all(r["from_snapshot"] == (len(_register_in(data_dir).sources()) if snap else 0) for r in reports)
+            load_ms = sorted(r["load_s"] * 1000 for r in reports)
+            rss, pss, private = (sum(m[i] for m in memory) / len(memory) / 1024 for i in range(3))
+            results[label] = (load_ms[len(load_ms) // 2], rss, pss, private)
+            print(f"{label:9s} x{args.workers}: cold load {load_ms[len(load_ms) // 2]:8.1f} ms (median)   per worker: "
+                  f"RSS {rss:6.1f} MiB  PSS {pss:6.1f} MiB  private {private:6.1f} MiB")
+        (j_load, _, j_pss, j_priv), (s_load, _, s_pss, s_priv) = results["JSON"], results["snapshot"]
+        print(f"Snapshot vs JSON: load {j_load / s_load:,.1f}x faster, PSS -{j_pss - s_pss:.1f} MiB "
+              f"and private -{j_priv - s_priv:.1f} MiB per worker")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: class-level interaction rules on a large synthetic formulary.
+Compares per-pair class enumeration at query time against the precomputed
+membership table + class-pair index (_class_hits), and reports how many drug
+pairs a full load-time expansion of the class rules would have produced.
+
+Usage (from project root):
+  python scripts/bench_drug_classes.py
+  python scripts/bench_drug_classes.py --drugs 20000 --classes 300 --rules 3000 --list-size 60
+"""
+import argparse
+import importlib
+import os
+import random
+import sys
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# agent.tools re-exports the function under the module's name, so import the module explicitly
+dic = importlib.import_module("agent.tools.drug_interaction_check")
+
+
+def synthetic_formulary(n_drugs, n_classes, n_rules, seed=3):
+    rng = random.Random(seed)
+    drugs = [f"drug{i:06d}" for i in range(n_drugs)]
+    classes = [f"class{i:04d}" for i in range(n_classes)]
+    membership = {c: [] for c in classes}
+    for d in drugs:
+        for c in rng.sample(classes, rng.randint(1, 3)):
+            membership[c].append(d)
+    rules = set()
+    while len(rules) < n_rules:
+        a, b = rng.sample(classes, 2)
+        rules.add((a, b) if a < b else (b, a))
+    class_rules = [{"classes": [a, b], "severity": rng.choice(("minor", "major", "contraindicated")),
+                    "description": "synthetic"} for a, b in sorted(rules)]
+    return drugs, {"pairs": [], "classes": membership, "class_rules": class_rules}
+
+
+def per_pair_enumeration(index, meds):
+    """Naive query-time expansion: every pair x every class combination."""
+    drug_classes, class_rules = index["drug_classes"], index["class_rules"]
+    hits = {}
+    for i in range(len(meds)):
+        for j in range(i + 1, len(meds)):
+            a, b = meds[i], meds[j]
+            for ca in drug_classes.get(a, ()):
+                for cb in drug_classes.get(b, ()):
+                    rule = class_rules.get(dic._pair_key(ca, cb))
+                    if rule is not None:
+                        key = dic._pair_key(a, b)
+                        current = hits.get(key)
+                        if current is None or dic._severity_rank[rule["severity"]] > dic._severity_rank[current["severity"]]:
+                            hits[key] = rule
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drugs", type=int, default=20_000)
+    parser.add_argument("--classes", type=int, default=300)
+    parser.add_argument("--rules", type=int, default=3_000)
+    parser.add_argument("--list-size", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    drugs, data = synthetic_formulary(args.drugs, args.classes, args.rules)
+    t0 = time.perf_counter()
+    index = dic._build_index(data)
+    build_s = time.perf_counter() - t0
+
+    expanded = sum(len(data["classes"][r["classes"][0]]) * len(data["classes"][r["classes"][1]])
+                   for r in data["class_rules"])
+
+    rng = random.Random(5)
+    lists = [rng.sample(drugs, args.list_size) for _ in range(args.queries)]
+
+    t0 = time.perf_counter()
+    naive = [per_pair_enumeration(index, meds) for meds in lists]
+    naive_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    indexed = [dic._class_hits(meds, index) for meds in lists]
+    indexed_s = time.perf_counter() - t0
+
+    assert [set(h) for h in naive] == [set(h) for h in indexed]
+    avg_hits = sum(len(h) for h in indexed) / len(indexed)
+    print(f"Formulary: {args.drugs} drugs, {args.classes} classes, {args.rules} class rules "
+          f"(index build {build_s * 1000:.0f} ms)")
+    print(f"Full load-time expansion would create ~{expanded:,} drug pairs (not built)")
+    print(f"Queries:   {args.queries} lists of {args.list_size} meds (~{avg_hits:.1f} class hits each)\n")
+    print(f"Per-pair class enumeration: {naive_s / args.queries * 1000:8.3f} ms/query")
+    print(f"Membership + class index:   {indexed_s / args.queries * 1000:8.3f} ms/query")
+    print(f"Speedup:                    {naive_s / indexed_s:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: serial vs concurrent openFDA pair fan-out in drug_interaction_check.
+Runs against a local stub server with injected latency, so no network is needed.
+
+Usage (from project root):
+  python scripts/bench_fda_fanout.py
+  python scripts/bench_fda_fanout.py --latency 0.5 --meds 10
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Measure raw fan-out: keep the persistent response cache out of the way
+os.environ["FDA_CACHE_PATH"] = ""
+
+from scripts.fda_stub_server import FDAStubServer
+from agent.tools.fda_client import FDAClient, set_fda_client
+
+# agent.tools re-exports the function under the module's name, so import the module explicitly
+dic = importlib.import_module("agent.tools.drug_interaction_check")
+
+
+def _serial(pairs):
+    return [dic._check_fda_api(d1, d2) for d1, d2 in pairs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub latency per request (s)")
+    parser.add_argument("--meds", type=int, default=10, help="Medications in the list")
+    args = parser.parse_args()
+
+    meds = [f"drug{i:02d}" for i in range(args.meds)]
+    pairs = [(meds[i], meds[j]) for i in range(len(meds)) for j in range(i + 1, len(meds))]
+
+    with FDAStubServer(latency=args.latency) as stub:
+        set_fda_client(FDAClient(stub.url))
+        print(f"{len(meds)} medications -> {len(pairs)} pairs, stub latency {args.latency}s, "
+              f"pool size {dic._FDA_MAX_WORKERS}, deadline {dic._FDA_REQUEST_DEADLINE}s\n")
+
+        t0 = time.perf_counter()
+        serial = _serial(pairs)
+        serial_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        concurrent = dic._check_fda_pairs(pairs, deadline=60.0)
+        concurrent_s = time.perf_counter() - t0
+
+    assert [r is not None for r in serial] == [r is not None for r in concurrent]
+    rounds = -(-len(pairs) // dic._FDA_MAX_WORKERS)
+    print(f"Serial:     {serial_s:7.2f}s  (~{len(pairs)} round-trips)")
+    print(f"Concurrent: {concurrent_s:7.2f}s  (~{rounds} round-trip(s) at pool size {dic._FDA_MAX_WORKERS})")
+    print(f"Speedup:    {serial_s / concurrent_s:7.1f}x")
+    print(f"Client:     {dic.get_fda_client().metrics()}")
+
+
+if __name__ == "__main__":
+    main()
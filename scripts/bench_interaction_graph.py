@@ -0,0 +1,77 @@
+"""
+Benchmark: polypharmacy graph mode vs pairs mode (local tier only) over the curated index.
+Uses a synthetic formulary (default 1k drugs / 100k interacting pairs); no network.
+Pairs mode enumerates all n(n-1)/2 pairs; graph mode only visits adjacency hits.
+
+Usage (from project root):
+  python scripts/bench_interaction_graph.py
+  python scripts/bench_interaction_graph.py --drugs 1000 --pairs 100000 --list-size 60
+"""
+import argparse
+import importlib
+import os
+import random
+import sys
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# agent.tools re-exports the function under the module's name, so import the module explicitly
+dic = importlib.import_module("agent.tools.drug_interaction_check")
+
+
+def synthetic_dataset(n_drugs, n_pairs, seed=7):
+    rng = random.Random(seed)
+    drugs = [f"drug{i:05d}" for i in range(n_drugs)]
+    seen = set()
+    pairs = []
+    while len(pairs) < n_pairs:
+        a, b = rng.sample(drugs, 2)
+        key = (a, b) if a < b else (b, a)
+        if key in seen:
+            continue
+        seen.add(key)
+        pairs.append({"drugs": [a, b], "severity": rng.choice(("minor", "major", "contraindicated")),
+                      "description": "synthetic"})
+    return drugs, {"pairs": pairs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drugs", type=int, default=1000)
+    parser.add_argument("--pairs", type=int, default=100_000)
+    parser.add_argument("--list-size", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    drugs, data = synthetic_dataset(args.drugs, args.pairs)
+    t0 = time.perf_counter()
+    index = dic._build_index(data)
+    build_s = time.perf_counter() - t0
+    dic._get_index = lambda: index
+
+    rng = random.Random(11)
+    lists = [rng.sample(drugs, args.list_size) for _ in range(args.queries)]
+
+    t0 = time.perf_counter()
+    scan_hits = [dic._tiered_lookup(meds, latency_budget=0)[0] for meds in lists]
+    scan_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    graph_hits = [dic._interaction_graph(meds)[0] for meds in lists]
+    graph_s = time.perf_counter() - t0
+
+    assert [len(h) for h in scan_hits] == [len(h) for h in graph_hits]
+    n_pairs = args.list_size * (args.list_size - 1) // 2
+    avg_k = sum(len(h) for h in graph_hits) / len(graph_hits)
+    print(f"Formulary: {args.drugs} drugs, {args.pairs} interacting pairs (index build {build_s * 1000:.0f} ms)")
+    print(f"Queries:   {args.queries} lists of {args.list_size} meds ({n_pairs} pairs each, ~{avg_k:.0f} interactions)\n")
+    print(f"Pairs mode:    {scan_s / args.queries * 1000:8.3f} ms/query (local tier, FDA skipped)")
+    print(f"Graph mode:    {graph_s / args.queries * 1000:8.3f} ms/query (includes per-drug grouping)")
+    print(f"Speedup:       {scan_s / graph_s:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
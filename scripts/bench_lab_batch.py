@@ -0,0 +1,74 @@
+"""
+Benchmark: population-scale lab interpretation throughput.
+Compares calling lab_result_interpretation once per patient panel (a dict of test -> value,
+Python loop and per-item dicts) against classify_lab_batch on the same results laid out
+as columns (test names + values arrays). Reports rows/sec for both.
+
+Usage (from project root):
+  python scripts/bench_lab_batch.py
+  python scripts/bench_lab_batch.py --rows 1000000 --panel 8
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent.tools.lab_result_interpretation import (
+    BATCH_STATUSES,
+    REFERENCE_RANGES,
+    classify_lab_batch,
+    lab_result_interpretation,
+)
+
+# Feed spellings seen in exports, normalized by _normalize_key
+_ALIASES = {"a1c": ["a1c", "HbA1c", "Hemoglobin A1c"], "wbc": ["wbc", "WBC Count"], "cholesterol_total": ["Cholesterol"]}
+
+
+def synthetic_panels(n_rows, panel_size, seed=19):
+    rng = random.Random(seed)
+    tests = list(REFERENCE_RANGES)
+    panels = []
+    rows = 0
+    while rows < n_rows:
+        panel = {}
+        for test in rng.sample(tests, min(panel_size, n_rows - rows)):
+            ref = REFERENCE_RANGES[test]
+            hi = ref["max"] if ref["max"] < 1000 else ref["min"] * 3
+            panel[rng.choice(_ALIASES.get(test, [test]))] = round(rng.uniform(ref["min"] * 0.7, hi * 1.3), 1)
+        panels.append(panel)
+        rows += len(panel)
+    return panels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--panel", type=int, default=8, help="Tests per patient panel")
+    args = parser.parse_args()
+
+    panels = synthetic_panels(args.rows, args.panel)
+    names = [name for panel in panels for name in panel]
+    values = [value for panel in panels for value in panel.values()]
+
+    t0 = time.perf_counter()
+    old = [item["status"] for panel in panels for item in lab_result_interpretation(panel)["data"]["interpretations"]]
+    old_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    codes = classify_lab_batch(names, values)
+    new_s = time.perf_counter() - t0
+
+    assert old == [BATCH_STATUSES[c] for c in codes]
+    n = len(names)
+    print(f"Rows: {n:,} lab results in {len(panels):,} panels")
+    print(f"Per-panel dict calls:  {n / old_s:14,.0f} rows/s  ({old_s:.2f} s)")
+    print(f"Columnar numpy batch:  {n / new_s:14,.0f} rows/s  ({new_s:.3f} s, {old_s / new_s:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Benchmark: streaming bulk lab ingestion on a multi-GB synthetic feed.
+Writes a synthetic CSV or NDJSON lab export (or uses --file), then streams it through
+LabStreamInterpreter in upload-sized chunks, discarding the NDJSON output as a client
+would. Reports rows/sec and peak RSS; peak RSS should stay flat as --gb grows.
+--http runs the same file through POST /labs/ingest on a local uvicorn server instead
+(chunked upload sent from a writer thread while results are read back, as the endpoint
+requires) and reports the server's peak RSS.
+
+Usage (from project root):
+  python scripts/bench_lab_ingest.py
+  python scripts/bench_lab_ingest.py --gb 4 --format csv
+  python scripts/bench_lab_ingest.py --gb 1 --http
+"""
+import argparse
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent.lab_ingest import LabStreamInterpreter
+from agent.tools.lab_result_interpretation import REFERENCE_RANGES
+
+_NAMES = list(REFERENCE_RANGES) + ["HbA1c", "Cholesterol", "WBC Count", "vitamin_d"]
+_BLOCK_ROWS = 100_000
+
+
+def write_feed(path, target_bytes, fmt, seed=20):
+    """Synthetic export of about target_bytes; returns the row count. Written in blocks."""
+    rng = random.Random(seed)
+    rows = 0
+    with open(path, "wb") as f:
+        if fmt == "csv":
+            f.write(b"patient_id,test_name,value\n")
+        while f.tell() < target_bytes:
+            block = []
+            for _ in range(_BLOCK_ROWS):
+                patient, name, value = f"p{rows // 8:09d}", rng.choice(_NAMES), round(rng.uniform(0.1, 250.0), 1)
+                if fmt == "csv":
+                    block.append(f"{patient},{name},{value}\n")
+                else:
+                    block.append(f'{{"patient_id": "{patient}", "test_name": "{name}", "value": {value}}}\n')
+                rows += 1
+            f.write("".join(block).encode())
+    return rows
+
+
+def _chunks(path, chunk_size):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _peak_rss_mib(pid=None):
+    if pid is None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def run_in_process(path, fmt, chunk_size):
+    interpreter = LabStreamInterpreter(fmt=fmt)
+    out_bytes = 0
+    for chunk in _chunks(path, chunk_size):
+        out_bytes += len(interpreter.feed(chunk))
+    out_bytes += len(interpreter.close())
+    return interpreter.rows, out_bytes, None
+
+
+def _post_duplex(port, target, chunks):
+    """
+    POST chunks with chunked transfer encoding from a writer thread while yielding the response
+    body as it arrives. httpx sends the whole body before reading, which stalls against an
+    endpoint that streams results back during the upload.
+    """
+    sock = socket.create_connection(("127.0.0.1", port))
+    errors = []
+
+    def send_body():
+        try:
+            sock.sendall(f"POST {target} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+                         "Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n".encode())
+            for chunk in chunks:
+                sock.sendall(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            sock.sendall(b"0\r\n\r\n")
+        except OSError as e:
+            errors.append(e)
+
+    writer = threading.Thread(target=send_body, daemon=True)
+    writer.start()
+    try:
+        with sock.makefile("rb") as response:
+            status = response.readline().decode().strip()
+            headers = {}
+            while (line := response.readline()) not in (b"\r\n", b""):
+                key, _, value = line.decode().partition(":")
+                headers[key.strip().lower()] = value.strip()
+            if status.split()[1] != "200":
+                raise RuntimeError(f"{status}: {response.read().decode(errors='replace')}")
+            if headers.get("transfer-encoding") != "chunked":
+                while data := response.read(1 << 16):
+                    yield data
+                return
+            while size := int(response.readline().split(b";")[0], 16):
+                yield response.read(size)
+                response.readline()
+    finally:
+        sock.close()
+        writer.join()
+    if errors:
+        raise errors[0]
+
+
+def run_http(path, fmt, chunk_size):
+    import httpx
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        for _ in range(100):
+            try:
+                httpx.get(f"{base}/health", timeout=1.0)
+                break
+            except httpx.HTTPError:
+                time.sleep(0.2)
+        rows = out_bytes = 0
+        for chunk in _post_duplex(port, f"/labs/ingest?format={fmt}", _chunks(path, chunk_size)):
+            out_bytes += len(chunk)
+            rows += chunk.count(b"\n")
+        return rows - 1, out_bytes, _peak_rss_mib(server.pid)  # minus the summary line
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--gb", type=float, default=2.0, help="Synthetic feed size")
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--file", help="Existing feed to use instead of a synthetic one")
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic feed file")
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    parser.add_argument("--http", action="store_true", help="Go through POST /labs/ingest on uvicorn")
+    args = parser.parse_args()
+
+    baseline = _peak_rss_mib()
+    path = args.file
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=f".{args.format}")
+        os.close(fd)
+        t0 = time.perf_counter()
+        written = write_feed(path, int(args.gb * 2**30), args.format)
+        print(f"Wrote {written:,} rows ({os.path.getsize(path) / 2**30:.2f} GiB) in {time.perf_counter() - t0:.1f} s")
+    try:
+        run = run_http if args.http else run_in_process
+        t0 = time.perf_counter()
+        rows, out_bytes, server_rss = run(path, args.format, args.chunk_kb * 1024)
+        elapsed = time.perf_counter() - t0
+
+        size = os.path.getsize(path)
+        print(f"Feed:       {size / 2**30:.2f} GiB {args.format}, {rows:,} rows, {args.chunk_kb} KiB chunks"
+              f"{' via HTTP' if args.http else ''}")
+        print(f"Throughput: {rows / elapsed:,.0f} rows/s  ({size / 2**20 / elapsed:,.1f} MiB/s in, "
+              f"{out_bytes / 2**20 / elapsed:,.1f} MiB/s out, {elapsed:.1f} s)")
+        if server_rss is not None:
+            print(f"Peak RSS:   server {server_rss:,.0f} MiB")
+        else:
+            print(f"Peak RSS:   {_peak_rss_mib():,.0f} MiB (at start: {baseline:,.0f} MiB)")
+    finally:
+        if args.file is None and not args.keep:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: medication name resolution latency on a large synthetic vocabulary.
+Measures each resolution path (exact, synonym, dose-stripped, prefix, fuzzy, unknown)
+with the memo cache bypassed, so every lookup does the full work.
+
+Usage (from project root):
+  python scripts/bench_medication_names.py
+  python scripts/bench_medication_names.py --names 50000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent.tools.medication_names import MedicationResolver
+
+# Consonant-vowel(-consonant) syllables: ~2k distinct, closer to real drug-name trigram spread than a
+# handful of fixed syllables (which would make every trigram posting list enormous).
+_ONSETS = ["b", "c", "d", "f", "g", "k", "l", "m", "n", "p", "pr", "qu", "r", "s", "st", "t", "tr", "v", "x", "z"]
+_CODAS = ["", "", "l", "n", "r", "s", "x", "m"]
+_SYLLABLES = [o + v + c for o in _ONSETS for v in "aeiouy" for c in _CODAS]
+_SUFFIXES = ["pril", "sartan", "olol", "statin", "mab", "cillin", "azole", "oxetine", "pine", "tide"]
+
+
+def synthetic_vocabulary(n, seed=1):
+    rng = random.Random(seed)
+    generics = set()
+    while len(generics) < n:
+        generics.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))) + rng.choice(_SUFFIXES))
+    generics = sorted(generics)
+    brands = {}
+    for g in rng.sample(generics, n // 2):
+        brands["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 9)))] = g
+    return generics, brands
+
+
+def _misspell(rng, name):
+    i = rng.randrange(1, len(name) - 1)
+    return name[:i] + rng.choice("aeiou") + name[i + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--names", type=int, default=30_000, help="Generic names (brands add ~50%)")
+    parser.add_argument("--queries", type=int, default=2_000)
+    args = parser.parse_args()
+
+    generics, brands = synthetic_vocabulary(args.names)
+    t0 = time.perf_counter()
+    resolver = MedicationResolver(generics, brands)
+    build_s = time.perf_counter() - t0
+    print(f"Vocabulary: {len(resolver.names):,} names ({len(generics):,} generics); index build {build_s * 1000:.0f} ms\n")
+
+    rng = random.Random(2)
+    sample = rng.sample(generics, args.queries)
+    brand_names = list(brands)
+    workloads = {
+        "exact": sample,
+        "synonym": rng.sample(brand_names, args.queries),
+        "dose-stripped": [f"{g} {rng.choice([5, 10, 20, 500])}mg tablet" for g in sample],
+        "prefix": [g[:max(5, len(g) - 3)] for g in sample],
+        "fuzzy": [_misspell(rng, g) for g in sample],
+        "unknown": ["".join(rng.choice(string.ascii_lowercase) for _ in range(10)) for _ in sample],
+    }
+
+    print(f"{'path':<14} {'us/lookup':>10}  methods")
+    for label, queries in workloads.items():
+        methods = {}
+        t0 = time.perf_counter()
+        for q in queries:
+            _, method = resolver._resolve(q)  # bypass the memo cache
+            methods[method] = methods.get(method, 0) + 1
+        per_lookup_us = (time.perf_counter() - t0) / len(queries) * 1e6
+        print(f"{label:<14} {per_lookup_us:>10.1f}  {methods}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: procedure search on a synthetic CPT-sized catalog.
+Compares the previous substring scan over every name and description (unranked, every
+match returned) against the ProcedureIndex: BM25 inverted index with prefix matching and
+a top-k cutoff. Reports build time, per-query latency and result-list size, plus one page
+of a code-range query: filter-and-sort over every code vs bisect on the sorted code array.
+
+Usage (from project root):
+  python scripts/bench_procedure_lookup.py
+  python scripts/bench_procedure_lookup.py --procedures 10000 --limit 10
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent.tools.procedure_lookup import ProcedureIndex
+
+_SITES = ["knee", "hip", "shoulder", "elbow", "wrist", "ankle", "spine", "lumbar", "cervical", "thoracic",
+          "abdomen", "pelvis", "chest", "head", "brain", "heart", "liver", "kidney", "colon", "skin",
+          "breast", "thyroid", "prostate", "bladder", "lung", "eye", "ear", "sinus", "femur", "tibia"]
+_ACTIONS = ["replacement", "arthroscopy", "arthroplasty", "biopsy", "excision", "repair", "injection",
+            "aspiration", "resection", "fixation", "reconstruction", "ultrasound", "ct scan", "mri",
+            "x-ray", "angiography", "catheterization", "endoscopy", "drainage", "debridement"]
+_MODIFIERS = ["total", "partial", "open", "percutaneous", "laparoscopic", "bilateral", "unilateral",
+              "with contrast", "without contrast", "complex", "simple", "revision", "initial", "subsequent"]
+_FILLER = ["procedure", "including", "imaging", "guidance", "approach", "single", "multiple", "level",
+           "each", "additional", "separate", "report", "anesthesia", "supervision", "interpretation"]
+
+
+def synthetic_catalog(n, seed=17):
+    rng = random.Random(seed)
+    catalog = []
+    for i in range(n):
+        site, action = rng.choice(_SITES), rng.choice(_ACTIONS)
+        name = f"{rng.choice(_MODIFIERS)} {site} {action}".title()
+        extra = " ".join(rng.sample(_FILLER, rng.randint(3, 8)))
+        description = f"{rng.choice(_MODIFIERS).capitalize()} {action} of the {site}; {extra}."
+        catalog.append({"code": f"{10000 + i * 7 % 89999:05d}", "name": name, "description": description})
+    return catalog
+
+
+def old_lookup(rows, query):
+    """The previous path: exact code, else substring over lowercased name and description."""
+    q = query.strip().lower()
+    results = []
+    for proc, code, name, desc in rows:
+        if q == code:
+            results.append(proc)
+            continue
+        if q in name or q in desc:
+            results.append(proc)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--procedures", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    catalog = synthetic_catalog(args.procedures)
+    rows = [(p, p["code"].lower(), p["name"].lower(), p["description"].lower()) for p in catalog]
+
+    t0 = time.perf_counter()
+    index = ProcedureIndex(catalog)
+    build_s = time.perf_counter() - t0
+
+    rng = random.Random(18)
+    queries = []
+    for _ in range(args.queries):
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append(f"{rng.choice(_SITES)} {rng.choice(_ACTIONS)}")
+        elif kind < 0.7:
+            queries.append(rng.choice(_SITES + _ACTIONS))
+        else:
+            word = rng.choice(_ACTIONS).split()[0]
+            queries.append(f"{rng.choice(_SITES)} {word[:max(3, len(word) // 2)]}")  # autocomplete
+
+    t0 = time.perf_counter()
+    old_sizes = [len(old_lookup(rows, q)) for q in queries]
+    old_s = (time.perf_counter() - t0) / len(queries)
+
+    t0 = time.perf_counter()
+    new_sizes = [len(index.search(q, limit=args.limit)[0]) for q in queries]
+    new_s = (time.perf_counter() - t0) / len(queries)
+
+    ranges = []
+    for _ in range(args.queries):
+        a, b = sorted(rng.sample(index.codes, 2))
+        ranges.append((a, b))
+    t0 = time.perf_counter()
+    for a, b in ranges[:200]:
+        sorted(c for c in index.codes if a <= c <= b)[:20]
+    old_range_s = (time.perf_counter() - t0) / 200
+    t0 = time.perf_counter()
+    for a, b in ranges:
+        lo, hi = index.code_span(a, b)
+        index.page(lo, hi, limit=20)
+    new_range_s = (time.perf_counter() - t0) / len(ranges)
+
+    print(f"Catalog: {args.procedures:,} procedures, {len(index.vocabulary):,} terms; build {build_s * 1000:.1f} ms")
+    print(f"Substring scan:  {old_s * 1000:8.3f} ms/query, {sum(old_sizes) / len(queries):8.1f} results/query "
+          f"(max {max(old_sizes):,}, {old_sizes.count(0) / len(queries):.0%} empty)")
+    print(f"BM25 index:      {new_s * 1000:8.3f} ms/query, {sum(new_sizes) / len(queries):8.1f} results/query "
+          f"(top {args.limit}, {new_sizes.count(0) / len(queries):.0%} empty)  ({old_s / new_s:,.1f}x)")
+    print(f"Code range, first page of 20: filter+sort {old_range_s * 1000:.3f} ms, "
+          f"bisect {new_range_s * 1000:.4f} ms  ({old_range_s / new_range_s:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: provider search on a large synthetic directory.
+Compares the old linear scan (specialty filter + substring test on every location)
+against the provider index: (specialty, location) postings, cursor pages and the
+lat/long grid for radius queries (vs. a haversine scan of every provider).
+
+Usage (from project root):
+  python scripts/bench_provider_search.py
+  python scripts/bench_provider_search.py --providers 200000 --cities 2000
+"""
+import argparse
+import importlib
+import os
+import random
+import sys
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# agent.tools re-exports the function under the module's name, so import the module explicitly
+ps = importlib.import_module("agent.tools.provider_search")
+
+_SPECIALTIES = ["cardiology", "pediatrics", "dermatology", "orthopedics", "neurology", "oncology",
+                "family medicine", "internal medicine", "psychiatry", "radiology", "urology", "endocrinology"]
+_STATES = ["TX", "CA", "NY", "FL", "IL", "WA", "CO", "GA", "OH", "AZ"]
+
+
+def synthetic_directory(n_providers, n_cities, seed=21):
+    rng = random.Random(seed)
+    cities = [(f"City{i:04d}, {rng.choice(_STATES)}", rng.uniform(26.0, 48.0), rng.uniform(-122.0, -72.0))
+              for i in range(n_cities)]
+    providers = []
+    for i in range(n_providers):
+        city, lat, lon = rng.choice(cities)
+        providers.append({
+            "id": f"prov_{i:06d}", "name": f"Dr. Synthetic {i}", "specialty": rng.choice(_SPECIALTIES),
+            "location": city, "lat": lat + rng.uniform(-0.2, 0.2), "lon": lon + rng.uniform(-0.2, 0.2),
+        })
+    return providers, cities
+
+
+def linear_scan(providers, specialty, location):
+    """The previous implementation (minus the per-call JSON load)."""
+    spec, loc = specialty.strip().lower(), location.strip().lower()
+    return [p for p in providers if p["specialty"].lower() == spec and loc in p["location"].lower()]
+
+
+def geo_scan(providers, specialty, lat, lon, radius_km):
+    found = [(ps._haversine_km(lat, lon, p["lat"], p["lon"]), p) for p in providers if p["specialty"] == specialty]
+    return sorted((d, p["id"]) for d, p in found if d <= radius_km)
+
+
+def _timed(fn, queries):
+    t0 = time.perf_counter()
+    out = [fn(*q) for q in queries]
+    return (time.perf_counter() - t0) / len(queries), out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--providers", type=int, default=100_000)
+    parser.add_argument("--cities", type=int, default=1_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius-km", type=float, default=25.0)
+    args = parser.parse_args()
+
+    providers, cities = synthetic_directory(args.providers, args.cities)
+    t0 = time.perf_counter()
+    index = ps._build_index({"providers": providers})
+    build_s = time.perf_counter() - t0
+    # Serve the synthetic index from the registry so provider_search() runs end to end
+    ps.registry.register("providers", os.devnull, lambda _data: index)
+
+    rng = random.Random(22)
+    text_q = []
+    for _ in range(args.queries):
+        city, _, _ = rng.choice(cities)
+        text_q.append((rng.choice(_SPECIALTIES), rng.choice([city, city.split(",")[0], city.split(", ")[1]])))
+    geo_q = [(rng.choice(_SPECIALTIES), lat, lon, args.radius_km) for _, lat, lon in rng.sample(cities, args.queries)]
+
+    scan_s, scanned = _timed(lambda s, l: linear_scan(providers, s, l), text_q)
+    index_s, paged = _timed(lambda s, l: ps.provider_search(specialty=s, location=l)["data"], text_q)
+    assert [len(r) for r in scanned] == [d["total"] for d in paged]
+
+    geo_scan_s, geo_scanned = _timed(lambda s, la, lo, r: geo_scan(providers, s, la, lo, r), geo_q)
+    grid_s, grid_paged = _timed(lambda s, la, lo, r: ps.provider_search(
+        specialty=s, latitude=la, longitude=lo, radius_km=r)["data"], geo_q)
+    assert [len(r) for r in geo_scanned] == [d["total"] for d in grid_paged]
+
+    avg_total = sum(d["total"] for d in paged) / len(paged)
+    avg_geo = sum(d["total"] for d in grid_paged) / len(grid_paged)
+    print(f"Directory: {args.providers:,} providers, {args.cities:,} cities (index build {build_s * 1000:.0f} ms)")
+    print(f"Queries:   {args.queries} specialty+location (avg {avg_total:.0f} matches, first page "
+          f"{ps._DEFAULT_PAGE_SIZE}), {args.queries} radius {args.radius_km:g} km (avg {avg_geo:.0f} matches)\n")
+    print(f"Specialty + location, linear scan: {scan_s * 1000:9.3f} ms/query")
+    print(f"Specialty + location, index:       {index_s * 1000:9.3f} ms/query  ({scan_s / index_s:.0f}x)")
+    print(f"Radius, haversine scan:            {geo_scan_s * 1000:9.3f} ms/query")
+    print(f"Radius, lat/long grid:             {grid_s * 1000:9.3f} ms/query  ({geo_scan_s / grid_s:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: appointment slot calendar at directory scale.
+Compares regenerating every provider's slots for the whole horizon on each call and
+filtering linearly (the old _generate_dynamic_slots path) against the materialized
+SlotCalendar: build cost, day-rollover cost, and per-query range lookups.
+
+Usage (from project root):
+  python scripts/bench_slot_calendar.py
+  python scripts/bench_slot_calendar.py --providers 10000 --horizon 90
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import zlib
+from datetime import date, timedelta
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent.tools.slot_calendar import SlotCalendar
+
+_TIMES = [(f"{h:02d}:{m:02d}", f"{h:02d}:{m + 30:02d}") for h in range(8, 17) for m in (0,)]
+
+
+def synthetic_schedules(n_providers, seed=31):
+    rng = random.Random(seed)
+    return {f"prov_{i:06d}": sorted(rng.sample(_TIMES, rng.randint(2, 6))) for i in range(n_providers)}
+
+
+def regenerate_and_filter(schedules, horizon, today, provider_id, start, end):
+    """Old path: build every slot for every provider, then filter by provider and date."""
+    slots = []
+    for day_offset in range(horizon):
+        day = today + timedelta(days=day_offset)
+        if day.weekday() >= 5:
+            continue
+        iso = day.isoformat()
+        for pid, times in schedules.items():
+            for s, e in times:
+                if (day.toordinal() + zlib.crc32(f"{pid}|{s}".encode())) % 3 == 0:
+                    continue
+                slots.append({"provider_id": pid, "date": iso, "start_time": s, "end_time": e})
+    return [s for s in slots if s["provider_id"] == provider_id and start <= s["date"] <= end]
+
+
+class _Clock:
+    def __init__(self, today):
+        self.today = today
+
+    def __call__(self):
+        return self.today
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--providers", type=int, default=10_000)
+    parser.add_argument("--horizon", type=int, default=90, help="Days materialized ahead")
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--old-queries", type=int, default=2, help="Old path is slow; sample it")
+    args = parser.parse_args()
+
+    schedules = synthetic_schedules(args.providers)
+    clock = _Clock(date(2025, 3, 3))
+
+    t0 = time.perf_counter()
+    cal = SlotCalendar(schedules, horizon_days=args.horizon, today=clock)
+    build_s = time.perf_counter() - t0
+    slot_count = sum(len(cal.slots(pid, "0000-00-00", "9999-99-99")) for pid in cal.providers())
+
+    rng = random.Random(32)
+    pids = list(schedules)
+    queries = []
+    for _ in range(args.queries):
+        start = clock.today + timedelta(days=rng.randrange(args.horizon - 7))
+        queries.append((rng.choice(pids), start.isoformat(), (start + timedelta(days=rng.randint(0, 6))).isoformat()))
+
+    t0 = time.perf_counter()
+    for pid, start, end in queries[:args.old_queries]:
+        old = regenerate_and_filter(schedules, args.horizon, clock.today, pid, start, end)
+        assert old == cal.slots(pid, start, end)
+    old_s = (time.perf_counter() - t0) / args.old_queries
+
+    t0 = time.perf_counter()
+    for pid, start, end in queries:
+        cal.slots(pid, start, end)
+    new_s = (time.perf_counter() - t0) / args.queries
+
+    clock.today += timedelta(days=1)  # Monday -> Tuesday: one new weekday enters the window
+    t0 = time.perf_counter()
+    cal.window()
+    roll_s = time.perf_counter() - t0
+
+    print(f"Calendar: {args.providers:,} providers x {args.horizon} days = {slot_count:,} open slots")
+    print(f"Full build:              {build_s * 1000:10.1f} ms")
+    print(f"Day rollover (1 day):    {roll_s * 1000:10.1f} ms")
+    print(f"Regenerate + filter:     {old_s * 1000:10.1f} ms/query")
+    print(f"Calendar range query:    {new_s * 1000:10.4f} ms/query  ({old_s / new_s:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
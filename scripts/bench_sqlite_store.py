@@ -0,0 +1,167 @@
+"""
+Benchmark: tool query latency and worker memory, in-memory indexes vs the SQLite dataset store.
+Writes synthetic datasets at --rows scale (--rows insurance coverage rows; procedures,
+contraindications and providers scaled from it; symptoms are the real file) to a temp
+directory and imports them into SQLite. Then runs one worker process per backend that cold-starts,
+times the first call of each tool (index build / first page reads) and --queries calls of a
+fixed, seeded query mix per tool, and reports p50/p95 latency plus RSS split into heap
+(anonymous: Python objects, per worker) and mapped file pages (the database; page cache shared).
+
+Usage (from project root):
+  python scripts/bench_sqlite_store.py
+  python scripts/bench_sqlite_store.py --rows 200000 --queries 500
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scripts.bench_dataset_snapshot import _CITIES, _SPECIALTIES, _WORDS, _register_in, write_datasets
+
+_PLANS = 500
+_DENSITY = 0.1
+
+
+def _query_mix(n_procedures, n):
+    """{ tool label: [(function name, kwargs)] }, identical for both backends."""
+    rng = random.Random(23)
+    code = lambda: f"{10000 + rng.randrange(n_procedures):05d}"  # noqa: E731
+    plan = lambda: f"plan_{rng.randrange(_PLANS):04d}"  # noqa: E731
+    conditions = lambda: [f"condition {rng.randrange(400)}" for _ in range(3)]  # noqa: E731
+    medications = lambda: [f"medication {rng.randrange(250)}" for _ in range(2)]  # noqa: E731
+    city = lambda: rng.choice(_CITIES)  # noqa: E731
+    return {
+        "coverage single": [("insurance_coverage_check", {"procedure_code": code(), "plan_id": plan()}) for _ in range(n)],
+        "coverage bulk x50": [("bulk_coverage_check", {"codes": [code() for _ in range(50)], "plan_id": plan()})
+                              for _ in range(n)],
+        "covering plans": [("covering_plans", {"procedure_code": code()}) for _ in range(n)],
+        "contraindication": [("contraindication_check", {"procedure_code": code(), "patient_conditions": conditions(),
+                                                         "patient_medications": medications()}) for _ in range(n)],
+        "contraind. batch x200": [("contraindication_batch_check", {
+            "procedure_codes": [code() for _ in range(200)], "patient_conditions": conditions(),
+            "patient_medications": medications()}) for _ in range(n)],
+        "procedure code": [("procedure_lookup", {"query": code()}) for _ in range(n)],
+        "procedure search": [("procedure_lookup", {"query": " ".join(rng.sample(_WORDS, 2))}) for _ in range(n)],
+        "procedure prefix": [("procedure_lookup", {"query": code()[:3], "mode": "prefix"}) for _ in range(n)],
+        "provider text": [("provider_search", {"specialty": rng.choice(_SPECIALTIES), "location": city().split(",")[0]})
+                          for _ in range(n)],
+        "provider radius": [("provider_search", {"specialty": rng.choice(_SPECIALTIES), "latitude": rng.uniform(26, 47),
+                                                 "longitude": rng.uniform(-120, -73), "radius_km": 50}) for _ in range(n)],
+        "symptoms": [("symptom_lookup", {"symptoms": rng.sample(["headache", "fevr", "chest pain", "severe cough",
+                                                                 "nausea", "dizzyness"], 2)}) for _ in range(n)],
+    }
+
+
+def worker(data_dir, backend, db_path, n_procedures, queries):
+    """Run the query mix on one backend; print first-call and p50/p95 latencies and memory as JSON."""
+    os.environ["DATASET_BACKEND"] = backend
+    os.environ["DATASET_DB"] = db_path
+    registry = _register_in(data_dir)
+    registry.attach_snapshot(None)
+    from agent.tools.contraindication_check import contraindication_batch_check, contraindication_check
+    from agent.tools.insurance_coverage_check import bulk_coverage_check, covering_plans, insurance_coverage_check
+    from agent.tools.procedure_lookup import procedure_lookup
+    from agent.tools.provider_search import provider_search
+    from agent.tools.symptom_lookup import symptom_lookup
+    tools = {f.__name__: f for f in (insurance_coverage_check, bulk_coverage_check, covering_plans, contraindication_check,
+                                     contraindication_batch_check, procedure_lookup, provider_search, symptom_lookup)}
+
+    results = {}
+    start = time.perf_counter()
+    for label, calls in _query_mix(n_procedures, queries + 1).items():
+        timings = []
+        for name, kwargs in calls:
+            t0 = time.perf_counter()
+            result = tools[name](**kwargs)
+            timings.append(time.perf_counter() - t0)
+            assert result["success"], result
+        first, rest = timings[0], sorted(timings[1:])
+        results[label] = {"first_ms": first * 1000, "p50_ms": rest[len(rest) // 2] * 1000,
+                          "p95_ms": rest[int(len(rest) * 0.95)] * 1000}
+    gc.collect()
+    print(json.dumps({"results": results, "total_s": time.perf_counter() - start}), flush=True)
+    sys.stdin.read()
+
+
+def _memory_kib(pid):
+    """Rss, Anonymous and file-backed KiB from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return fields["Rss"], fields["Anonymous"], fields["Rss"] - fields["Anonymous"]
+
+
+def run_worker(data_dir, backend, db_path, n_procedures, queries):
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", data_dir, "--backend", backend, "--db", db_path,
+           "--n-procedures", str(n_procedures), "--queries", str(queries)]
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        report = json.loads(proc.stdout.readline())
+        report["memory"] = _memory_kib(proc.pid)
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Insurance coverage rows")
+    parser.add_argument("--queries", type=int, default=200, help="Timed calls per query type")
+    parser.add_argument("--worker", metavar="DATA_DIR", help=argparse.SUPPRESS)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--n-procedures", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args.worker, args.backend, args.db, args.n_procedures, args.queries)
+
+    from agent.tools.sqlite_import import import_json_datasets
+
+    n_procedures = max(1, args.rows // int(_PLANS * _DENSITY))
+    n_providers = args.rows // 5
+    data_dir = tempfile.mkdtemp(prefix="sqlite_bench_")
+    try:
+        write_datasets(data_dir, n_procedures, _PLANS, _DENSITY, n_providers)
+        db_path = os.path.join(data_dir, "datasets.sqlite3")
+        t0 = time.perf_counter()
+        counts = import_json_datasets(db_path, data_dir=data_dir)
+        import_s = time.perf_counter() - t0
+        total_json = sum(os.path.getsize(os.path.join(data_dir, f)) for f in os.listdir(data_dir) if f.endswith(".json"))
+        print(f"Rows: {', '.join(f'{k} {v:,}' for k, v in counts.items())} ({sum(counts.values()):,} total)")
+        print(f"JSON {total_json / 2**20:.1f} MiB; SQLite {os.path.getsize(db_path) / 2**20:.1f} MiB, "
+              f"imported in {import_s:.1f} s")
+
+        reports = {backend: run_worker(data_dir, backend, db_path, n_procedures, args.queries)
+                   for backend in ("memory", "sqlite")}
+        mem, sql = reports["memory"]["results"], reports["sqlite"]["results"]
+        print(f"\n{'query':22s} {'first call ms':>22s} {'p50 ms':>20s} {'p95 ms':>20s}")
+        print(f"{'':22s} {'memory':>10s} {'sqlite':>11s} {'memory':>9s} {'sqlite':>10s} {'memory':>9s} {'sqlite':>10s}")
+        for label in mem:
+            m, s = mem[label], sql[label]
+            print(f"{label:22s} {m['first_ms']:10.1f} {s['first_ms']:11.1f} {m['p50_ms']:9.3f} {s['p50_ms']:10.3f} "
+                  f"{m['p95_ms']:9.3f} {s['p95_ms']:10.3f}")
+        print()
+        for backend, report in reports.items():
+            rss, heap, mapped = (v / 1024 for v in report["memory"])
+            print(f"{backend:7s} worker: RSS {rss:7.1f} MiB = heap {heap:7.1f} MiB + file pages {mapped:6.1f} MiB  "
+                  f"(whole run {report['total_s']:.1f} s)")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: symptom lookup on a large synthetic knowledge base.
+Compares a per-call dict rebuild with exact matching and a Python ranking loop (the old
+path) against the SymptomIndex: token inverted index, trigram token correction and the
+numpy incidence-matrix ranking. Queries mix exact, reworded and misspelled symptoms.
+
+Usage (from project root):
+  python scripts/bench_symptom_lookup.py
+  python scripts/bench_symptom_lookup.py --entries 100000 --conditions 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent.tools.symptom_lookup import SymptomIndex
+
+_ONSETS = ["b", "c", "d", "f", "g", "h", "k", "l", "m", "n", "p", "r", "s", "t", "v", "w", "z"]
+_MODIFIERS = ["severe", "mild", "sudden", "constant"]
+
+
+def synthetic_kb(n_entries, n_conditions, vocab_size, seed=11):
+    rng = random.Random(seed)
+    vocab = set()
+    while len(vocab) < vocab_size:
+        vocab.add("".join(rng.choice(_ONSETS) + rng.choice("aeiou") for _ in range(rng.randint(2, 4))))
+    vocab = sorted(vocab)
+    conditions = [f"condition {i}" for i in range(n_conditions)]
+    phrases = set()
+    while len(phrases) < n_entries:
+        phrases.add(" ".join(rng.sample(vocab, rng.randint(1, 3))))
+    entries = [{"symptom": p, "possible_conditions": rng.sample(conditions, rng.randint(2, 6)),
+                "urgency": rng.choice(("low", "medium", "high"))} for p in sorted(phrases)]
+    return entries
+
+
+def old_lookup(entries, symptoms):
+    """The previous implementation: dict rebuilt per call, exact match, Python dedupe."""
+    lookup = {e["symptom"].strip().lower(): e for e in entries}
+    conditions = []
+    for s in symptoms:
+        entry = lookup.get(s.strip().lower())
+        if entry:
+            conditions.extend(entry["possible_conditions"])
+    return list(dict.fromkeys(conditions))
+
+
+def _typo(rng, word):
+    if len(word) < 5:
+        return word
+    i = rng.randrange(1, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--conditions", type=int, default=5_000)
+    parser.add_argument("--vocab", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--symptoms-per-query", type=int, default=4)
+    args = parser.parse_args()
+
+    entries = synthetic_kb(args.entries, args.conditions, args.vocab)
+    t0 = time.perf_counter()
+    index = SymptomIndex(entries)
+    build_s = time.perf_counter() - t0
+
+    rng = random.Random(12)
+    queries = []
+    for _ in range(args.queries):
+        picks = rng.sample(entries, args.symptoms_per_query)
+        queries.append([
+            picks[0]["symptom"],                                                    # exact
+            f"{rng.choice(_MODIFIERS)} {picks[1]['symptom']}",                      # modifier
+            " ".join(reversed(picks[2]["symptom"].split())),                        # reworded
+            " ".join(_typo(rng, w) for w in picks[3]["symptom"].split()),           # misspelled
+        ][:args.symptoms_per_query])
+
+    old_n = min(args.queries, 20)  # the rebuild-per-call path is slow; sample it
+    t0 = time.perf_counter()
+    old_matches = sum(len(old_lookup(entries, q)) > 0 for q in queries[:old_n])
+    old_s = (time.perf_counter() - t0) / old_n
+
+    t0 = time.perf_counter()
+    results = [index.rank(q) for q in queries]
+    new_s = (time.perf_counter() - t0) / args.queries
+    matched = sum(len(m) for _, _, m in results) / (args.queries * args.symptoms_per_query)
+
+    print(f"Knowledge base: {len(entries):,} symptoms, {args.conditions:,} conditions, "
+          f"{len(index.vocabulary):,} tokens (index build {build_s * 1000:.0f} ms)")
+    print(f"Queries:        {args.queries} x {args.symptoms_per_query} symptoms (exact, modifier, reworded, misspelled)\n")
+    print(f"Rebuild + exact match: {old_s * 1000:9.3f} ms/query  ({old_matches}/{old_n} queries with any match)")
+    print(f"SymptomIndex.rank:     {new_s * 1000:9.3f} ms/query  ({matched:.0%} of input symptoms matched)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Build step: compile the tool datasets (data/*.json) into one binary snapshot.
+Runs every registered index builder once and writes data/datasets.snapshot (or --out), which
+the dataset registry maps at startup so uvicorn workers share the prebuilt indexes instead of
+each parsing JSON. Re-run after changing a data file or tool code: stale entries are ignored
+(the registry falls back to JSON for them), never served.
+
+Usage (from project root):
+  python scripts/build_dataset_snapshot.py
+  python scripts/build_dataset_snapshot.py --out /srv/agentforge/datasets.snapshot
+  DATASET_SNAPSHOT=/srv/agentforge/datasets.snapshot uvicorn main:app --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import agent.tools  # noqa: F401  (registers the datasets)
+import agent.tools.procedure_lookup  # noqa: F401
+from agent.tools.dataset_registry import _DEFAULT_SNAPSHOT, _read_json, registry
+from agent.tools.dataset_snapshot import Snapshot, build_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--out", default=os.path.normpath(_DEFAULT_SNAPSHOT), help="Snapshot path")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    toc = build_snapshot(registry.sources(), args.out, _read_json)
+    elapsed = time.perf_counter() - t0
+
+    snapshot = Snapshot(args.out)
+    for name, entry in sorted(toc["datasets"].items()):
+        path = registry.sources()[name][0]
+        status = "ok" if snapshot.matches(name, path) else "STALE"
+        buffered = sum(n for _, n in entry["buffers"])
+        print(f"  {name:28s} {entry['source']:26s} pickle {entry['pickle'][1]:>10,} B  arrays {buffered:>12,} B  {status}")
+    print(f"Wrote {args.out}: {os.path.getsize(args.out):,} bytes, {len(toc['datasets'])} datasets, "
+          f"format v{toc['format_version']} in {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Local stand-in for the openFDA drug label endpoint, for benchmarks and tests.
+Every GET sleeps for `latency` seconds, then answers with a canned label hit
+(or a configurable HTTP status to simulate outages).
+
+Usage:
+  python scripts/fda_stub_server.py --port 8765 --latency 0.3
+  OPENFDA_API_URL=http://127.0.0.1:8765/drug/label.json uvicorn main:app
+
+In Python:
+  with FDAStubServer(latency=0.2) as stub:
+      set_fda_client(FDAClient(stub.url))
+"""
+import argparse
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.stub._lock:
+            self.server.stub.connection_count += 1
+
+    def do_GET(self):
+        stub = self.server.stub
+        with stub._lock:
+            stub.request_count += 1
+        if stub.latency:
+            time.sleep(stub.latency)
+        if stub.status != 200:
+            body = json.dumps({"error": {"code": "SERVER_ERROR"}}).encode()
+            status = stub.status
+        elif stub.found:
+            body = json.dumps({"results": [{"drug_interactions": [stub.description]}]}).encode()
+            status = 200
+        else:
+            body = json.dumps({"error": {"code": "NOT_FOUND", "message": "No matches found!"}}).encode()
+            status = 404
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # keep benchmark/test output clean
+        pass
+
+
+class FDAStubServer:
+    """
+    Threaded stub server on 127.0.0.1. Attributes can be changed while it runs:
+    latency (seconds), status (HTTP code; non-200 simulates outages), found (hit vs 404).
+    """
+
+    def __init__(self, latency=0.0, status=200, found=True, port=0,
+                 description="Stub label: concurrent use may increase bleeding risk."):
+        self.latency = latency
+        self.status = status
+        self.found = found
+        self.description = description
+        self.request_count = 0
+        self.connection_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}/drug/label.json"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local openFDA stub server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds to sleep per request")
+    parser.add_argument("--status", type=int, default=200, help="HTTP status to return (e.g. 503)")
+    parser.add_argument("--not-found", action="store_true", help="Answer every query with 404")
+    args = parser.parse_args()
+
+    stub = FDAStubServer(latency=args.latency, status=args.status, found=not args.not_found, port=args.port)
+    print(f"openFDA stub listening on {stub.url} (latency={args.latency}s, status={args.status})")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Build step: import the tool datasets (data/*.json) into the SQLite dataset database.
+Writes data/datasets.sqlite3 (or --out), which the tools query instead of in-memory indexes
+when DATASET_BACKEND=sqlite. The file is replaced atomically, so it can be rebuilt while
+workers are serving the previous one; re-run it whenever a data file changes.
+
+Usage (from project root):
+  python scripts/import_datasets_sqlite.py
+  python scripts/import_datasets_sqlite.py --data-dir /srv/agentforge/data --out /srv/agentforge/datasets.sqlite3
+  DATASET_BACKEND=sqlite DATASET_DB=/srv/agentforge/datasets.sqlite3 uvicorn main:app --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent.tools.sqlite_import import DATA_DIR, SOURCES, import_json_datasets
+from agent.tools.sqlite_store import _DEFAULT_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data-dir", default=os.path.normpath(DATA_DIR), help="Directory with the JSON datasets")
+    parser.add_argument("--out", default=os.path.normpath(_DEFAULT_PATH), help="Database path")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    counts = import_json_datasets(args.out, data_dir=args.data_dir)
+    elapsed = time.perf_counter() - t0
+
+    for name, rows in counts.items():
+        print(f"  {name:18s} {SOURCES[name]:26s} {rows:>10,} rows")
+    print(f"Wrote {args.out}: {os.path.getsize(args.out):,} bytes in {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Load test: concurrent /chat requests on one worker, async handler vs the old sync handler.
+Drives main.app in-process over ASGI (one event loop = one uvicorn worker) with the agent's
+model replaced by a stub that takes --latency seconds per call (two calls per chat: tool
+call, then answer). POST /chat is the async path (arun_agent, ainvoke); the sync baseline
+is the previous handler (def + run_agent), mounted for this run only, which FastAPI runs in
+its thread pool (40 threads). Reports wall time, throughput and p50/p95 latency per level.
+
+Usage (from project root):
+  python scripts/load_test_chat.py
+  python scripts/load_test_chat.py --latency 2 --concurrency 1 50 200 500
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import httpx
+
+from scripts.stub_chat_model import stub_agent_model
+from agent.orchestrator import run_agent
+from main import ChatRequest, app
+
+
+def _sync_chat(request: ChatRequest):
+    """The pre-async /chat handler: a blocking run_agent call on a thread-pool thread."""
+    result = run_agent(request.message)
+    return {"output": result["output"]}
+
+
+app.add_api_route("/bench/chat-sync", _sync_chat, methods=["POST"])
+
+
+async def run_level(client, path, n):
+    """n simultaneous chats; returns (wall seconds, sorted per-request latencies)."""
+    async def one(i):
+        t0 = time.perf_counter()
+        response = await client.post(path, json={"message": f"I have had a headache since morning ({i})"})
+        response.raise_for_status()
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    latencies = await asyncio.gather(*(one(i) for i in range(n)))
+    return time.perf_counter() - t0, sorted(latencies)
+
+
+async def main_async(args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await run_level(client, "/chat", 1)  # build the agent outside the timings
+        print(f"Stub model: {args.latency:g} s per call, 2 calls per chat "
+              f"(ideal single-chat latency {2 * args.latency:g} s)\n")
+        print(f"{'handler':8s} {'concurrent':>10s} {'wall s':>8s} {'chats/s':>8s} {'p50 s':>7s} {'p95 s':>7s}")
+        for label, path in (("async", "/chat"), ("sync", "/bench/chat-sync")):
+            for n in args.concurrency:
+                if label == "sync" and n > args.max_sync:
+                    continue
+                wall, latencies = await run_level(client, path, n)
+                print(f"{label:8s} {n:10d} {wall:8.2f} {n / wall:8.1f} "
+                      f"{latencies[len(latencies) // 2]:7.2f} {latencies[int(len(latencies) * 0.95)]:7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=1.0, help="Stub model seconds per call")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100, 200, 400])
+    parser.add_argument("--max-sync", type=int, default=200, help="Skip larger levels for the sync handler")
+    args = parser.parse_args()
+    with stub_agent_model(latency=args.latency):
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -40,6 +40,35 @@ def extract_tools_used(messages):
     return out
 
 
+def count_repeat_tool_calls(tools_used):
+    """
+    Calls beyond the first to the same tool in one case, by tool name.
+    Repeats usually mean the LLM retried (e.g. a new medication spelling), each costing a round-trip.
+    """
+    counts = {}
+    for name in tools_used:
+        counts[name] = counts.get(name, 0) + 1
+    return {name: n - 1 for name, n in counts.items() if n > 1}
+
+
+def previous_repeat_tool_calls(history_dir):
+    """
+    Total repeat tool calls in the most recent history run, or None if there is none.
+    Recounted from each case's tools_used, so older runs without the total still compare.
+    """
+    if not os.path.isdir(history_dir):
+        return None
+    runs = sorted(f for f in os.listdir(history_dir) if f.startswith("eval_") and f.endswith(".json"))
+    if not runs:
+        return None
+    with open(os.path.join(history_dir, runs[-1]), encoding="utf-8") as f:
+        previous = json.load(f)
+    return sum(
+        n for r in previous.get("results", [])
+        for n in count_repeat_tool_calls(r.get("tools_used", [])).values()
+    )
+
+
 def extract_tool_outputs(messages):
     """
     From run_agent() result messages, return dict: tool_name -> list of parsed output dicts.
@@ -132,6 +161,7 @@ def run_one_case(case, run_agent_fn):
         "tool_output_ok": tool_output_ok,
         "no_error": not bool(err),
         "tools_used": tools_used,
+        "repeat_tool_calls": count_repeat_tool_calls(tools_used),
         "expected_tools": list(expected_tools),
         "error": err,
         "output_preview": (output[:300] + "…") if len(output) > 300 else output,
@@ -146,6 +176,8 @@ def main():
     from agent.orchestrator import run_agent
     import time
 
+    out_dir = os.path.join(ROOT, "data", "eval_results")
+    previous_repeats = previous_repeat_tool_calls(out_dir)
     cases = load_eval_cases()
     print(f"Running eval harness on {len(cases)} cases from data/eval_cases.json ...")
     results = []
@@ -177,6 +209,17 @@ def main():
         print(f"  {cat}: {stats['passed']}/{stats['total']} ({pct:.0f}%)")
     print(f"\n--- Overall: {passed_total}/{total} ({overall_rate:.1f}%) ---")
 
+    # Repeat calls to the same tool within a case (LLM retries); compare across runs
+    repeats_by_tool = {}
+    for r in results:
+        for name, n in r["repeat_tool_calls"].items():
+            repeats_by_tool[name] = repeats_by_tool.get(name, 0) + n
+    cases_with_repeats = sum(1 for r in results if r["repeat_tool_calls"])
+    print(f"--- Repeat tool calls: {sum(repeats_by_tool.values())} across {cases_with_repeats} case(s) {repeats_by_tool or ''} ---")
+    if previous_repeats is not None:
+        print(f"--- Repeat tool calls vs previous run: {previous_repeats} -> {sum(repeats_by_tool.values())} "
+              f"({sum(repeats_by_tool.values()) - previous_repeats:+d}) ---")
+
     # Save results for regression / observability
     run_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
     payload = {
@@ -184,10 +227,12 @@ def main():
         "total": total,
         "passed": passed_total,
         "pass_rate_pct": round(overall_rate, 1),
+        "repeat_tool_calls": sum(repeats_by_tool.values()),
+        "repeat_tool_calls_by_tool": repeats_by_tool,
+        "cases_with_repeat_tool_calls": cases_with_repeats,
         "by_category": {c: {"total": s["total"], "passed": s["passed"], "pass_rate_pct": round((s["passed"] / s["total"] * 100) if s["total"] else 0, 1)} for c, s in by_cat.items()},
         "results": results,
     }
-    out_dir = os.path.join(ROOT, "data", "eval_results")
     os.makedirs(out_dir, exist_ok=True)
     out_path = os.path.join(ROOT, "data", "eval_results_latest.json")
     with open(out_path, "w", encoding="utf-8") as f:
@@ -0,0 +1,90 @@
+"""
+Stand-in chat model for the agent, for load tests and unit tests (no API key, no network).
+Each call waits `latency` seconds (time.sleep when invoked, asyncio.sleep when awaited), then
+asks for one symptom_lookup tool call on a new question and answers once the tool result is in,
+so a chat runs the full agent loop: model -> tool -> model. The answer takes `token_delay`
+seconds per word more; when streamed, words arrive one by one at that pace.
+
+In Python:
+  with stub_agent_model(latency=1.0):
+      result = await arun_agent("I have a headache")
+"""
+import asyncio
+import json
+import re
+import time
+from contextlib import contextmanager
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+ANSWER = "According to the symptom lookup, a headache is most often a tension headache. This is not a diagnosis; please consult your provider."
+_ANSWER_TOKENS = re.findall(r"\S+\s*", ANSWER)
+_TOOL_CALL = {"name": "symptom_lookup", "args": {"symptoms": ["headache"]}}
+
+
+class SlowStubChatModel(BaseChatModel):
+    """Tool-calling chat model with a fixed per-call latency."""
+
+    latency: float = 0.5
+    token_delay: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-stub"
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self
+
+    def _answering(self, messages: list[BaseMessage]) -> bool:
+        return isinstance(messages[-1], ToolMessage)
+
+    def _duration(self, messages: list[BaseMessage]) -> float:
+        return self.latency + (self.token_delay * len(_ANSWER_TOKENS) if self._answering(messages) else 0.0)
+
+    def _reply(self, messages: list[BaseMessage]) -> ChatResult:
+        if self._answering(messages):
+            message = AIMessage(content=ANSWER)
+        else:
+            message = AIMessage(content="", tool_calls=[dict(_TOOL_CALL, id=f"call_{len(messages)}")])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self._duration(messages))
+        return self._reply(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self._duration(messages))
+        return self._reply(messages)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        if not self._answering(messages):
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[{
+                "name": _TOOL_CALL["name"], "args": json.dumps(_TOOL_CALL["args"]), "id": f"call_{len(messages)}",
+                "index": 0,
+            }]))
+            return
+        for i, token in enumerate(_ANSWER_TOKENS):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+@contextmanager
+def stub_agent_model(latency: float = 0.5, token_delay: float = 0.0):
+    """Build the orchestrator's agent around SlowStubChatModel for the duration of the block."""
+    from agent import orchestrator
+
+    saved = orchestrator._get_model, orchestrator._agent
+    orchestrator._get_model = lambda: SlowStubChatModel(latency=latency, token_delay=token_delay)
+    orchestrator._agent = None
+    try:
+        yield
+    finally:
+        orchestrator._get_model, orchestrator._agent = saved
@@ -26,3 +26,10 @@ def sample_medications():
         ["warfarin", "aspirin"],
         ["lisinopril"],
     ]
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _isolated_fda_cache(tmp_path_factory):
+    """Keep the persistent openFDA cache out of data/ while tests run."""
+    os.environ["FDA_CACHE_PATH"] = str(tmp_path_factory.mktemp("fda_cache") / "fda_cache.sqlite3")
+    yield
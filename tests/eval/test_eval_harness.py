@@ -184,3 +184,12 @@ def test_full_harness_run():
     assert len(data["results"]) >= 20
     # Optional: allow non-zero exit if we're not at 100% yet
     # assert exit_code == 0
+
+
+def test_count_repeat_tool_calls():
+    """Repeat calls to the same tool in one case are counted (first call is free)."""
+    from scripts.run_eval_harness import count_repeat_tool_calls
+
+    tools = ["drug_interaction_check", "drug_interaction_check", "symptom_lookup", "drug_interaction_check"]
+    assert count_repeat_tool_calls(tools) == {"drug_interaction_check": 2}
+    assert count_repeat_tool_calls(["symptom_lookup"]) == {}
@@ -4,7 +4,14 @@ Run: pytest tests/unit/test_appointment_availability.py -v
 """
 import pytest
 
-from agent.tools.appointment_availability import appointment_availability
+from agent.tools.appointment_availability import (
+    _calendar,
+    _reservation_book,
+    appointment_availability,
+    book_appointment,
+    earliest_availability,
+    hold_appointment,
+)
 
 
 @pytest.mark.unit
@@ -51,3 +58,72 @@ class TestAppointmentAvailability:
         result = appointment_availability(provider_id=None, date_range="2025-03-01")
         assert result["success"] is False
         assert "error" in result
+
+
+@pytest.mark.unit
+class TestEarliestAvailability:
+    """One call merges every matching provider's calendar into the soonest k slots."""
+
+    def test_returns_k_soonest_slots_across_providers(self):
+        result = earliest_availability(specialty="cardiology", location="Austin", k=4)
+        assert result["success"] is True
+        slots = result["data"]["slots"]
+        assert len(slots) == 4
+        assert result["data"]["providers_considered"] == 2
+        keys = [(s["date"], s["start_time"]) for s in slots]
+        assert keys == sorted(keys)
+        assert {s["provider_id"] for s in slots} <= {"prov_001", "prov_002"}
+        assert all(s["provider_name"] and s["specialty"] == "cardiology" for s in slots)
+
+    def test_matches_per_provider_queries(self):
+        """Same answer as calling appointment_availability per provider and sorting."""
+        start, end = _calendar.window()
+        per_provider = []
+        for pid in ("prov_001", "prov_002"):
+            per_provider += appointment_availability(provider_id=pid, date_range=f"{start} to {end}")["data"]["slots"]
+        expected = sorted(per_provider, key=lambda s: (s["date"], s["start_time"]))[:6]
+        merged = earliest_availability(specialty="cardiology", location="Austin, TX", k=6)["data"]["slots"]
+        assert [(s["provider_id"], s["date"], s["start_time"]) for s in merged] == \
+               [(s["provider_id"], s["date"], s["start_time"]) for s in expected]
+
+    def test_date_range_and_no_matches(self):
+        result = earliest_availability(specialty="cardiology", location="Austin", date_range="2025-03-01")
+        assert result["success"] is True
+        assert result["data"]["slots"] == []
+        assert earliest_availability(specialty="oncology", location="Austin")["data"]["providers_considered"] == 0
+
+    def test_invalid_input_returns_graceful_error(self):
+        assert earliest_availability(specialty=None)["success"] is False
+        assert earliest_availability(specialty="cardiology", k=0)["success"] is False
+        assert earliest_availability(specialty="cardiology", date_range="someday")["success"] is False
+
+
+@pytest.mark.unit
+class TestHoldAndBook:
+    """Tool-level hold/book: a held slot disappears from availability."""
+
+    def test_held_slot_is_not_offered_again(self):
+        start, end = _calendar.window()
+        slot = appointment_availability(provider_id="prov_003", date_range=f"{start} to {end}")["data"]["slots"][-1]
+        held = hold_appointment(provider_id="prov_003", date=slot["date"], start_time=slot["start_time"])
+        assert held["success"] is True
+        remaining = appointment_availability(provider_id="prov_003", date_range=slot["date"])["data"]["slots"]
+        assert slot["start_time"] not in [s["start_time"] for s in remaining]
+        again = hold_appointment(provider_id="prov_003", date=slot["date"], start_time=slot["start_time"])
+        assert again["success"] is False
+
+        booked = book_appointment(hold_id=held["data"]["hold_id"], patient="Test Patient")
+        assert booked["success"] is True
+        assert booked["data"]["patient"] == "Test Patient"
+
+    def test_missing_arguments(self):
+        assert hold_appointment(provider_id="prov_001")["success"] is False
+        assert book_appointment()["success"] is False
+        assert book_appointment(hold_id="hold_missing")["success"] is False
+
+    def test_reservations_db_selects_shared_book(self, tmp_path, monkeypatch):
+        from agent.tools.slot_reservations import ReservationBook, SQLiteReservationBook
+        monkeypatch.delenv("RESERVATIONS_DB", raising=False)
+        assert isinstance(_reservation_book(), ReservationBook)
+        monkeypatch.setenv("RESERVATIONS_DB", str(tmp_path / "reservations.sqlite3"))
+        assert isinstance(_reservation_book(), SQLiteReservationBook)
@@ -0,0 +1,98 @@
+"""
+Tests for contraindication bitsets and the batch contraindication check.
+Run: pytest tests/unit/test_contraindication_check.py -v
+"""
+import numpy as np
+import pytest
+
+from agent.tools.contraindication_bitsets import ContraindicationBitsets
+from agent.tools.contraindication_check import contraindication_batch_check, contraindication_check
+
+_ENTRIES = [
+    {"procedure_code": "A", "flagged_conditions": ["infection"], "flagged_medications": ["warfarin"]},
+    {"procedure_code": "B", "flagged_conditions": ["angina"], "flagged_medications": ["warfarin", "heparin"]},
+    {"procedure_code": "C", "flagged_conditions": [], "flagged_medications": []},
+    {"procedure_code": "A", "flagged_conditions": ["angina"], "flagged_medications": []},   # duplicate: first wins
+]
+
+
+@pytest.mark.unit
+class TestContraindicationBitsets:
+    """Term -> packed procedure bitsets; one mask per patient, one bit test per candidate list."""
+
+    def test_builds_one_word_per_64_procedures(self):
+        b = ContraindicationBitsets.from_entries(_ENTRIES)
+        assert b.codes == ["A", "B", "C"]
+        assert b.words == 1
+        assert b.conditions["angina"].tolist() == [0b010]
+        assert b.medications["warfarin"].tolist() == [0b011]
+
+    def test_flagged_tests_every_candidate_against_the_combined_mask(self):
+        b = ContraindicationBitsets.from_entries(_ENTRIES)
+        assert b.flagged(["C", "B", "A", "Z"], ["angina"]).tolist() == [False, True, False, False]
+        assert b.flagged(["A", "B", "C"], medications=["warfarin"]).tolist() == [True, True, False]
+        assert b.flagged(["A", "B"], ["unknown"], ["unknown"]).tolist() == [False, False]
+
+    def test_bits_span_multiple_words(self):
+        entries = [{"procedure_code": str(i), "flagged_conditions": ["x"] if i % 3 == 0 else []}
+                   for i in range(200)]
+        b = ContraindicationBitsets.from_entries(entries)
+        assert b.words == 4
+        codes = [str(i) for i in range(200)]
+        assert np.flatnonzero(b.flagged(codes, ["x"])).tolist() == list(range(0, 200, 3))
+
+    def test_empty_dataset_flags_nothing(self):
+        b = ContraindicationBitsets.from_entries([])
+        assert b.flagged(["A"], ["infection"]).tolist() == [False]
+
+
+@pytest.mark.unit
+class TestContraindicationBatchCheck:
+    """Many candidate procedures against one patient in a single call."""
+
+    def test_flags_candidates_with_their_issues(self):
+        result = contraindication_batch_check(
+            procedure_codes=["27447", "45380", "93015"],
+            patient_conditions=["Unstable Angina"],
+            patient_medications=["Eliquis 5mg"],
+        )
+        assert result["success"] is True
+        flagged = {f["procedure_code"]: f for f in result["data"]["flagged"]}
+        assert flagged["27447"]["flagged_issues"] == ["Medication: apixaban"]
+        assert flagged["93015"]["flagged_issues"] == ["Condition: unstable angina"]
+        assert flagged["93015"]["procedure_name"] == "Cardiovascular stress test"
+        assert result["data"]["safe_codes"] == ["45380"]
+
+    def test_matches_single_checks(self):
+        codes = ["27447", "45380", "93015", "99999"]
+        conditions, medications = ["active infection", "toxic megacolon"], ["warfarin"]
+        data = contraindication_batch_check(codes, conditions, medications)["data"]
+        flagged = {f["procedure_code"]: f["flagged_issues"] for f in data["flagged"]}
+        for code in codes:
+            single = contraindication_check(code, conditions, medications)["data"]
+            assert (code in flagged) == (not single["safe"])
+            assert flagged.get(code, []) == single["flagged_issues"]
+
+    @pytest.mark.parametrize("code", ["27447", " 27447", "27447\n", 27447])
+    def test_single_check_normalizes_codes_like_the_batch(self, code):
+        single = contraindication_check(code, patient_medications=["apixaban"])["data"]
+        batch = contraindication_batch_check([str(code)], patient_medications=["apixaban"])["data"]
+        assert single["safe"] is False
+        assert single["flagged_issues"] == batch["flagged"][0]["flagged_issues"]
+
+    def test_unknown_codes_are_safe_and_reported(self):
+        data = contraindication_batch_check(["99999", " 27447 ", "27447"], ["active infection"])["data"]
+        assert [f["procedure_code"] for f in data["flagged"]] == ["27447"]
+        assert data["safe_codes"] == ["99999"]
+        assert data["no_data_codes"] == ["99999"]
+
+    def test_no_patient_terms_flags_nothing(self):
+        data = contraindication_batch_check(["27447", "45380"])["data"]
+        assert data["flagged"] == []
+        assert data["safe_codes"] == ["27447", "45380"]
+
+    @pytest.mark.parametrize("codes", [None, [], "27447", [27447], ["1"] * 501])
+    def test_invalid_codes(self, codes):
+        result = contraindication_batch_check(procedure_codes=codes)
+        assert result["success"] is False
+        assert result["error"]
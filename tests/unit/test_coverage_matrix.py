@@ -0,0 +1,58 @@
+"""
+Tests for the dense procedure x plan coverage matrix.
+Run: pytest tests/unit/test_coverage_matrix.py -v
+"""
+import pytest
+
+from agent.tools.coverage_matrix import COVERED, NOT_COVERED, UNKNOWN, CoverageMatrix
+
+_ROWS = [
+    {"procedure_code": "27447", "plan_id": "plan_a", "covered": True},
+    {"procedure_code": "27447", "plan_id": "plan_b", "covered": False},
+    {"procedure_code": "27447", "plan_id": "plan_c", "covered": True},
+    {"procedure_code": "99213", "plan_id": "plan_a", "covered": True},
+    {"procedure_code": "99213", "plan_id": "plan_a", "covered": False},   # duplicate: first row wins
+    {"procedure_code": "93000", "plan_id": "plan_c", "covered": False},
+    {"procedure_code": None, "plan_id": "plan_a", "covered": True},       # malformed: skipped
+]
+
+
+@pytest.mark.unit
+class TestCoverageMatrix:
+    """Interned code/plan tables with vectorized row and column queries."""
+
+    def test_interns_codes_and_plans_in_first_seen_order(self):
+        m = CoverageMatrix.from_rows(_ROWS)
+        assert m.codes == ["27447", "99213", "93000"]
+        assert m.plans == ["plan_a", "plan_b", "plan_c"]
+        assert m.shape == (3, 3)
+        assert m.nbytes == 9
+
+    def test_lookup_statuses(self):
+        m = CoverageMatrix.from_rows(_ROWS)
+        assert m.lookup("27447", "plan_a") == COVERED
+        assert m.lookup("27447", "plan_b") == NOT_COVERED
+        assert m.lookup("93000", "plan_a") == UNKNOWN
+        assert m.lookup("00000", "plan_a") == UNKNOWN
+        assert m.lookup("27447", "plan_zzz") == UNKNOWN
+
+    def test_first_row_wins_on_duplicates(self):
+        assert CoverageMatrix.from_rows(_ROWS).lookup("99213", "plan_a") == COVERED
+
+    def test_row_query_plans_for_code(self):
+        m = CoverageMatrix.from_rows(_ROWS)
+        assert m.plans_for("27447") == ["plan_a", "plan_c"]
+        assert m.plans_for("27447", NOT_COVERED) == ["plan_b"]
+        assert m.plans_for("unknown") == []
+
+    def test_column_query_codes_for_plan(self):
+        m = CoverageMatrix.from_rows(_ROWS)
+        assert m.codes_for("plan_a") == ["27447", "99213"]
+        assert m.codes_for("plan_c", NOT_COVERED) == ["93000"]
+        assert m.codes_for("plan_zzz") == []
+
+    def test_empty_rows(self):
+        m = CoverageMatrix.from_rows([])
+        assert m.shape == (0, 0)
+        assert m.plans_for("27447") == []
+        assert not m.has_code("27447")
@@ -0,0 +1,91 @@
+"""
+Tests for the shared dataset registry (load once, rebuild on file change or version bump).
+Run: pytest tests/unit/test_dataset_registry.py -v
+"""
+import json
+import os
+
+import pytest
+
+from agent.tools.dataset_registry import DatasetRegistry, registry
+
+
+def _write(path, payload, mtime_ns=None):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.mark.unit
+class TestDatasetRegistry:
+    """Registry caches built indexes and counts loads, reloads and hits."""
+
+    def test_builds_once_and_serves_hits(self, tmp_path):
+        path = tmp_path / "items.json"
+        _write(path, {"items": ["A", "B"]})
+        calls = []
+
+        def build(data):
+            calls.append(1)
+            return {i.lower() for i in data.get("items", [])}
+
+        reg = DatasetRegistry()
+        reg.register("items", str(path), build)
+        assert reg.get("items") == {"a", "b"}
+        assert reg.get("items") is reg.get("items")
+        assert len(calls) == 1
+        counters = reg.stats()["datasets"]["items"]
+        assert counters["loads"] == 1
+        assert counters["reloads"] == 0
+        assert counters["hits"] == 2
+
+    def test_reloads_when_file_changes(self, tmp_path):
+        path = tmp_path / "items.json"
+        _write(path, {"items": ["a"]}, mtime_ns=1_000_000_000)
+        reg = DatasetRegistry()
+        reg.register("items", str(path), lambda d: list(d.get("items", [])))
+        assert reg.get("items") == ["a"]
+
+        _write(path, {"items": ["a", "b"]}, mtime_ns=2_000_000_000)
+        assert reg.get("items") == ["a", "b"]
+        assert reg.stats()["datasets"]["items"]["reloads"] == 1
+
+    def test_invalidate_forces_rebuild(self, tmp_path):
+        path = tmp_path / "items.json"
+        _write(path, {"items": ["a"]})
+        reg = DatasetRegistry()
+        reg.register("items", str(path), lambda d: list(d.get("items", [])))
+        first = reg.get("items")
+        reg.invalidate()
+        assert reg.get("items") is not first
+        assert reg.stats()["version"] == 1
+        reg.invalidate("items")
+        reg.get("items")
+        assert reg.stats()["datasets"]["items"]["reloads"] == 2
+
+    def test_missing_file_builds_empty_index(self, tmp_path):
+        reg = DatasetRegistry()
+        reg.register("missing", str(tmp_path / "nope.json"), lambda d: d.get("rows", []))
+        assert reg.get("missing") == []
+
+    def test_unregistered_dataset_raises(self):
+        with pytest.raises(KeyError):
+            DatasetRegistry().get("unknown")
+
+    def test_tools_register_their_datasets(self):
+        """Importing the tools registers every data/*.json they use with the shared registry."""
+        import agent.tools  # noqa: F401
+        import agent.tools.procedure_lookup  # noqa: F401
+
+        names = set(registry.stats()["datasets"])
+        assert {
+            "drug_interactions",
+            "symptom_lookup",
+            "providers",
+            "insurance_coverage",
+            "insurance_coverage_matrix",
+            "procedures",
+            "contraindications",
+            "contraindication_bitsets",
+        } <= names
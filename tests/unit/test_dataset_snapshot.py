@@ -0,0 +1,126 @@
+"""
+Tests for the compiled dataset snapshot (build, mmap load, staleness fallback).
+Run: pytest tests/unit/test_dataset_snapshot.py -v
+"""
+import json
+
+import numpy as np
+import pytest
+
+import agent.tools  # noqa: F401
+import agent.tools.procedure_lookup  # noqa: F401
+import agent.tools.provider_search  # noqa: F401
+from agent.tools import dataset_snapshot
+from agent.tools.dataset_registry import DatasetRegistry, _read_json, registry
+from agent.tools.dataset_snapshot import Snapshot, SnapshotError, build_snapshot
+from agent.tools.procedure_lookup import procedure_lookup
+from agent.tools.provider_search import _build_index as build_provider_index
+from agent.tools.provider_search import provider_search
+
+
+def _write(path, payload):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+
+
+def _build_items(data):
+    items = data.get("items", [])
+    return {"names": items, "lengths": np.array([len(i) for i in items], dtype=np.int64)}
+
+
+@pytest.fixture
+def items_registry(tmp_path):
+    path = tmp_path / "items.json"
+    _write(path, {"items": ["alpha", "beta", "alpha"]})
+    calls = []
+
+    def build(data):
+        calls.append(1)
+        return _build_items(data)
+
+    reg = DatasetRegistry()
+    reg.register("items", str(path), build)
+    snapshot_path = str(tmp_path / "datasets.snapshot")
+    build_snapshot(reg.sources(), snapshot_path, _read_json)
+    calls.clear()
+    return reg, path, snapshot_path, calls
+
+
+@pytest.mark.unit
+class TestDatasetSnapshot:
+    """Prebuilt indexes served from the mmap'd snapshot while their sources are unchanged."""
+
+    def test_loads_prebuilt_index_without_building(self, items_registry):
+        reg, _, snapshot_path, calls = items_registry
+        assert reg.attach_snapshot(snapshot_path) is True
+        index = reg.get("items")
+        assert index["names"] == ["alpha", "beta", "alpha"]
+        assert index["names"][0] is index["names"][2]        # interned
+        assert index["lengths"].tolist() == [5, 4, 5]
+        assert not index["lengths"].flags.writeable           # backed by the read-only mapping
+        assert calls == []
+        assert reg.stats()["datasets"]["items"]["snapshot_loads"] == 1
+        assert reg.stats()["snapshot"] == snapshot_path
+
+    def test_changed_source_falls_back_to_json(self, items_registry):
+        reg, path, snapshot_path, calls = items_registry
+        _write(path, {"items": ["gamma"]})
+        reg.attach_snapshot(snapshot_path)
+        assert reg.get("items")["names"] == ["gamma"]
+        assert calls == [1]
+        assert reg.stats()["datasets"]["items"]["snapshot_loads"] == 0
+
+    def test_other_code_version_falls_back_to_json(self, items_registry, monkeypatch):
+        reg, _, snapshot_path, calls = items_registry
+        monkeypatch.setattr(dataset_snapshot, "code_fingerprint", lambda: "different")
+        reg.attach_snapshot(snapshot_path)
+        assert reg.get("items")["names"] == ["alpha", "beta", "alpha"]
+        assert calls == [1]
+
+    def test_detach_rebuilds_from_json(self, items_registry):
+        reg, _, snapshot_path, calls = items_registry
+        reg.attach_snapshot(snapshot_path)
+        reg.get("items")
+        assert reg.attach_snapshot(None) is False
+        reg.get("items")
+        assert calls == [1]
+        assert reg.stats()["snapshot"] is None
+
+    def test_invalid_file_is_rejected(self, tmp_path):
+        bad = tmp_path / "bad.snapshot"
+        bad.write_bytes(b"not a snapshot at all, just some bytes")
+        with pytest.raises(SnapshotError):
+            Snapshot(str(bad))
+        reg = DatasetRegistry()
+        with pytest.warns(RuntimeWarning):
+            assert reg.attach_snapshot(str(bad)) is False
+        assert reg.stats()["snapshot"] is None
+
+    def test_tools_answer_the_same_from_a_snapshot(self, tmp_path):
+        expected = procedure_lookup("knee")
+        previous = registry.snapshot_path
+        snapshot_path = str(tmp_path / "datasets.snapshot")
+        toc = build_snapshot(registry.sources(), snapshot_path, _read_json)
+        assert {"procedures", "insurance_coverage_matrix", "contraindication_bitsets"} <= set(toc["datasets"])
+        try:
+            assert registry.attach_snapshot(snapshot_path)
+            assert procedure_lookup("knee") == expected
+            assert registry.stats()["datasets"]["procedures"]["snapshot_loads"] >= 1
+        finally:
+            registry.attach_snapshot(previous)
+
+    def test_provider_cursor_survives_snapshot_but_not_a_data_change(self, tmp_path):
+        cursor = provider_search(specialty="", location="TX", limit=1)["data"]["next_cursor"]
+        previous = registry.snapshot_path
+        snapshot_path = str(tmp_path / "datasets.snapshot")
+        build_snapshot(registry.sources(), snapshot_path, _read_json)
+        try:
+            assert registry.attach_snapshot(snapshot_path)
+            assert provider_search(specialty="", location="TX", limit=1, cursor=cursor)["success"] is True
+        finally:
+            registry.attach_snapshot(previous)
+        data = {"providers": [{"name": "Dr. A", "specialty": "cardiology", "location": "Austin, TX"}]}
+        build_id = build_provider_index(data)["build_id"]
+        assert build_provider_index(json.loads(json.dumps(data)))["build_id"] == build_id
+        data["providers"][0]["location"] = "Dallas, TX"
+        assert build_provider_index(data)["build_id"] != build_id
@@ -0,0 +1,118 @@
+"""
+Tests for the natural-language date-range parser used by the appointment tools.
+Run: pytest tests/unit/test_date_parser.py -v
+"""
+from datetime import date
+
+import pytest
+
+from agent.tools.date_parser import find_date_ranges, parse_date_range, request_clock, today
+
+_WEDNESDAY = date(2025, 3, 5)
+
+
+def _span(text):
+    r = parse_date_range(text, _WEDNESDAY)
+    return None if r is None else (r["start"], r["end"], r["start_time"], r["end_time"])
+
+
+@pytest.mark.unit
+class TestDateParser:
+    """Relative, weekday and absolute expressions resolve against a fixed anchor date."""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("2025-03-01", ("2025-03-01", "2025-03-01", None, None)),
+        ("2025-03-01 to 2025-03-07", ("2025-03-01", "2025-03-07", None, None)),
+        ("today", ("2025-03-05", "2025-03-05", None, None)),
+        ("tomorrow morning", ("2025-03-06", "2025-03-06", "00:00", "12:00")),
+        ("this week", ("2025-03-05", "2025-03-09", None, None)),
+        ("next week", ("2025-03-10", "2025-03-16", None, None)),
+        ("this weekend", ("2025-03-08", "2025-03-09", None, None)),
+        ("next month", ("2025-04-01", "2025-04-30", None, None)),
+        ("Tuesday afternoon", ("2025-03-11", "2025-03-11", "12:00", "17:00")),
+        ("Friday", ("2025-03-07", "2025-03-07", None, None)),
+        ("next Tuesday", ("2025-03-11", "2025-03-11", None, None)),
+        ("in 3 days", ("2025-03-08", "2025-03-08", None, None)),
+        ("within two weeks", ("2025-03-05", "2025-03-19", None, None)),
+        ("next 5 days", ("2025-03-05", "2025-03-09", None, None)),
+        ("March 10th", ("2025-03-10", "2025-03-10", None, None)),
+        ("1 March", ("2026-03-01", "2026-03-01", None, None)),
+        ("monday to wednesday", ("2025-03-10", "2025-03-12", None, None)),
+    ])
+    def test_expressions(self, text, expected):
+        assert _span(text) == expected
+
+    def test_unparseable_and_invalid_dates(self):
+        assert parse_date_range("someday", _WEDNESDAY) is None
+        assert parse_date_range("2025-02-30", _WEDNESDAY) is None
+        assert parse_date_range(None, _WEDNESDAY) is None
+
+    def test_free_text_ignores_ordinary_words(self):
+        """'sat', 'a day' and similar words are not dates."""
+        assert find_date_ranges("I sat down twice a day", _WEDNESDAY) == []
+        phrases = [r["phrase"] for r in find_date_ranges("Book me next Tuesday afternoon or Friday", _WEDNESDAY)]
+        assert phrases == ["next Tuesday afternoon", "Friday"]
+
+    def test_month_word_before_a_count_is_not_a_date(self):
+        """'may' / 'march' followed by a count ('3 times', '2 tablets') is a verb, not a month."""
+        assert find_date_ranges("I may 3 times a day take it", _WEDNESDAY) == []
+        phrases = [r["phrase"] for r in find_date_ranges("I may 2 tablets, book me May 3rd", _WEDNESDAY)]
+        assert phrases == ["May 3rd"]
+
+    def test_request_clock_pins_today(self):
+        with request_clock(_WEDNESDAY):
+            assert today() == _WEDNESDAY
+            assert parse_date_range("tomorrow")["start"] == "2025-03-06"
+        assert today() == date.today()
+
+
+@pytest.mark.unit
+class TestDateHints:
+    """run_agent pre-resolves dates in scheduling questions before the LLM call."""
+
+    def test_scheduling_query_gets_resolved_dates(self):
+        from agent.orchestrator import _date_hints
+
+        hint = _date_hints("Can I get an appointment next week?", _WEDNESDAY)
+        assert '"next week" = 2025-03-10 to 2025-03-16' in hint
+        assert "today is 2025-03-05" in hint
+
+    def test_no_hint_for_iso_dates_or_other_topics(self):
+        from agent.orchestrator import _date_hints
+
+        assert _date_hints("Any slots on 2025-03-07?", _WEDNESDAY) == ""
+        assert _date_hints("Any slots between 2025-03-07 and 2025-03-10?", _WEDNESDAY) == ""
+        assert _date_hints("I have had a headache since Monday", _WEDNESDAY) == ""
+        assert _date_hints("I may 3 times a day need to book a visit", _WEDNESDAY) == ""
+
+    def test_hint_reaches_the_model_but_not_the_history(self, monkeypatch):
+        from langchain_core.messages import HumanMessage
+
+        from agent import orchestrator
+        from agent.orchestrator import run_agent
+        from scripts.stub_chat_model import SlowStubChatModel, stub_agent_model
+
+        seen = []
+
+        class RecordingModel(SlowStubChatModel):
+            def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+                seen.append([m.content for m in messages if isinstance(m, HumanMessage)])
+                return super()._generate(messages, stop, run_manager, **kwargs)
+
+        query = "Can I book an appointment next week?"
+        with stub_agent_model(latency=0):
+            monkeypatch.setattr(orchestrator, "_get_model", lambda: RecordingModel(latency=0))
+            with request_clock(_WEDNESDAY):
+                result = run_agent(query)
+        assert "[Resolved dates, today is" in seen[0][-1]
+        humans = [m.content for m in result["messages"] if isinstance(m, HumanMessage)]
+        assert humans == [query]
+
+    def test_is_iso_phrase(self):
+        from agent.tools.date_parser import is_iso_phrase
+
+        assert is_iso_phrase("2025-03-01")
+        assert is_iso_phrase("2025-03-01 through 2025-03-07")
+        assert is_iso_phrase("between 2025-03-01 and 2025-03-07")
+        assert not is_iso_phrase("next week")
+        assert not is_iso_phrase("2025-03-01 afternoon")
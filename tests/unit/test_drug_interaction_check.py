@@ -51,3 +51,209 @@ class TestDrugInteractionCheck:
         result = drug_interaction_check(medications=None)
         assert result["success"] is False
         assert "error" in result
+
+
+@pytest.mark.unit
+class TestFDAFanOut:
+    """openFDA pair checks run concurrently under a per-request deadline, merged in pair order."""
+
+    @pytest.fixture
+    def dic(self):
+        import importlib
+        return importlib.import_module("agent.tools.drug_interaction_check")
+
+    def test_pairs_checked_concurrently_in_stable_order(self, dic, monkeypatch):
+        import time
+
+        def slow_check(a, b):
+            time.sleep(0.2)
+            return ("major", f"{a}+{b}")
+
+        monkeypatch.setattr(dic, "_check_fda_api", slow_check)
+        meds = ["a", "b", "c", "d", "e", "f"]  # 15 pairs
+        start = time.perf_counter()
+        interactions, severity = dic._lookup_interactions(meds)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 1.0  # serial would take ~3s
+        assert severity == "major"
+        expected = [[meds[i], meds[j]] for i in range(6) for j in range(i + 1, 6)]
+        assert [i["drugs"] for i in interactions] == expected
+
+    def test_deadline_drops_stragglers(self, dic, monkeypatch):
+        import time
+
+        def check(a, b):
+            if b == "slow":
+                time.sleep(1.0)
+            return ("major", f"{a}+{b}")
+
+        monkeypatch.setattr(dic, "_check_fda_api", check)
+        results = dic._check_fda_pairs([("a", "b"), ("a", "slow")], deadline=0.3)
+        assert results == [("major", "a+b"), dic.FDA_INCOMPLETE]
+
+    def test_errors_are_incomplete_not_no_interaction(self, dic, monkeypatch):
+        def check(a, b):
+            if b == "broken":
+                raise RuntimeError("openFDA down")
+            return None
+
+        monkeypatch.setattr(dic, "_check_fda_api", check)
+        assert dic._check_fda_pairs([("a", "b"), ("a", "broken")]) == [None, dic.FDA_INCOMPLETE]
+
+
+@pytest.mark.unit
+class TestTieredLookup:
+    """Curated pairs answer locally; openFDA is only asked about uncovered pairs, within budget."""
+
+    @pytest.fixture
+    def dic(self, monkeypatch):
+        import importlib
+        module = importlib.import_module("agent.tools.drug_interaction_check")
+        self.fda_calls = []
+
+        def fake_fda(a, b):
+            self.fda_calls.append((a, b))
+            return ("major", "fda")
+
+        monkeypatch.setattr(module, "_check_fda_api", fake_fda)
+        return module
+
+    def test_curated_pair_never_hits_network(self, dic):
+        result = dic.drug_interaction_check(medications=["Warfarin", "aspirin"])
+        assert self.fda_calls == []
+        assert result["data"]["interactions"][0]["tier"] == "local"
+        assert result["data"]["pairs_by_tier"] == {"local": 1, "fda": 0, "fda_incomplete": 0, "skipped": 0}
+
+    def test_uncovered_pairs_go_to_fda_tier(self, dic):
+        result = dic.drug_interaction_check(medications=["warfarin", "aspirin", "metformin"])
+        assert sorted(self.fda_calls) == [("aspirin", "metformin"), ("warfarin", "metformin")]
+        tiers = [i["tier"] for i in result["data"]["interactions"]]
+        assert tiers == ["local", "fda", "fda"]
+        assert result["data"]["pairs_by_tier"] == {"local": 1, "fda": 2, "fda_incomplete": 0, "skipped": 0}
+        assert "unchecked_pairs" not in result["data"]
+
+    def test_brand_and_generic_of_one_drug_are_one_medication(self, dic):
+        result = dic.drug_interaction_check(medications=["Tylenol", "acetaminophen", "warfarin"])
+        assert self.fda_calls == [("acetaminophen", "warfarin")]  # no self-pair, no repeat
+        assert [i["drugs"] for i in result["data"]["interactions"]] == [["acetaminophen", "warfarin"]]
+        assert result["data"]["pairs_by_tier"]["fda"] == 1
+
+    def test_exhausted_budget_skips_fda_tier(self, dic):
+        interactions, severity = dic._lookup_interactions(["warfarin", "aspirin", "metformin"], latency_budget=0)
+        assert self.fda_calls == []
+        assert [i["tier"] for i in interactions] == ["local"]
+        assert severity == "major"
+        _, tiers, unchecked = dic._tiered_lookup(["warfarin", "aspirin", "metformin"], latency_budget=0)
+        assert tiers["skipped"] == 2
+        assert {u["reason"] for u in unchecked} == {"skipped"}
+
+
+@pytest.mark.unit
+class TestFDAOutage:
+    """openFDA failures reach the response as unchecked pairs, never as "no interaction"."""
+
+    @pytest.fixture
+    def dic(self, monkeypatch):
+        import importlib
+        from agent.tools.fda_client import set_fda_client
+        module = importlib.import_module("agent.tools.drug_interaction_check")
+        monkeypatch.setattr(module, "get_fda_cache", lambda: None)
+        yield module
+        set_fda_client(None)
+
+    def test_unreachable_endpoint_leaves_pairs_unchecked(self, dic):
+        from agent.tools.fda_client import FDAClient, set_fda_client
+        set_fda_client(FDAClient("http://127.0.0.1:9/drug/label.json", timeout=0.5))  # nothing listens on port 9
+        data = dic.drug_interaction_check(medications=["metformin", "lisinopril"])["data"]
+        assert data["severity"] == "none"
+        assert data["pairs_by_tier"] == {"local": 0, "fda": 0, "fda_incomplete": 1, "skipped": 0}
+        assert data["unchecked_pairs"] == [{"drugs": ["metformin", "lisinopril"], "reason": "fda_incomplete"}]
+        assert "could not be checked" in data["note"]
+
+    def test_open_circuit_reports_outage_without_requests(self, dic):
+        from agent.tools.fda_client import CircuitBreaker, FDAClient, FDAUnavailable, set_fda_client
+        from scripts.fda_stub_server import FDAStubServer
+
+        with FDAStubServer() as stub:
+            stub.status = 503
+            client = FDAClient(stub.url, timeout=0.5, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+            set_fda_client(client)
+            with pytest.raises(FDAUnavailable):
+                client.search("x")                      # one 503 trips the breaker
+            assert client.breaker.state == "open"
+            sent = stub.request_count
+            data = dic.drug_interaction_check(medications=["warfarin", "metformin", "lisinopril"])["data"]
+            assert stub.request_count == sent           # short-circuited, not sent
+        assert data["pairs_by_tier"] == {"local": 0, "fda": 0, "fda_incomplete": 3, "skipped": 0}
+        assert {u["reason"] for u in data["unchecked_pairs"]} == {"fda_incomplete"}
+        assert client.metrics()["breaker"]["short_circuited"] == 3
+
+    """Polypharmacy mode walks the adjacency index and groups results per drug."""
+
+    def test_graph_mode_groups_per_drug(self):
+        result = drug_interaction_check(medications=["warfarin", "aspirin", "ibuprofen", "metformin"], mode="graph")
+        data = result["data"]
+        assert data["mode"] == "graph"
+        assert len(data["interactions"]) == 3
+        assert data["severity"] == "major"
+        assert data["by_drug"]["warfarin"]["severity"] == "major"
+        assert data["by_drug"]["warfarin"]["interaction_count"] == 2
+        assert data["by_drug"]["aspirin"]["severity"] == "major"
+        assert "metformin" not in data["by_drug"]
+        assert data["pairs_by_tier"] == {"local": 3, "fda": 0, "fda_incomplete": 0, "skipped": 3}
+        assert "3 medication pair(s)" in data["note"]
+
+    def test_long_lists_stay_in_pairs_mode_unless_asked(self, monkeypatch):
+        import importlib
+        dic = importlib.import_module("agent.tools.drug_interaction_check")
+        monkeypatch.setattr(dic, "_check_fda_api", lambda a, b: None)
+        meds = ["warfarin", "aspirin"] + [f"vitamin_{i}" for i in range(30)]
+        result = drug_interaction_check(medications=meds)
+        assert "mode" not in result["data"]
+        assert result["data"]["pairs_by_tier"]["fda"] == 32 * 31 // 2 - 1
+        graph = drug_interaction_check(medications=meds, mode="graph")["data"]
+        assert [i["drugs"] for i in graph["interactions"]] == [["aspirin", "warfarin"]]
+        assert graph["pairs_by_tier"]["skipped"] == 32 * 31 // 2 - 1
+
+    def test_agent_tool_exposes_mode(self):
+        from agent.tools.langchain_tools import drug_interaction_tool
+        assert "mode" in drug_interaction_tool.args
+        out = drug_interaction_tool.invoke({"medications": ["warfarin", "aspirin"], "mode": "graph"})
+        assert '"mode": "graph"' in out
+
+    def test_invalid_mode_returns_error(self):
+        result = drug_interaction_check(medications=["a", "b"], mode="bogus")
+        assert result["success"] is False
+
+
+@pytest.mark.unit
+class TestDrugClassRules:
+    """Class-level rules (e.g. NSAID x anticoagulant) resolve from the precomputed membership table."""
+
+    @pytest.fixture(autouse=True)
+    def no_network(self, monkeypatch):
+        import importlib
+        dic = importlib.import_module("agent.tools.drug_interaction_check")
+        monkeypatch.setattr(dic, "_check_fda_api", lambda a, b: None)
+
+    def test_class_rule_matches_drugs_without_exact_pair(self):
+        result = drug_interaction_check(medications=["naproxen", "apixaban"])
+        interactions = result["data"]["interactions"]
+        assert len(interactions) == 1
+        assert interactions[0]["severity"] == "major"
+        assert sorted(interactions[0]["classes"]) == ["anticoagulant", "nsaid"]
+        assert interactions[0]["tier"] == "local"
+
+    def test_exact_pair_takes_precedence_over_class_rule(self):
+        result = drug_interaction_check(medications=["warfarin", "ibuprofen"])
+        interaction = result["data"]["interactions"][0]
+        assert "classes" not in interaction
+        assert interaction["description"].startswith("NSAIDs can increase")
+
+    def test_highest_severity_class_rule_wins(self):
+        result = drug_interaction_check(medications=["sertraline", "phenelzine", "heparin"], mode="graph")
+        data = result["data"]
+        assert data["severity"] == "contraindicated"
+        assert data["by_drug"]["sertraline"]["interaction_count"] == 2
+        assert data["by_drug"]["heparin"]["severity"] == "major"
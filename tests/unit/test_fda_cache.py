@@ -0,0 +1,77 @@
+"""
+Tests for the persistent openFDA response cache (SQLite, positive + negative TTLs).
+Run: pytest tests/unit/test_fda_cache.py -v
+"""
+import importlib
+
+import pytest
+
+from agent.tools.fda_cache import FDACache
+
+
+@pytest.mark.unit
+class TestFDACache:
+    """Cache stores hits and 'no interaction found' results, expires them, and reports stats."""
+
+    def test_positive_and_negative_entries(self, tmp_path):
+        cache = FDACache(str(tmp_path / "c.sqlite3"))
+        assert cache.get(("aspirin", "ibuprofen")) == (False, None)
+
+        cache.set(("aspirin", "ibuprofen"), ("major", "bleeding"))
+        cache.set(("lisinopril", "metformin"), None)
+        assert cache.get(("aspirin", "ibuprofen")) == (True, ("major", "bleeding"))
+        assert cache.get(("lisinopril", "metformin")) == (True, None)
+
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["negative_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 2
+        assert stats["hit_rate"] == pytest.approx(2 / 3, abs=1e-3)
+
+    def test_expired_entries_are_misses(self, tmp_path):
+        cache = FDACache(str(tmp_path / "c.sqlite3"), positive_ttl=60, negative_ttl=-1)
+        cache.set(("a", "b"), None)
+        assert cache.get(("a", "b")) == (False, None)
+        assert cache.stats()["evictions"] == 1
+        assert cache.size() == 0
+
+    def test_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "c.sqlite3")
+        FDACache(path).set(("a", "b"), ("major", "x"))
+        assert FDACache(path).get(("a", "b")) == (True, ("major", "x"))
+
+    def test_trim_enforces_max_entries(self, tmp_path):
+        cache = FDACache(str(tmp_path / "c.sqlite3"), max_entries=3)
+        for i in range(5):
+            cache.set((f"d{i}", "x"), None)
+        assert cache.trim() == 2
+        assert cache.size() == 3
+        assert cache.get(("d0", "x")) == (False, None)
+
+    def test_check_fda_api_uses_cache(self, tmp_path, monkeypatch):
+        dic = importlib.import_module("agent.tools.drug_interaction_check")
+        cache = FDACache(str(tmp_path / "c.sqlite3"))
+        monkeypatch.setattr(dic, "get_fda_cache", lambda: cache)
+        calls = []
+
+        def fetch(a, b):
+            calls.append((a, b))
+            return None
+
+        monkeypatch.setattr(dic, "_fetch_fda", fetch)
+        assert dic._check_fda_api("Ibuprofen", "aspirin") is None
+        assert dic._check_fda_api("aspirin", "ibuprofen") is None
+        assert len(calls) == 1  # second lookup answered by the negative cache entry
+
+    def test_network_errors_are_not_cached(self, tmp_path, monkeypatch):
+        dic = importlib.import_module("agent.tools.drug_interaction_check")
+        cache = FDACache(str(tmp_path / "c.sqlite3"))
+        monkeypatch.setattr(dic, "get_fda_cache", lambda: cache)
+
+        def fetch(a, b):
+            raise TimeoutError("timed out")
+
+        monkeypatch.setattr(dic, "_fetch_fda", fetch)
+        assert dic._check_fda_api("a", "b") is dic.FDA_INCOMPLETE
+        assert cache.size() == 0
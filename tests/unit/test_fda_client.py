@@ -0,0 +1,94 @@
+"""
+Tests for the openFDA client (keep-alive pool + circuit breaker) against a local stub server.
+Run: pytest tests/unit/test_fda_client.py -v
+"""
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from scripts.fda_stub_server import FDAStubServer
+from agent.tools.fda_client import CircuitBreaker, FDAClient, FDAUnavailable
+
+
+@pytest.fixture
+def stub():
+    with FDAStubServer() as server:
+        yield server
+
+
+def _client(stub, **breaker_kwargs):
+    breaker = CircuitBreaker(**{"failure_threshold": 3, "window": 10.0, "reset_timeout": 0.2, **breaker_kwargs})
+    return FDAClient(stub.url, timeout=0.3, pool_size=4, breaker=breaker)
+
+
+@pytest.mark.unit
+class TestFDAClient:
+    """Pooled keep-alive requests; breaker opens on 5xx/timeouts and recovers via half-open probe."""
+
+    def test_reuses_keep_alive_connection(self, stub):
+        client = _client(stub)
+        for _ in range(5):
+            data = client.search('drug_interactions:"a"')
+            assert data["results"][0]["drug_interactions"]
+        assert stub.connection_count == 1
+        assert client.metrics()["connections_reused"] == 4
+
+    def test_not_found_is_a_definitive_miss(self, stub):
+        stub.found = False
+        client = _client(stub)
+        assert client.search("x") is None
+        assert client.breaker.state == "closed"
+
+    def test_opens_after_server_errors_and_fails_fast(self, stub):
+        stub.status = 503
+        client = _client(stub)
+        for _ in range(3):
+            with pytest.raises(FDAUnavailable):
+                client.search("x")
+        assert client.breaker.state == "open"
+
+        sent = stub.request_count
+        start = time.perf_counter()
+        with pytest.raises(FDAUnavailable):
+            client.search("x")
+        assert time.perf_counter() - start < 0.05
+        assert stub.request_count == sent
+        assert client.metrics()["breaker"]["short_circuited"] == 1
+
+    def test_timeouts_count_as_failures(self, stub):
+        stub.latency = 0.5
+        client = _client(stub, failure_threshold=2)
+        for _ in range(2):
+            with pytest.raises(FDAUnavailable):
+                client.search("x")
+        assert client.breaker.state == "open"
+
+    def test_half_open_probe_closes_on_recovery(self, stub):
+        stub.status = 500
+        client = _client(stub)
+        for _ in range(3):
+            with pytest.raises(FDAUnavailable):
+                client.search("x")
+        stub.status = 200
+        time.sleep(0.25)
+        assert client.breaker.state == "half_open"
+        assert client.search("x") is not None
+        assert client.breaker.state == "closed"
+
+    def test_half_open_probe_failure_reopens(self, stub):
+        stub.status = 500
+        client = _client(stub)
+        for _ in range(3):
+            with pytest.raises(FDAUnavailable):
+                client.search("x")
+        time.sleep(0.25)
+        with pytest.raises(FDAUnavailable):
+            client.search("x")
+        metrics = client.breaker.metrics()
+        assert metrics["state"] == "open"
+        assert metrics["times_opened"] == 2
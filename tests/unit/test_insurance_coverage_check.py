@@ -4,7 +4,7 @@ Run: pytest tests/unit/test_insurance_coverage_check.py -v
 """
 import pytest
 
-from agent.tools.insurance_coverage_check import insurance_coverage_check
+from agent.tools.insurance_coverage_check import bulk_coverage_check, covering_plans, insurance_coverage_check
 
 
 @pytest.mark.unit
@@ -40,3 +40,65 @@ class TestInsuranceCoverageCheck:
         result = insurance_coverage_check(procedure_code=None, plan_id="plan_001")
         assert result["success"] is False
         assert "error" in result
+
+
+@pytest.mark.unit
+class TestBulkCoverageCheck:
+    """One call answers every code of a claim against a plan."""
+
+    def test_answers_each_code_in_order(self):
+        result = bulk_coverage_check(codes=["99214", "99213", "J0129"], plan_id="plan_001")
+        assert result["success"] is True
+        data = result["data"]
+        assert data["plan_id"] == "plan_001"
+        assert [r["procedure_code"] for r in data["results"]] == ["99214", "99213", "J0129"]
+        assert all(r["covered"] is True for r in data["results"])
+        assert data["covered_codes"] == ["99214", "99213", "J0129"]
+        assert data["not_covered_codes"] == []
+
+    def test_matches_single_code_tool(self):
+        codes = ["99213", "99214", "unknown_xyz"]
+        bulk = bulk_coverage_check(codes=codes, plan_id="plan_002")["data"]["results"]
+        for code, row in zip(codes, bulk):
+            single = insurance_coverage_check(procedure_code=code, plan_id="plan_002")["data"]
+            assert {"covered": row["covered"], "details": row["details"]} == single
+
+    def test_duplicates_answered_once_and_codes_stripped(self):
+        data = bulk_coverage_check(codes=[" 99213", "99213", "unknown_xyz"], plan_id=" plan_001 ")["data"]
+        assert [r["procedure_code"] for r in data["results"]] == ["99213", "unknown_xyz"]
+        assert data["covered_codes"] == ["99213"]
+        assert data["not_covered_codes"] == ["unknown_xyz"]
+
+    def test_invalid_input_returns_graceful_error(self):
+        assert bulk_coverage_check(codes=["99213"], plan_id=None)["success"] is False
+        assert bulk_coverage_check(codes=[], plan_id="plan_001")["success"] is False
+        assert bulk_coverage_check(codes="99213", plan_id="plan_001")["success"] is False
+        assert bulk_coverage_check(codes=["99213", 99214], plan_id="plan_001")["success"] is False
+        too_many = bulk_coverage_check(codes=[str(i) for i in range(101)], plan_id="plan_001")
+        assert too_many["success"] is False and "at most" in too_many["error"]
+
+
+@pytest.mark.unit
+class TestCoveringPlans:
+    """Reverse query: which plans cover a procedure."""
+
+    def test_lists_covered_and_not_covered_plans(self):
+        result = covering_plans(procedure_code="99213")
+        assert result["success"] is True
+        data = result["data"]
+        assert data["covered_plans"] == [{"plan_id": "plan_001", "details": "Office visit; copay may apply."}]
+        assert data["not_covered_plans"] == ["plan_002"]
+        assert data["plans_known"] >= 2
+
+    def test_agrees_with_single_lookup(self):
+        for row in covering_plans(procedure_code=" 99213 ")["data"]["covered_plans"]:
+            assert insurance_coverage_check(procedure_code="99213", plan_id=row["plan_id"])["data"]["covered"] is True
+
+    def test_unknown_procedure_returns_empty_with_details(self):
+        data = covering_plans(procedure_code="unknown_xyz")["data"]
+        assert data["covered_plans"] == [] and data["not_covered_plans"] == []
+        assert "No coverage information" in data["details"]
+
+    def test_invalid_input_returns_graceful_error(self):
+        assert covering_plans(procedure_code=None)["success"] is False
+        assert covering_plans(procedure_code=27447)["success"] is False
@@ -0,0 +1,124 @@
+"""
+Tests for streaming bulk lab ingestion (CSV / NDJSON in, NDJSON out).
+Run: pytest tests/unit/test_lab_ingest.py -v
+"""
+import json
+
+import httpx
+import pytest
+
+from agent.lab_ingest import LabStreamInterpreter
+
+
+def _run(data, chunk_size=7, **kwargs):
+    interpreter = LabStreamInterpreter(**kwargs)
+    out = b"".join(interpreter.feed(data[i:i + chunk_size]) for i in range(0, len(data), chunk_size))
+    lines = [json.loads(line) for line in (out + interpreter.close()).splitlines()]
+    return lines[:-1], lines[-1]["summary"]
+
+
+@pytest.mark.unit
+class TestLabStreamInterpreter:
+    """Chunked input, row batches, one output line per input row plus a summary."""
+
+    def test_ndjson_rows_split_across_chunks(self):
+        data = (b'{"patient_id": "p1", "test_name": "glucose", "value": 110}\n'
+                b'{"patient_id": "p1", "test": "HbA1c", "value": "5.0"}\n'
+                b'\n'
+                b'{"test_name": "vitamin_x", "value": 1}\n')
+        rows, summary = _run(data, batch_rows=2)
+        assert [r["status"] for r in rows] == ["high", "normal", "unknown"]
+        assert rows[1]["test"] == "a1c" and rows[1]["test_name"] == "HbA1c"
+        assert rows[0]["patient_id"] == "p1" and "patient_id" not in rows[2]
+        assert [r["row"] for r in rows] == [1, 2, 3]
+        assert summary == {"rows": 3, "counts": {"normal": 1, "low": 0, "high": 1, "unknown": 1, "error": 0}}
+
+    def test_csv_with_header_aliases_and_quotes(self):
+        data = b'Patient_ID,Test Name,Value\r\np2,White Blood Cells,12\r\np3,"potassium",4.0\np4,sodium\n'
+        rows, summary = _run(data)
+        assert [(r.get("test"), r["status"]) for r in rows] == [("wbc", "high"), ("potassium", "normal"), (None, "error")]
+        assert rows[2]["message"] == "row has fewer columns than the header"
+        assert summary["counts"]["error"] == 1
+
+    def test_bad_lines_become_error_rows(self):
+        data = b'{"test_name": "hdl", "value": "x"}\nnot json\n[1]\n{"value": 3}\n{"test_name": "hdl", "value": 50}\n'
+        rows, _ = _run(data, fmt="ndjson")
+        assert [r["status"] for r in rows] == ["error", "error", "error", "error", "normal"]
+        assert rows[0]["value"] is None
+        assert rows[3]["message"] == "missing test name"
+
+    def test_infinite_value_is_an_error_row_like_nan(self):
+        rows, summary = _run(b'test_name,value\nglucose,inf\nglucose,1e400\nglucose,NaN\n', fmt="csv")
+        assert [(r["value"], r["status"]) for r in rows] == [(None, "error")] * 3
+        assert summary["counts"]["error"] == 3 and summary["counts"]["high"] == 0
+
+    def test_oversized_line_is_dropped_with_bounded_buffer(self):
+        interpreter = LabStreamInterpreter()
+        out = interpreter.feed(b'{"test_name": "glucose", "value": 1' + b"0" * 70_000)
+        assert len(interpreter._buffer) == 0
+        out += interpreter.feed(b'}\n{"test_name": "hdl", "value": 50}\n') + interpreter.close()
+        rows = [json.loads(line) for line in out.splitlines()]
+        assert [r.get("status") for r in rows[:2]] == ["error", "normal"]
+        assert "longer than" in rows[0]["message"]
+
+    def test_csv_without_required_columns_reports_error(self):
+        rows, summary = _run(b"a,b\n1,2\n")
+        assert rows == []
+        assert "CSV header" in summary["error"]
+
+    def test_leading_bracket_line_is_ndjson(self):
+        rows, summary = _run(b'[1,2]\n{"test_name": "hdl", "value": 50}\n')
+        assert [r["status"] for r in rows] == ["error", "normal"]
+        assert "error" not in summary
+
+    def test_unknown_format_rejected(self):
+        with pytest.raises(ValueError):
+            LabStreamInterpreter(fmt="xml")
+
+
+@pytest.mark.unit
+class TestLabsIngestEndpoint:
+    """POST /labs/ingest streams results as the upload arrives; the size cap is opt-in."""
+
+    async def _post(self, content, **kwargs):
+        from main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/labs/ingest", content=content, **kwargs)
+
+    async def test_streams_rows_and_summary(self):
+        response = await self._post(b'{"test_name": "glucose", "value": 110}\n')
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0]["status"] == "high" and lines[-1]["summary"]["rows"] == 1
+
+    async def test_chunked_upload_is_interpreted_chunk_by_chunk(self):
+        async def chunked():  # no Content-Length, rows split across chunks
+            for _ in range(3):
+                yield b'{"test_name": "glucose", '
+                yield b'"value": 110}\n'
+
+        response = await self._post(chunked())
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["row"] for line in lines[:-1]] == [1, 2, 3]
+        assert lines[-1]["summary"]["rows"] == 3
+
+    async def test_upload_cap_is_opt_in(self, monkeypatch):
+        import main
+
+        body = b'{"test_name": "glucose", "value": 110}\n' * 4
+        assert main._INGEST_MAX_BYTES == 0
+        assert (await self._post(body)).status_code == 200
+
+        monkeypatch.setattr(main, "_INGEST_MAX_BYTES", 64)
+        assert (await self._post(body)).status_code == 413
+
+        async def chunked():  # no Content-Length: reading stops at the limit
+            for _ in range(4):
+                yield b'{"test_name": "glucose", "value": 110}\n'
+
+        response = await self._post(chunked())
+        assert response.status_code == 200
+        summary = json.loads(response.text.splitlines()[-1])["summary"]
+        assert summary["rows"] == 1 and "upload larger than 64 bytes" in summary["error"]
@@ -0,0 +1,56 @@
+"""
+Tests for batch (columnar) lab interpretation.
+Run: pytest tests/unit/test_lab_result_interpretation.py -v
+"""
+import numpy as np
+import pytest
+
+from agent.tools.lab_result_interpretation import (
+    BATCH_STATUSES,
+    classify_lab_batch,
+    lab_result_batch_interpretation,
+    lab_result_interpretation,
+)
+
+
+@pytest.mark.unit
+class TestLabBatchInterpretation:
+    """Vectorized low/normal/high classification against the reference-range arrays."""
+
+    def test_classifies_rows(self):
+        codes = classify_lab_batch(["glucose", "hdl", "potassium", "sodium"], [115, 35, 4.0, 150])
+        assert [BATCH_STATUSES[c] for c in codes] == ["high", "low", "normal", "high"]
+
+    def test_bounds_are_inclusive(self):
+        codes = classify_lab_batch(["glucose", "glucose"], [70.0, 99.0])
+        assert [BATCH_STATUSES[c] for c in codes] == ["normal", "normal"]
+
+    def test_names_normalized_and_unknowns_and_errors(self):
+        codes = classify_lab_batch(["HbA1c", "White Blood Cells", "vitamin_x", "ldl", "ldl"], [7.0, 12, 1, "abc", None])
+        assert [BATCH_STATUSES[c] for c in codes] == ["high", "high", "unknown", "error", "error"]
+
+    def test_non_finite_values_are_errors(self):
+        codes = classify_lab_batch(["glucose"] * 4, [float("inf"), "-inf", float("nan"), "1e400"])
+        assert [BATCH_STATUSES[c] for c in codes] == ["error"] * 4
+        statuses = [i["status"] for i in lab_result_interpretation({"glucose": "inf"})["data"]["interpretations"]]
+        assert statuses == ["error"]
+
+    def test_matches_per_dict_tool(self):
+        rng = np.random.default_rng(19)
+        names = list(rng.choice(["glucose", "a1c", "hdl", "ldl", "platelets", "creatinine", "cholesterol"], 200))
+        values = list(rng.uniform(0, 300, 200).round(1))
+        batch = lab_result_batch_interpretation(test_names=names, values=values)["data"]["statuses"]
+        single = [lab_result_interpretation({n: v})["data"]["interpretations"][0]["status"] for n, v in zip(names, values)]
+        assert batch == single
+
+    def test_tool_reports_counts_and_flagged_rows(self):
+        result = lab_result_batch_interpretation(test_names=["glucose", "hdl", "sodium", "foo"], values=[90, 35, 150, 1])
+        assert result["success"] is True
+        data = result["data"]
+        assert data["counts"] == {"normal": 1, "low": 1, "high": 1, "unknown": 1, "error": 0}
+        assert data["flagged"] == [1, 2]
+
+    def test_invalid_input_returns_graceful_error(self):
+        assert lab_result_batch_interpretation(test_names=["glucose"], values=[])["success"] is False
+        assert lab_result_batch_interpretation(test_names="glucose", values=[1])["success"] is False
+        assert lab_result_batch_interpretation(test_names=[1], values=[1])["success"] is False
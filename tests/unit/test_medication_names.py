@@ -0,0 +1,96 @@
+"""
+Tests for the shared medication name resolver (synonyms, dose stripping, prefix and fuzzy match).
+Run: pytest tests/unit/test_medication_names.py -v
+"""
+import importlib
+
+import pytest
+
+from agent.tools.medication_names import MedicationResolver, resolve_medication, resolve_medications
+from agent.tools.contraindication_check import contraindication_batch_check, contraindication_check
+from agent.tools.drug_interaction_check import drug_interaction_check
+
+
+@pytest.mark.unit
+class TestMedicationNames:
+    """Brand, dosed and misspelled names resolve to the curated generic."""
+
+    @pytest.mark.parametrize("raw,expected", [
+        ("acetaminophen", "acetaminophen"),
+        ("Tylenol", "acetaminophen"),
+        ("acetaminophen 500mg", "acetaminophen"),
+        ("Advil 200 mg tablets", "ibuprofen"),
+        ("ibuprofin", "ibuprofen"),
+        ("acetamin", "acetaminophen"),
+        ("  COUMADIN ", "warfarin"),
+    ])
+    def test_resolves_to_generic(self, raw, expected):
+        assert resolve_medication(raw) == expected
+
+    @pytest.mark.parametrize("raw", [
+        "rosuvastatin",     # simvastatin
+        "pravastatin",      # simvastatin
+        "esomeprazole",     # omeprazole
+        "felodipine",       # amlodipine
+        "fosinopril",       # lisinopril
+    ])
+    def test_look_alike_drugs_are_not_rewritten(self, raw):
+        assert resolve_medication(raw) == raw
+        names, notes = resolve_medications([raw.title()])
+        assert names == [raw] and notes == {}
+
+    @pytest.mark.parametrize("raw,expected", [
+        ("lisinoprl", "lisinopril"),
+        ("atorvastain", "atorvastatin"),
+        ("warfrin", "warfarin"),
+    ])
+    def test_typos_within_edit_distance(self, raw, expected):
+        assert resolve_medication(raw) == expected
+
+    def test_fuzzy_tie_between_generics_is_not_guessed(self):
+        resolver = MedicationResolver(["carbamide", "carbamate"], {})
+        assert resolver.resolve("carbamite") == ("carbamite", "unknown")
+
+    def test_unknown_and_short_names_pass_through(self):
+        assert resolve_medication("Vitamin_7") == "vitamin_7"
+        assert resolve_medication("ab") == "ab"
+        assert resolve_medication(None) == ""
+
+    def test_notes_only_for_changed_names(self):
+        names, notes = resolve_medications(["Warfarin", "Tylenol"])
+        assert names == ["warfarin", "acetaminophen"]
+        assert notes == {"Tylenol": {"resolved": "acetaminophen", "method": "synonym"}}
+
+    def test_ambiguous_prefix_is_not_guessed(self):
+        resolver = MedicationResolver(["metformin", "metoprolol"], {})
+        assert resolver.resolve("metopro") == ("metoprolol", "prefix")
+        assert resolver.resolve("metx")[1] != "prefix"
+
+    @pytest.mark.parametrize("raw", ["levo", "metf", "atorva", "levothy"])
+    def test_short_prefix_is_not_a_resolution(self, raw):
+        assert resolve_medication(raw) == raw
+        assert resolve_medications([raw]) == ([raw], {})
+
+    def test_drug_interaction_check_matches_brand_names(self):
+        result = drug_interaction_check(medications=["Advil", "Coumadin"])
+        assert result["data"]["severity"] == "major"
+        assert result["data"]["resolved_names"]["Coumadin"]["resolved"] == "warfarin"
+
+    def test_contraindication_check_matches_brand_names(self):
+        result = contraindication_check(procedure_code="27447", patient_medications=["Eliquis 5mg"])
+        assert result["data"]["safe"] is False
+        assert "Medication: apixaban" in result["data"]["flagged_issues"]
+        assert result["data"]["resolved_names"]["Eliquis 5mg"]["resolved"] == "apixaban"
+
+    def test_contraindication_batch_check_reports_resolved_names(self):
+        data = contraindication_batch_check(["27447", "45380"], patient_medications=["Eliquis", "warfarin"])["data"]
+        assert data["resolved_names"] == {"Eliquis": {"resolved": "apixaban", "method": "synonym"}}
+        assert "resolved_names" not in contraindication_batch_check(["27447"], patient_medications=["warfarin"])["data"]
+
+    def test_drug_interaction_check_sends_the_look_alike_name(self, monkeypatch):
+        asked = []
+        dic = importlib.import_module("agent.tools.drug_interaction_check")
+        monkeypatch.setattr(dic, "_check_fda_api", lambda a, b: asked.append({a, b}))
+        result = drug_interaction_check(medications=["rosuvastatin", "clarithromycin"])
+        assert asked == [{"rosuvastatin", "clarithromycin"}]
+        assert "resolved_names" not in result["data"]
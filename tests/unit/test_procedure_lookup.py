@@ -0,0 +1,144 @@
+"""
+Tests for procedure_lookup and its BM25 procedure index.
+Run: pytest tests/unit/test_procedure_lookup.py -v
+"""
+import pytest
+
+from agent.tools.procedure_lookup import ProcedureIndex, procedure_lookup
+
+_CATALOG = [
+    {"code": "27447", "name": "Knee Replacement", "description": "Total knee arthroplasty."},
+    {"code": "27446", "name": "Partial Knee Replacement", "description": "Unicompartmental knee arthroplasty."},
+    {"code": "27130", "name": "Hip Replacement", "description": "Total hip arthroplasty."},
+    {"code": "29881", "name": "Knee Arthroscopy", "description": "Arthroscopy of the knee with meniscectomy."},
+    {"code": "93000", "name": "Electrocardiogram (ECG)", "description": "Routine ECG with at least 12 leads."},
+]
+
+
+@pytest.mark.unit
+class TestProcedureIndex:
+    """Inverted index with BM25 ranking, prefix matching and a top-k cutoff."""
+
+    def _codes(self, index, query, limit=10):
+        ids, total = index.search(query, limit=limit)
+        return [index.procedures[i]["code"] for i in ids], total
+
+    def test_all_token_matches_rank_first(self):
+        codes, total = self._codes(ProcedureIndex(_CATALOG), "total knee replacement")
+        assert codes[0] == "27447"
+        assert total == 1
+
+    def test_single_token_queries(self):
+        codes, _ = self._codes(ProcedureIndex(_CATALOG), "arthroscopy")
+        assert codes == ["29881"]
+        codes, _ = self._codes(ProcedureIndex(_CATALOG), "knee")
+        assert set(codes) == {"27447", "27446", "29881"}
+
+    def test_prefix_matching(self):
+        index = ProcedureIndex(_CATALOG)
+        assert self._codes(index, "electro")[0] == ["93000"]
+        assert self._codes(index, "knee repl")[0][:2] in (["27447", "27446"], ["27446", "27447"])
+        assert index.expand("arthro") == ["arthroplasty", "arthroscopy"]
+
+    def test_falls_back_to_any_token_when_no_document_has_all(self):
+        codes, total = self._codes(ProcedureIndex(_CATALOG), "hip ecg")
+        assert set(codes) == {"27130", "93000"}
+        assert total == 2
+
+    def test_top_k_cutoff_reports_total(self):
+        codes, total = self._codes(ProcedureIndex(_CATALOG), "replacement", limit=2)
+        assert len(codes) == 2
+        assert total == 3
+
+    def test_no_match_and_stop_words(self):
+        assert self._codes(ProcedureIndex(_CATALOG), "zzzz")[0] == []
+        assert self._codes(ProcedureIndex(_CATALOG), "the of")[0] == []
+
+
+@pytest.mark.unit
+class TestProcedureCodeQueries:
+    """Sorted code array: bisect range and prefix spans, keyset pages in code order."""
+
+    _EM = [{"code": f"992{n:02d}", "name": f"E/M visit {n}"} for n in (15, 2, 11, 3, 12, 5, 13, 4, 14)]
+
+    def _codes(self, index, ids):
+        return [index.procedures[i]["code"] for i in ids]
+
+    def test_range_span_is_inclusive_and_sorted(self):
+        index = ProcedureIndex(self._EM + _CATALOG)
+        lo, hi = index.code_span("99203", "99212")
+        assert index.codes[lo:hi] == ["99203", "99204", "99205", "99211", "99212"]
+
+    def test_prefix_span(self):
+        index = ProcedureIndex(_CATALOG)
+        lo, hi = index.prefix_span("274")
+        assert index.codes[lo:hi] == ["27446", "27447"]
+        lo, hi = index.prefix_span("5")
+        assert lo == hi
+
+    def test_keyset_pages_cover_range_once(self):
+        index = ProcedureIndex(self._EM)
+        lo, hi = index.code_span("99202", "99215")
+        seen, after = [], None
+        while True:
+            ids, more = index.page(lo, hi, after=after, limit=4)
+            seen.extend(self._codes(index, ids))
+            if not more:
+                break
+            after = seen[-1]
+        assert seen == sorted(p["code"] for p in self._EM)
+
+
+@pytest.mark.unit
+class TestProcedureLookup:
+    """Tool: exact code lookup or ranked name search."""
+
+    def test_code_returns_that_procedure(self):
+        result = procedure_lookup(query="27447")
+        assert result["success"] is True
+        assert [p["code"] for p in result["data"]["procedures"]] == ["27447"]
+
+    def test_name_search(self):
+        result = procedure_lookup(query="Knee Replacement")
+        assert result["data"]["procedures"][0]["code"] == "27447"
+        assert result["data"]["total_matches"] >= 1
+
+    def test_unknown_returns_message(self):
+        result = procedure_lookup(query="99999")
+        assert result["success"] is True
+        assert result["data"]["procedures"] == []
+        assert "No procedure found" in result["data"]["message"]
+
+    def test_invalid_input(self):
+        assert procedure_lookup(query="")["success"] is False
+        assert procedure_lookup(query=None)["success"] is False
+        assert procedure_lookup(query="knee", limit=0)["success"] is False
+
+    def test_range_mode_pages_in_code_order(self):
+        result = procedure_lookup(query="00000 to 99999", mode="range", limit=2)
+        assert result["success"] is True
+        data = result["data"]
+        codes = [p["code"] for p in data["procedures"]]
+        assert codes == sorted(codes) and len(codes) == 2
+        assert set(data["procedures"][0]) == {"code", "name"}
+        while data["next_cursor"]:
+            data = procedure_lookup(mode="range", code_start="00000", code_end="99999",
+                                    cursor=data["next_cursor"], limit=2)["data"]
+            codes.extend(p["code"] for p in data["procedures"])
+        assert codes == sorted(codes) and len(codes) == data["total"]
+
+    def test_prefix_mode_accepts_x_wildcards(self):
+        data = procedure_lookup(query="274xx", mode="prefix")["data"]
+        assert [p["code"] for p in data["procedures"]] == ["27447"]
+        assert data["total"] == 1 and data["next_cursor"] is None
+
+    def test_cursor_bound_to_query(self):
+        first = procedure_lookup(mode="range", code_start="00000", code_end="99999", limit=1)["data"]
+        other = procedure_lookup(query="9", mode="prefix", cursor=first["next_cursor"])
+        assert other["success"] is False and "cursor" in other["error"]
+
+    def test_code_query_validation(self):
+        assert procedure_lookup(query="knee", mode="fuzzy")["success"] is False
+        assert procedure_lookup(mode="range", code_start="99202")["success"] is False
+        assert procedure_lookup(query="xx", mode="prefix")["success"] is False
+        assert procedure_lookup(query="99", mode="prefix", limit=1000)["success"] is False
@@ -50,3 +50,50 @@ class TestProviderSearch:
         result = provider_search(specialty=None, location="Austin")
         assert result["success"] is False
         assert "error" in result
+
+    def test_state_and_partial_location_match(self):
+        """Location matches the full 'City, ST', the city, the state, or a substring of them."""
+        by_state = provider_search(specialty="cardiology", location="TX")["data"]
+        assert by_state["total"] == 3
+        partial = provider_search(specialty="cardiology", location="hous")["data"]
+        assert [p["id"] for p in partial["providers"]] == ["prov_004"]
+
+
+@pytest.mark.unit
+class TestProviderIndex:
+    """Index-backed search: cursor pagination and lat/long radius queries."""
+
+    def test_cursor_pages_through_all_results(self):
+        seen = []
+        cursor = None
+        while True:
+            data = provider_search(specialty="", location="TX", limit=3, cursor=cursor)["data"]
+            assert data["total"] == 4
+            seen.extend(p["id"] for p in data["providers"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == ["prov_001", "prov_002", "prov_003", "prov_004"]
+
+    def test_cursor_from_another_query_is_rejected(self):
+        cursor = provider_search(specialty="", location="TX", limit=1)["data"]["next_cursor"]
+        result = provider_search(specialty="cardiology", location="TX", limit=1, cursor=cursor)
+        assert result["success"] is False
+        assert "cursor" in result["error"]
+        assert provider_search(specialty="", location="TX", cursor="not-a-cursor")["success"] is False
+
+    def test_radius_query_returns_nearest_first(self):
+        result = provider_search(specialty="cardiology", latitude=30.27, longitude=-97.74, radius_km=10)
+        assert result["success"] is True
+        providers = result["data"]["providers"]
+        assert [p["id"] for p in providers] == ["prov_001", "prov_002"]
+        assert providers[0]["distance_km"] <= providers[1]["distance_km"]
+
+    def test_wide_radius_reaches_other_city(self):
+        result = provider_search(specialty="cardiology", latitude=30.27, longitude=-97.74, radius_km=300)
+        assert [p["id"] for p in result["data"]["providers"]][-1] == "prov_004"
+
+    def test_invalid_geo_and_limit_arguments(self):
+        assert provider_search(specialty="cardiology", latitude=30.27)["success"] is False
+        assert provider_search(specialty="cardiology", latitude=30.27, longitude=-97.74, radius_km=0)["success"] is False
+        assert provider_search(specialty="cardiology", location="TX", limit=0)["success"] is False
@@ -0,0 +1,76 @@
+"""
+Tests for the materialized slot calendar behind appointment_availability.
+Run: pytest tests/unit/test_slot_calendar.py -v
+"""
+import os
+import subprocess
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+from agent.tools.slot_calendar import SlotCalendar
+
+_SCHEDULES = {
+    "prov_a": [("14:00", "14:30"), ("09:00", "09:30"), ("10:00", "10:30")],
+    "prov_b": [("08:00", "08:30")],
+}
+_MONDAY = date(2025, 3, 3)
+
+
+class _Clock:
+    def __init__(self, today):
+        self.today = today
+
+    def __call__(self):
+        return self.today
+
+
+def _all_slots(cal, start, days):
+    end = start + timedelta(days=days)
+    return {pid: cal.slots(pid, start.isoformat(), end.isoformat()) for pid in cal.providers()}
+
+
+@pytest.mark.unit
+class TestSlotCalendar:
+    """Range queries, weekend gaps, rollover and cross-process determinism."""
+
+    def test_range_query_is_sorted_and_bounded(self):
+        cal = SlotCalendar(_SCHEDULES, horizon_days=14, today=_Clock(_MONDAY))
+        slots = cal.slots("prov_a", "2025-03-04", "2025-03-06")
+        assert slots
+        assert all("2025-03-04" <= s["date"] <= "2025-03-06" for s in slots)
+        keys = [(s["date"], s["start_time"]) for s in slots]
+        assert keys == sorted(keys)
+
+    def test_weekends_and_unknown_provider_are_empty(self):
+        cal = SlotCalendar(_SCHEDULES, horizon_days=14, today=_Clock(_MONDAY))
+        assert cal.slots("prov_a", "2025-03-08", "2025-03-09") == []
+        assert cal.slots("nobody", "2025-03-03", "2025-03-14") == []
+
+    def test_time_window_filter(self):
+        cal = SlotCalendar(_SCHEDULES, horizon_days=14, today=_Clock(_MONDAY))
+        slots = cal.slots("prov_a", "2025-03-03", "2025-03-14", start_time="12:00", end_time="17:00")
+        assert slots and {s["start_time"] for s in slots} == {"14:00"}
+
+    def test_rollover_matches_a_fresh_build(self):
+        clock = _Clock(_MONDAY)
+        cal = SlotCalendar(_SCHEDULES, horizon_days=30, today=clock)
+        for step in (1, 1, 5, 40):
+            clock.today += timedelta(days=step)
+            fresh = SlotCalendar(_SCHEDULES, horizon_days=30, today=_Clock(clock.today))
+            assert _all_slots(cal, clock.today - timedelta(days=3), 40) == _all_slots(fresh, clock.today, 40)
+            assert cal.window() == (clock.today.isoformat(), (clock.today + timedelta(days=29)).isoformat())
+
+    def test_same_slots_in_every_process(self):
+        """No dependence on str hash randomization: two interpreters with different seeds agree."""
+        code = ("from datetime import date; from agent.tools.slot_calendar import SlotCalendar; "
+                f"c = SlotCalendar({_SCHEDULES!r}, today=lambda: date(2025, 3, 3)); "
+                "print(c.slots('prov_a', '2025-03-03', '2025-03-14'))")
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        outputs = {
+            subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True,
+                           env={**os.environ, "PYTHONHASHSEED": seed}).stdout
+            for seed in ("1", "2")
+        }
+        assert len(outputs) == 1
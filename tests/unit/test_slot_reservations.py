@@ -0,0 +1,226 @@
+"""
+Tests for slot holds/bookings and the timer wheel that expires holds.
+Run: pytest tests/unit/test_slot_reservations.py -v
+"""
+import threading
+from datetime import date
+
+import pytest
+
+from agent.tools.slot_calendar import SlotCalendar
+from agent.tools.slot_reservations import ReservationBook, ReservationError, SQLiteReservationBook, TimerWheel
+
+_SCHEDULES = {
+    "prov_a": [("09:00", "09:30"), ("10:00", "10:30"), ("14:00", "14:30")],
+    "prov_b": [("08:00", "08:30"), ("15:00", "15:30")],
+}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _book(clock=None, ttl=60.0):
+    cal = SlotCalendar(_SCHEDULES, horizon_days=14, today=lambda: date(2025, 3, 3))
+    return ReservationBook(cal, hold_ttl=ttl, clock=clock or _Clock())
+
+
+def _first_slot(book, provider_id="prov_a"):
+    return book.calendar.slots(provider_id, "2025-03-03", "2025-03-14")[0]
+
+
+@pytest.mark.unit
+class TestTimerWheel:
+    """Expiry visits only elapsed buckets and honours deadlines beyond one rotation."""
+
+    def test_expires_in_deadline_order_of_ticks(self):
+        wheel = TimerWheel(tick=1.0, size=8, now=0.0)
+        wheel.schedule("a", 2.5)
+        wheel.schedule("b", 5.0)
+        assert wheel.advance(2.0) == []
+        assert wheel.advance(3.0) == ["a"]
+        assert wheel.advance(10.0) == ["b"]
+        assert len(wheel) == 0
+
+    def test_deadline_beyond_one_rotation_and_cancel(self):
+        wheel = TimerWheel(tick=1.0, size=4, now=0.0)
+        wheel.schedule("far", 9.0)
+        wheel.schedule("gone", 2.0)
+        wheel.cancel("gone")
+        assert wheel.advance(5.0) == []
+        assert wheel.advance(9.0) == ["far"]
+
+
+@pytest.mark.unit
+class TestReservationBook:
+    """Hold -> book lifecycle, conflicts and expiry."""
+
+    def test_hold_then_book(self):
+        book = _book()
+        slot = _first_slot(book)
+        hold = book.hold("prov_a", slot["date"], slot["start_time"], holder="+15550100")
+        assert (slot["date"], slot["start_time"]) in book.taken("prov_a")
+        appt = book.book(hold.hold_id)
+        assert appt["appointment_id"].startswith("appt_")
+        assert appt["patient"] == "+15550100"
+        with pytest.raises(ReservationError):
+            book.book(hold.hold_id)
+
+    def test_second_hold_on_same_slot_conflicts(self):
+        book = _book()
+        slot = _first_slot(book)
+        book.hold("prov_a", slot["date"], slot["start_time"])
+        with pytest.raises(ReservationError):
+            book.hold("prov_a", slot["date"], slot["start_time"])
+        assert book.stats()["conflicts"] == 1
+
+    def test_unknown_slot_is_rejected(self):
+        with pytest.raises(ReservationError):
+            _book().hold("prov_a", "2025-03-08", "09:00")  # Saturday
+
+    def test_expired_hold_frees_the_slot(self):
+        clock = _Clock()
+        book = _book(clock, ttl=30.0)
+        slot = _first_slot(book)
+        hold = book.hold("prov_a", slot["date"], slot["start_time"])
+        clock.now += 31
+        assert book.expire(blocking=True) == 1
+        assert book.taken("prov_a") == frozenset()
+        with pytest.raises(ReservationError):
+            book.book(hold.hold_id)
+        book.hold("prov_a", slot["date"], slot["start_time"])
+
+    def test_release_returns_slot(self):
+        book = _book()
+        slot = _first_slot(book)
+        hold = book.hold("prov_a", slot["date"], slot["start_time"])
+        assert book.release(hold.hold_id) is True
+        assert book.release(hold.hold_id) is False
+        assert book.taken("prov_a") == frozenset()
+
+    def test_concurrent_holds_book_each_slot_once(self):
+        book = _book()
+        slots = book.calendar.slots("prov_a", "2025-03-03", "2025-03-14")
+        booked = []
+        barrier = threading.Barrier(8)
+
+        def worker():
+            barrier.wait()
+            for s in slots:
+                try:
+                    hold = book.hold("prov_a", s["date"], s["start_time"])
+                    booked.append(book.book(hold.hold_id))
+                except ReservationError:
+                    pass
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        keys = [(a["date"], a["start_time"]) for a in booked]
+        assert len(keys) == len(set(keys)) == len(slots)
+
+
+def _sqlite_book(path, clock=None, ttl=60.0, **kwargs):
+    cal = SlotCalendar(_SCHEDULES, horizon_days=14, today=lambda: date(2025, 3, 3))
+    return SQLiteReservationBook(cal, str(path), hold_ttl=ttl, clock=clock or _Clock(), **kwargs)
+
+
+@pytest.mark.unit
+class TestSQLiteReservationBook:
+    """Same lifecycle on a shared SQLite file: two books on one file act as two workers."""
+
+    def test_hold_then_book_survives_restart(self, tmp_path):
+        db = tmp_path / "reservations.sqlite3"
+        book = _sqlite_book(db)
+        slot = _first_slot(book)
+        hold = book.hold("prov_a", slot["date"], slot["start_time"], holder="+15550100")
+        appt = book.book(hold.hold_id)
+        assert appt["appointment_id"] == "appt_000001"
+        assert appt["patient"] == "+15550100"
+        with pytest.raises(ReservationError):
+            book.book(hold.hold_id)
+        restarted = _sqlite_book(db)
+        assert restarted.taken("prov_a") == {(slot["date"], slot["start_time"])}
+        assert restarted.stats()["bookings"] == 1
+
+    def test_two_workers_cannot_take_the_same_slot(self, tmp_path):
+        db = tmp_path / "reservations.sqlite3"
+        worker_a, worker_b = _sqlite_book(db), _sqlite_book(db)
+        slot = _first_slot(worker_a)
+        hold = worker_a.hold("prov_a", slot["date"], slot["start_time"])
+        with pytest.raises(ReservationError):
+            worker_b.hold("prov_a", slot["date"], slot["start_time"])
+        assert worker_b.book(hold.hold_id)["date"] == slot["date"]   # any worker can confirm
+        assert worker_a.stats()["conflicts"] == 1
+
+    def test_expired_hold_frees_the_slot_and_release(self, tmp_path):
+        clock = _Clock()
+        book = _sqlite_book(tmp_path / "r.sqlite3", clock, ttl=30.0)
+        slot = _first_slot(book)
+        hold = book.hold("prov_a", slot["date"], slot["start_time"])
+        clock.now += 31
+        assert book.taken("prov_a") == frozenset()
+        with pytest.raises(ReservationError):
+            book.book(hold.hold_id)
+        assert book.expire() == 1
+        again = book.hold("prov_a", slot["date"], slot["start_time"])
+        assert book.release(again.hold_id) is True
+        assert book.release(again.hold_id) is False
+        assert book.taken("prov_a") == frozenset()
+
+    def test_expired_hold_is_taken_over_without_a_sweep(self, tmp_path):
+        clock = _Clock()
+        db = tmp_path / "r.sqlite3"
+        worker_a = _sqlite_book(db, clock, ttl=30.0, sweep_interval=3600.0)
+        worker_b = _sqlite_book(db, clock, ttl=30.0, sweep_interval=3600.0)
+        slot = _first_slot(worker_a)
+        stale = worker_a.hold("prov_a", slot["date"], slot["start_time"])
+        clock.now += 31
+        fresh = worker_b.hold("prov_a", slot["date"], slot["start_time"])
+        with pytest.raises(ReservationError):
+            worker_a.book(stale.hold_id)
+        assert worker_a.book(fresh.hold_id)["date"] == slot["date"]
+        assert worker_a.stats()["expired_holds"] == 1
+
+    def test_sweep_runs_once_per_interval(self, tmp_path):
+        clock = _Clock()
+        book = _sqlite_book(tmp_path / "r.sqlite3", clock, ttl=30.0, sweep_interval=60.0)
+        slots = book.calendar.slots("prov_a", "2025-03-03", "2025-03-14")
+        book.hold("prov_a", slots[0]["date"], slots[0]["start_time"])   # expires at +30
+        clock.now += 31
+        book.hold("prov_a", slots[1]["date"], slots[1]["start_time"])   # before the interval: no DELETE
+        assert book.stats()["expired_holds"] == 0
+        clock.now += 29
+        book.hold("prov_a", slots[2]["date"], slots[2]["start_time"])   # interval passed: sweep
+        assert book.stats()["expired_holds"] == 1
+
+    def test_concurrent_holds_book_each_slot_once(self, tmp_path):
+        db = tmp_path / "reservations.sqlite3"
+        books = [_sqlite_book(db) for _ in range(4)]
+        slots = books[0].calendar.slots("prov_a", "2025-03-03", "2025-03-07")
+        booked = []
+        barrier = threading.Barrier(len(books))
+
+        def worker(book):
+            barrier.wait()
+            for s in slots:
+                try:
+                    hold = book.hold("prov_a", s["date"], s["start_time"])
+                    booked.append(book.book(hold.hold_id))
+                except ReservationError:
+                    pass
+
+        threads = [threading.Thread(target=worker, args=(b,)) for b in books]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        keys = [(a["date"], a["start_time"]) for a in booked]
+        assert len(keys) == len(set(keys)) == len(slots)
+        assert len({a["appointment_id"] for a in booked}) == len(slots)
@@ -0,0 +1,143 @@
+"""
+Tests for the SQLite dataset backend: importer plus every tool answering as the in-memory path does.
+Run: pytest tests/unit/test_sqlite_store.py -v
+"""
+import json
+import random
+import sqlite3
+
+import pytest
+
+from agent.tools import sqlite_store
+from agent.tools.contraindication_check import contraindication_batch_check, contraindication_check
+from agent.tools.insurance_coverage_check import bulk_coverage_check, covering_plans, insurance_coverage_check
+from agent.tools.procedure_lookup import procedure_lookup
+from agent.tools.provider_search import matching_providers, provider_search
+from agent.tools.sqlite_import import import_json_datasets
+from agent.tools.sqlite_store import SQLiteDatasetStore, get_dataset_store
+from agent.tools.symptom_lookup import (
+    _FUZZY_CANDIDATES, _FUZZY_THRESHOLD, SymptomIndex, _probe_count, _trigrams, symptom_lookup,
+)
+
+CALLS = [
+    (insurance_coverage_check, {"procedure_code": "99213", "plan_id": "plan_001"}),
+    (insurance_coverage_check, {"procedure_code": "unknown_xyz", "plan_id": "plan_001"}),
+    (bulk_coverage_check, {"codes": ["99213", "27447", "nope", "99213"], "plan_id": "plan_001"}),
+    (covering_plans, {"procedure_code": "99213"}),
+    (covering_plans, {"procedure_code": "nope"}),
+    (contraindication_check, {"procedure_code": "27447", "patient_conditions": ["Active Infection"],
+                              "patient_medications": ["warfarin"]}),
+    (contraindication_check, {"procedure_code": "27447"}),
+    (contraindication_check, {"procedure_code": " 27447 ", "patient_medications": ["apixaban"]}),
+    (contraindication_check, {"procedure_code": "00000", "patient_conditions": ["x"]}),
+    (contraindication_batch_check, {"procedure_codes": ["27447", "00000", "27447"],
+                                    "patient_conditions": ["active infection"], "patient_medications": []}),
+    (procedure_lookup, {"query": "27447"}),
+    (procedure_lookup, {"query": "knee"}),
+    (procedure_lookup, {"query": "no such procedure"}),
+    (procedure_lookup, {"query": "0-99999", "mode": "range", "limit": 2}),
+    (procedure_lookup, {"query": "2", "mode": "prefix"}),
+    (provider_search, {"specialty": "cardiology", "location": "Austin, TX"}),
+    (provider_search, {"specialty": "", "location": "tx", "limit": 1}),
+    (provider_search, {"specialty": "cardiology", "location": "ust"}),
+    (provider_search, {"specialty": "", "latitude": 30.27, "longitude": -97.74, "radius_km": 50}),
+    (matching_providers, {"specialty": "", "location": ""}),
+    (symptom_lookup, {"symptoms": ["headache"]}),
+    (symptom_lookup, {"symptoms": ["severe headahce", "fever", "chest pain", "nothing known"]}),
+    (symptom_lookup, {"symptoms": ["unrecognizable"]}),
+]
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "datasets.sqlite3")
+    counts = import_json_datasets(db_path)
+    monkeypatch.setenv("DATASET_BACKEND", "sqlite")
+    monkeypatch.setenv("DATASET_DB", db_path)
+    monkeypatch.setattr(sqlite_store, "_stores", {})
+    return db_path, counts
+
+
+@pytest.mark.unit
+class TestSQLiteStore:
+    """Importer output and parity with the in-memory indexes."""
+
+    def test_default_backend_is_memory(self, monkeypatch):
+        monkeypatch.delenv("DATASET_BACKEND", raising=False)
+        assert get_dataset_store() is None
+
+    def test_import_records_row_counts(self, sqlite_backend):
+        db_path, counts = sqlite_backend
+        store = get_dataset_store()
+        assert isinstance(store, SQLiteDatasetStore)
+        assert store.path == db_path
+        assert set(counts) == {"providers", "coverage", "procedures", "contraindications", "symptoms"}
+        assert store.stats()["rows"] == counts
+        assert store.meta["schema_version"] == str(sqlite_store.SCHEMA_VERSION)
+
+    def test_store_is_read_only(self, sqlite_backend):
+        with pytest.raises(sqlite3.OperationalError):
+            get_dataset_store()._conn().execute("DELETE FROM providers")
+
+    @pytest.mark.parametrize("tool,kwargs", CALLS, ids=[f"{t.__name__}-{i}" for i, (t, _) in enumerate(CALLS)])
+    def test_tools_answer_as_in_memory(self, sqlite_backend, tool, kwargs, monkeypatch):
+        monkeypatch.setenv("DATASET_BACKEND", "memory")
+        expected = tool(**kwargs)
+        monkeypatch.setenv("DATASET_BACKEND", "sqlite")
+        got = tool(**kwargs)
+        if isinstance(got, dict) and got.get("data", {}).get("next_cursor"):
+            # Provider cursors are bound to the dataset build, so only their presence must agree
+            assert expected["data"].pop("next_cursor")
+            got["data"].pop("next_cursor")
+        assert got == expected
+
+    def test_fuzzy_symptom_correction_matches_in_memory(self, tmp_path):
+        """Same candidate cap and tie-breaks: a dense vocabulary of look-alike tokens, many misspellings."""
+        rng = random.Random(7)
+        vocab = sorted({"".join(rng.choice("aeinrst") for _ in range(rng.randint(5, 8))) for _ in range(400)})
+        entries = [{"symptom": t, "possible_conditions": ["c"]} for t in vocab]
+        (tmp_path / "symptom_lookup.json").write_text(json.dumps({"symptoms": entries}))
+        import_json_datasets(str(tmp_path / "d.sqlite3"), data_dir=str(tmp_path))
+        store, index = SQLiteDatasetStore(str(tmp_path / "d.sqlite3")), SymptomIndex(entries)
+
+        queries = sorted({t[:2] + t[3:] + "e" for t in vocab} | {t[::-1] for t in vocab} - set(vocab))
+        corrected = 0
+        for query in queries:
+            grams = _trigrams(query)
+            expected = index.correct_token(query)
+            assert store.symptom_closest_token(
+                sorted(grams), _FUZZY_THRESHOLD, _probe_count(len(grams)), _FUZZY_CANDIDATES
+            ) == expected, query
+            corrected += expected is not None
+        assert corrected > 100
+
+    def test_cursors_page_through_store(self, sqlite_backend):
+        first = provider_search(specialty="", location="tx", limit=1)
+        seen = [p["id"] for p in first["data"]["providers"]]
+        cursor = first["data"]["next_cursor"]
+        while cursor:
+            page = provider_search(specialty="", location="tx", limit=1, cursor=cursor)
+            seen += [p["id"] for p in page["data"]["providers"]]
+            cursor = page["data"]["next_cursor"]
+        assert len(seen) == first["data"]["total"] == len(set(seen))
+
+    def test_reimport_is_picked_up_without_restart(self, sqlite_backend, monkeypatch):
+        db_path, _ = sqlite_backend
+        monkeypatch.setattr(sqlite_store, "_RELOAD_CHECK_SECONDS", 3600.0)
+        old = get_dataset_store()
+        assert get_dataset_store() is old
+        import_json_datasets(db_path)           # swaps a new file in under the same path
+        assert get_dataset_store() is old       # within the check interval
+        monkeypatch.setattr(sqlite_store, "_RELOAD_CHECK_SECONDS", 0.0)
+        new = get_dataset_store()
+        assert new is not old and new.import_id != old.import_id
+        assert get_dataset_store() is new
+        assert old.coverage_row("99213", "plan_001") == new.coverage_row("99213", "plan_001")
+
+    def test_cursor_from_another_import_is_rejected(self, sqlite_backend, tmp_path, monkeypatch):
+        cursor = provider_search(specialty="", location="tx", limit=1)["data"]["next_cursor"]
+        other = str(tmp_path / "other.sqlite3")
+        import_json_datasets(other)
+        monkeypatch.setenv("DATASET_DB", other)
+        result = provider_search(specialty="", location="tx", limit=1, cursor=cursor)
+        assert result["success"] is False
@@ -5,7 +5,7 @@ Run: pytest tests/unit/test_symptom_lookup.py -v
 """
 import pytest
 
-from agent.tools.symptom_lookup import symptom_lookup
+from agent.tools.symptom_lookup import SymptomIndex, symptom_lookup
 
 
 @pytest.mark.unit
@@ -49,3 +49,52 @@ class TestSymptomLookup:
         result = symptom_lookup(symptoms=None)
         assert result["success"] is False
         assert "error" in result
+
+    def test_modifiers_and_word_order_still_match(self):
+        """'severe headache' and 'pain in my chest' match the curated 'headache' and 'chest pain'."""
+        result = symptom_lookup(symptoms=["severe headache", "pain in my chest"])
+        assert result["data"]["matched_symptoms"] == {
+            "severe headache": ["headache"],
+            "pain in my chest": ["chest pain"],
+        }
+        assert result["data"]["urgency"] == "high"
+
+    def test_misspelled_symptom_matches_by_trigrams(self):
+        result = symptom_lookup(symptoms=["headahce"])
+        assert result["data"]["matched_symptoms"] == {"headahce": ["headache"]}
+        assert "migraine" in result["data"]["possible_conditions"]
+
+    def test_conditions_ranked_by_supporting_symptoms(self):
+        """A condition supported by more of the input symptoms ranks first."""
+        result = symptom_lookup(symptoms=["fever", "cough", "sore throat"])
+        support = result["data"]["condition_support"]
+        assert support[0] == {"condition": "viral infection", "supporting_symptoms": 3}
+        counts = [s["supporting_symptoms"] for s in support]
+        assert counts == sorted(counts, reverse=True)
+        assert result["data"]["possible_conditions"] == [s["condition"] for s in support]
+
+    def test_one_input_naming_two_symptoms_matches_both(self):
+        result = symptom_lookup(symptoms=["chest pain and fever"])
+        assert result["data"]["matched_symptoms"]["chest pain and fever"] == ["chest pain", "fever"]
+
+
+@pytest.mark.unit
+class TestSymptomIndex:
+    """Index internals: specificity, incidence-matrix ranking."""
+
+    def test_less_specific_match_is_dropped(self):
+        index = SymptomIndex([
+            {"symptom": "pain", "possible_conditions": ["injury"], "urgency": "low"},
+            {"symptom": "chest pain", "possible_conditions": ["cardiac"], "urgency": "high"},
+        ])
+        assert [index.entries[i]["symptom"] for i in index.match("sharp chest pain")] == ["chest pain"]
+        assert [index.entries[i]["symptom"] for i in index.match("back pain")] == ["pain"]
+
+    def test_condition_counted_once_per_input(self):
+        index = SymptomIndex([
+            {"symptom": "runny nose", "possible_conditions": ["cold"], "urgency": "low"},
+            {"symptom": "sneezing", "possible_conditions": ["cold", "allergies"], "urgency": "low"},
+        ])
+        ranked, urgency, _ = index.rank(["runny nose and sneezing", "sneezing"])
+        assert ranked == [("cold", 2), ("allergies", 2)]
+        assert urgency == "low"